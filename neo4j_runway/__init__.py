@@ -1,5 +1,5 @@
 from .discovery import Discovery
-from .ingestion import IngestionGenerator, PyIngest
+from .ingestion import AsyncPyIngest, IngestionGenerator, PyIngest
 from .llm import LLM
 from .modeler import GraphDataModeler
 from .models import DataModel, Node, Relationship, Property
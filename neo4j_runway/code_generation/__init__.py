@@ -1,3 +1,4 @@
 from .pyingest.pyingest_generator import PyIngestConfigGenerator
 from .load_csv.load_csv_generator import LoadCSVCodeGenerator
 from .standard.standard_cypher_generator import StandardCypherCodeGenerator
+from .admin_import.admin_import_generator import AdminImportCodeGenerator
@@ -0,0 +1,426 @@
+"""
+This file contains the code to generate the files of an offline `neo4j-admin database import`.
+"""
+
+import os
+import shlex
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import pandas as pd
+
+from ..base import BaseCodeGenerator
+from ..cypher import get_client_cast
+from ...ingestion.casting import cast_columns
+from ...ingestion.pyingest import get_file_params
+from ...ingestion.sources import iter_source_chunks
+from ...models import DataModel, Node, Property, Relationship
+
+# the neo4j-admin import header types, by the last part of the property type
+IMPORT_TYPES = {
+    "datetime": "datetime",
+    "date": "date",
+    "time": "time",
+    "point": "point",
+    "int": "long",
+    "float": "double",
+    "bool": "boolean",
+}
+# joins the values of a composite key into a single import ID
+KEY_SEPARATOR = "\x1f"
+
+
+def get_import_type(prop: Property, strict_typing: bool = True) -> str:
+    """
+    The neo4j-admin import header type of a property.
+    """
+
+    if not strict_typing:
+        return "string"
+    for suffix, import_type in IMPORT_TYPES.items():
+        if prop.type.lower().endswith(suffix):
+            return import_type
+    return "string"
+
+
+def _get_csv_mapping(prop: Property) -> str:
+    # take the first val as this is the identifying column
+    return (
+        prop.csv_mapping[0] if isinstance(prop.csv_mapping, list) else prop.csv_mapping
+    )
+
+
+def _get_key_properties(node: Node) -> List[Property]:
+    key_properties = node.node_keys or node.unique_properties
+    if not key_properties:
+        raise ValueError(
+            f"Node {node.label} has no unique properties or node keys, so it may not be imported."
+        )
+    return key_properties
+
+
+def _get_import_ids(rows: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """
+    The import ID of each row, made from the values of the key columns. Rows with a missing key have no ID.
+    """
+
+    ids = rows[columns[0]].astype("string")
+    for column in columns[1:]:
+        ids = ids + KEY_SEPARATOR + rows[column].astype("string")
+    return ids
+
+
+def _concat_chunks(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    chunks = list(chunks)
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _write_chunks(chunks: Iterator[pd.DataFrame], path: str) -> None:
+    """
+    Write chunks of rows to a single CSV, with the header of the first chunk.
+    """
+
+    with open(path, "w", newline="") as csv_file:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(csv_file, index=False, header=i == 0)
+
+
+class AdminImportCodeGenerator(BaseCodeGenerator):
+    """
+    Class responsible for generating the files of a neo4j-admin bulk import.
+    """
+
+    def __init__(
+        self,
+        data_model: DataModel,
+        file_directory: str = "./",
+        file_output_directory: str = "./",
+        csv_name: str = "",
+        strict_typing: bool = True,
+        database: str = "neo4j",
+        import_directory: str = "import/",
+        field_separator: str = ",",
+        chunk_size: int = 100000,
+    ):
+        """
+        Class responsible for generating the files of a neo4j-admin bulk import. An offline import into an empty database
+        is much faster than MERGE based ingestion, so it suits first time loads of large data.
+
+        The source files are read and written as one CSV per node label and per relationship, with `:ID`, `:START_ID` and
+        `:END_ID` headers in an ID space per label. Rows are deduplicated on the node keys, and on the source and target of
+        each relationship, keeping the first row as a PyIngest `initial_load` does, where MERGE and SET would keep the last.
+        Rows missing a key are dropped. Values that are
+        not valid for their type are left empty, so the property is not set, as the generated Cypher does.
+        Sources are read and written `chunk_size` rows at a time, so only the IDs already written are held in memory.
+
+        Attributes
+        ----------
+        data_model : DataModel
+            The data model to base the import on.
+        file_directory : str, optional
+            Where the source files are located. By default = "./"
+        file_output_directory : str, optional
+            The location that generated files should be saved to, by default "./"
+        csv_name : str, optional
+            The name of the CSV file. If more than one CSV is used, this arg should not be provided.
+            CSV file names should be included within the data model. By default = ""
+        strict_typing : bool, optional
+            Whether to import the types declared in the data model (True), or import every property as a string (False).
+            By default True
+        database : str, optional
+            The name of the database to import into. By default "neo4j"
+        import_directory : str, optional
+            The directory within `file_output_directory` that the import CSVs are written to. The import command
+            should be run from `file_output_directory`. By default "import/"
+        field_separator : str, optional
+            The field separator of the source CSVs. By default ","
+        chunk_size : int, optional
+            The number of rows of each source read at once. By default 100000
+        """
+
+        super().__init__(
+            data_model=data_model,
+            file_directory=file_directory,
+            file_output_directory=file_output_directory,
+            csv_name=csv_name,
+            strict_typing=strict_typing,
+        )
+        self.database = database
+        self.import_dir = import_directory
+        self.field_separator = field_separator
+        self.chunk_size = chunk_size
+
+    def _get_source_path(self, csv_name: str) -> str:
+        return os.path.join(self.file_dir, self.csv_name or csv_name)
+
+    def _read_source(self, csv_name: str, columns: List[str]) -> Iterator[pd.DataFrame]:
+        """
+        Read the columns of a source file in chunks of `chunk_size` rows. Every value is read as a string.
+        """
+
+        params = get_file_params(
+            {
+                "url": self._get_source_path(csv_name),
+                "cql": "",
+                "chunk_size": self.chunk_size,
+                "field_separator": self.field_separator,
+                "columns": columns,
+            }
+        )
+        empty = True
+        for chunk in iter_source_chunks(params):
+            empty = False
+            yield chunk.astype("string")
+        if empty:
+            # an empty source still has a header to write
+            yield pd.DataFrame(columns=columns, dtype="string")
+
+    def _format_properties(
+        self, rows: pd.DataFrame, properties: Iterable[Property]
+    ) -> Dict[str, pd.Series]:
+        """
+        Map the import header of each property to its values, cast like the generated Cypher casts them.
+        """
+
+        properties = list(properties)
+        column_types = (
+            {
+                _get_csv_mapping(prop): get_client_cast(prop)
+                for prop in properties
+                if get_client_cast(prop) is not None
+            }
+            if self.strict_typing
+            else dict()
+        )
+        rows = cast_columns(
+            rows[list(dict.fromkeys([_get_csv_mapping(prop) for prop in properties]))],
+            column_types,
+        )
+
+        formatted = dict()
+        for prop in properties:
+            column = rows[_get_csv_mapping(prop)]
+            cast = column_types.get(_get_csv_mapping(prop))
+            if cast == "bool":
+                column = column.map({True: "true", False: "false"})
+            elif cast in ["date", "datetime"]:
+                column = column.map(
+                    lambda value: value.isoformat() if pd.notna(value) else None
+                )
+            formatted[f"{prop.name}:{get_import_type(prop, self.strict_typing)}"] = (
+                column
+            )
+        return formatted
+
+    def iter_node_rows(self, node: Node) -> Iterator[pd.DataFrame]:
+        """
+        Generate the rows of the import CSV of a node label, a chunk of the source at a time.
+        Only the import IDs already written are held in memory, not the rows.
+
+        Parameters
+        ----------
+        node : Node
+            The node to import.
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            The deduplicated rows of each chunk, with import headers.
+        """
+
+        key_columns = [_get_csv_mapping(prop) for prop in _get_key_properties(node)]
+        seen: Set[str] = set()
+        for rows in self._read_source(
+            node.csv_name,
+            list(dict.fromkeys([_get_csv_mapping(prop) for prop in node.properties])),
+        ):
+            ids = _get_import_ids(rows, key_columns)
+            # a single node per key, set by its first row
+            keep = ids.notna() & ~ids.duplicated(keep="first") & ~ids.isin(seen)
+            seen.update(ids[keep].tolist())
+
+            yield pd.DataFrame(
+                {
+                    f":ID({node.label})": ids[keep],
+                    **self._format_properties(rows[keep], node.properties),
+                }
+            )
+
+    def generate_node_rows(self, node: Node) -> pd.DataFrame:
+        """
+        Generate the rows of the import CSV of a node label, in memory.
+        Use `iter_node_rows` for sources that do not fit in memory.
+
+        Parameters
+        ----------
+        node : Node
+            The node to import.
+
+        Returns
+        -------
+        pd.DataFrame
+            The deduplicated rows, with import headers.
+        """
+
+        return _concat_chunks(self.iter_node_rows(node))
+
+    def iter_relationship_rows(
+        self, relationship: Relationship
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Generate the rows of the import CSV of a relationship, a chunk of the source at a time.
+        Only the start and end IDs already written are held in memory, not the rows.
+
+        Parameters
+        ----------
+        relationship : Relationship
+            The relationship to import.
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            The deduplicated rows of each chunk, with import headers.
+        """
+
+        source = self.data_model.node_dict[relationship.source]
+        target = self.data_model.node_dict[relationship.target]
+        source_columns = [
+            _get_csv_mapping(prop) for prop in _get_key_properties(source)
+        ]
+        if source.label == target.label:
+            # the target is identified by the other csv mapping of the unique property
+            target_columns = [
+                prop.csv_mapping_other
+                for prop in source.unique_properties
+                if prop.csv_mapping_other is not None
+            ][:1]
+            source_columns = [
+                _get_csv_mapping(prop)
+                for prop in source.unique_properties
+                if prop.csv_mapping_other is not None
+            ][:1]
+        else:
+            target_columns = [
+                _get_csv_mapping(prop) for prop in _get_key_properties(target)
+            ]
+
+        seen: Set[Tuple[str, str]] = set()
+        for rows in self._read_source(
+            relationship.csv_name,
+            list(
+                dict.fromkeys(
+                    source_columns
+                    + target_columns
+                    + [_get_csv_mapping(prop) for prop in relationship.properties]
+                )
+            ),
+        ):
+            start_ids = _get_import_ids(rows, source_columns)
+            end_ids = _get_import_ids(rows, target_columns)
+            pairs = pd.MultiIndex.from_arrays([start_ids, end_ids])
+            # a single relationship between the same nodes, set by its first row
+            keep = (
+                start_ids.notna()
+                & end_ids.notna()
+                & ~pairs.duplicated(keep="first")
+                & ~pairs.isin(seen)
+            )
+            seen.update(pairs[keep.to_numpy()].tolist())
+
+            yield pd.DataFrame(
+                {
+                    f":START_ID({source.label})": start_ids[keep],
+                    f":END_ID({target.label})": end_ids[keep],
+                    **self._format_properties(rows[keep], relationship.properties),
+                }
+            )
+
+    def generate_relationship_rows(self, relationship: Relationship) -> pd.DataFrame:
+        """
+        Generate the rows of the import CSV of a relationship, in memory.
+        Use `iter_relationship_rows` for sources that do not fit in memory.
+
+        Parameters
+        ----------
+        relationship : Relationship
+            The relationship to import.
+
+        Returns
+        -------
+        pd.DataFrame
+            The deduplicated rows, with import headers.
+        """
+
+        return _concat_chunks(self.iter_relationship_rows(relationship))
+
+    def _get_node_file_name(self, node: Node) -> str:
+        return f"{self.import_dir}{node.label}.csv"
+
+    def _get_relationship_file_name(self, relationship: Relationship) -> str:
+        return f"{self.import_dir}{relationship.type}_{relationship.source}_{relationship.target}.csv"
+
+    def generate_import_files(self) -> None:
+        """
+        Generate the node and relationship CSVs to import, in `import_directory`.
+
+        Returns
+        ----------
+        None
+        """
+
+        os.makedirs(f"./{self.file_output_dir}{self.import_dir}", exist_ok=True)
+
+        for node in self.data_model.nodes:
+            _write_chunks(
+                self.iter_node_rows(node),
+                f"./{self.file_output_dir}{self._get_node_file_name(node)}",
+            )
+        for relationship in self.data_model.relationships:
+            _write_chunks(
+                self.iter_relationship_rows(relationship),
+                f"./{self.file_output_dir}{self._get_relationship_file_name(relationship)}",
+            )
+
+    def generate_import_command_string(self) -> str:
+        """
+        Generate the neo4j-admin import command.
+
+        Returns
+        ----------
+        str
+            The command in String format.
+        """
+
+        arguments: List[str] = ["neo4j-admin database import full"]
+        arguments += [
+            shlex.quote(f"--nodes={node.label}={self._get_node_file_name(node)}")
+            for node in self.data_model.nodes
+        ]
+        arguments += [
+            shlex.quote(
+                f"--relationships={relationship.type}={self._get_relationship_file_name(relationship)}"
+            )
+            for relationship in self.data_model.relationships
+        ]
+        # relationships to nodes that are missing from the data are skipped, as MATCH would
+        arguments += ["--skip-bad-relationships=true", shlex.quote(self.database)]
+
+        return " \\\n    ".join(arguments) + "\n"
+
+    def generate_import_command_file(self, file_name: str = "import.sh") -> None:
+        """
+        Generate a shell script containing the neo4j-admin import command.
+        The constraints should be created once the import has finished, with `generate_constraints_file`.
+
+        Parameters
+        ----------
+        file_name : str, optional
+            Name of the file, by default "import.sh"
+        """
+
+        if self.file_output_dir != "":
+            os.makedirs(self.file_output_dir, exist_ok=True)
+
+        with open(f"./{self.file_output_dir}{file_name}", "w") as command_file:
+            command_file.write("#!/bin/sh\n" + self.generate_import_command_string())
@@ -4,7 +4,7 @@ This file contains the base conde generator class. All code generation classes m
 
 from abc import ABC
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Set
 
 import yaml
 
@@ -44,6 +44,10 @@ class BaseCodeGenerator(ABC):
         file_output_directory: str = "./",
         csv_name: str = "",
         strict_typing: bool = True,
+        client_side_casting: bool = False,
+        sparse_rows: bool = False,
+        columnar: bool = False,
+        initial_load: bool = False,
     ):
         """
         This is the base class for code generation. All code generation classes must inherit from this class.
@@ -61,6 +65,19 @@ class BaseCodeGenerator(ABC):
             CSV file names should be included within the data model. By default = ""
         strict_typing : bool, optional
             Whether to use the types declared in the data model (True), or infer types during ingestion (False). By default True
+        client_side_casting : bool, optional
+            Whether integer, float, boolean, date and datetime properties are cast by PyIngest before rows are sent (True),
+            or by the generated Cypher (False). Only applies if `strict_typing` is True. By default False
+        sparse_rows : bool, optional
+            Whether rows are sent without their missing values. If True, then the generated SET clauses keep the current
+            value of a property that is missing from a row, rather than removing it. By default False
+        columnar : bool, optional
+            Whether batches are sent with one list per column rather than a map per row. If True, then the generated
+            statements unwind the row indexes of `$dict.cols`. By default False
+        initial_load : bool, optional
+            Whether the statements load an empty database. If True, then nodes and relationships are written with CREATE
+            rather than MERGE, so no lookups are made for entities that cannot exist yet. Rows must be deduplicated on
+            their keys before they are sent. By default False
         """
 
         self.data_model: DataModel = data_model
@@ -68,15 +85,31 @@ class BaseCodeGenerator(ABC):
         self.file_output_dir = file_output_directory
         self.csv_name = csv_name
         self.strict_typing = strict_typing
+        self.client_side_casting = client_side_casting
+        self.sparse_rows = sparse_rows
+        self.columnar = columnar
+        self.initial_load = initial_load
 
         self._constraints: Dict[str, str] = dict()
+        # the keys of the constraints on relationship types
+        self._relationship_constraint_keys: Set[str] = set()
         self._cypher: Dict[str, Dict[str, Any]] = dict()
 
-        self._generate_base_cypher(strict_typing=self.strict_typing)
+        self._generate_base_cypher(
+            strict_typing=self.strict_typing,
+            client_side_casting=self.client_side_casting,
+            sparse_rows=self.sparse_rows,
+            columnar=self.columnar,
+            initial_load=self.initial_load,
+        )
 
     def _generate_base_cypher(
         self,
         strict_typing: bool = True,
+        client_side_casting: bool = False,
+        sparse_rows: bool = False,
+        columnar: bool = False,
+        initial_load: bool = False,
     ):
         for node in self.data_model.nodes:
             if len(node.unique_properties_column_mapping) > 0:
@@ -102,49 +135,88 @@ class BaseCodeGenerator(ABC):
             # add to cypher map
             self._cypher[node.label] = {
                 "cypher": literal_unicode(
-                    generate_merge_node_clause_standard(
-                        node=node, strict_typing=strict_typing
+                    generate_create_node_clause_standard(
+                        node=node,
+                        strict_typing=strict_typing,
+                        client_casting=client_side_casting,
+                        columnar=columnar,
+                    )
+                    if initial_load
+                    else generate_merge_node_clause_standard(
+                        node=node,
+                        strict_typing=strict_typing,
+                        client_casting=client_side_casting,
+                        sparse_rows=sparse_rows,
+                        columnar=columnar,
                     )
                 ),
                 "csv": f"$BASE/{self.file_dir}{node.csv_name if self.csv_name == '' else self.csv_name}",
             }
+            if client_side_casting:
+                self._cypher[node.label]["column_types"] = get_client_column_types(
+                    node.properties, strict_typing=strict_typing
+                )
 
         ## get relationships
         for rel in self.data_model.relationships:
             if len(rel.unique_properties_column_mapping) > 0:
                 # unique constraints
                 for unique_property in rel.unique_properties:
-                    self._constraints[
-                        generate_constraints_key(
-                            label_or_type=rel.type, unique_property=unique_property
-                        )
-                    ] = generate_unique_constraint(
+                    constraint_key = generate_constraints_key(
+                        label_or_type=rel.type, unique_property=unique_property
+                    )
+                    self._constraints[constraint_key] = generate_unique_constraint(
                         label_or_type=rel.type, unique_property=unique_property
                     )
+                    self._relationship_constraint_keys.add(constraint_key)
 
             # relationship keys
             if rel.relationship_keys:
-                self._constraints[
-                    generate_constraints_key(
-                        label_or_type=node.label, unique_property=node.node_keys
+                constraint_key = generate_constraints_key(
+                    label_or_type=node.label, unique_property=node.node_keys
+                )
+                self._constraints[constraint_key] = (
+                    generate_relationship_key_constraint(
+                        type=rel.type, unique_properties=rel.relationship_keys
                     )
-                ] = generate_relationship_key_constraint(
-                    type=rel.type, unique_properties=rel.relationship_keys
                 )
+                self._relationship_constraint_keys.add(constraint_key)
 
             source = self.data_model.node_dict[rel.source]
             target = self.data_model.node_dict[rel.target]
             self._cypher[f"{rel.type}_{rel.source}_{rel.target}"] = {
                 "cypher": literal_unicode(
-                    generate_merge_relationship_clause_standard(
+                    generate_create_relationship_clause_standard(
+                        relationship=rel,
+                        source_node=source,
+                        target_node=target,
+                        strict_typing=strict_typing,
+                        client_casting=client_side_casting,
+                        columnar=columnar,
+                    )
+                    if initial_load
+                    else generate_merge_relationship_clause_standard(
                         relationship=rel,
                         source_node=source,
                         target_node=target,
                         strict_typing=strict_typing,
+                        client_casting=client_side_casting,
+                        sparse_rows=sparse_rows,
+                        columnar=columnar,
                     )
                 ),
                 "csv": f"$BASE/{self.file_dir}{rel.csv_name if self.csv_name == '' else self.csv_name}",
             }
+            if client_side_casting:
+                # the columns that match the source and target nodes are cast like the node keys
+                self._cypher[f"{rel.type}_{rel.source}_{rel.target}"][
+                    "column_types"
+                ] = get_client_column_types(
+                    rel.properties
+                    + (source.node_keys or source.unique_properties)
+                    + (target.node_keys or target.unique_properties),
+                    strict_typing=strict_typing,
+                )
 
     def generate_cypher_file(self, file_name: str = "ingest_code.cypher") -> None:
         """
@@ -1,13 +1,38 @@
 """
-This file contains the functions to create MATCH, MERGE and SET queries.
+This file contains the functions to create MATCH, MERGE, CREATE and SET queries.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from ...models import Property, Node, Relationship
 
+# the first lines of a statement that reads a columnar batch, one list per column, rather than a list of rows
+COLUMNAR_UNWIND_CLAUSE = """WITH $dict.cols AS cols
+UNWIND range(0, $dict.size - 1) AS i"""
 
-def generate_match_node_clause(node: Node) -> str:
+
+def generate_unwind_clause(columnar: bool = False, as_keyword: str = "AS") -> str:
+    """
+    Generate the clauses that unwind a batch. Values are then found at `row.x`, or at `cols.x[i]` if `columnar`.
+    """
+
+    if columnar:
+        return COLUMNAR_UNWIND_CLAUSE
+    return f"""WITH $dict.rows AS rows
+UNWIND rows {as_keyword} row"""
+
+
+def get_column_reference(csv_mapping: str, columnar: bool = False) -> str:
+    """
+    The expression of a column within a statement made by `generate_unwind_clause`.
+    """
+
+    return f"cols.{csv_mapping}[i]" if columnar else f"row.{csv_mapping}"
+
+
+def generate_match_node_clause(
+    node: Node, client_casting: bool = False, columnar: bool = False
+) -> str:
     """
     Generate a MATCH node clause.
     """
@@ -16,12 +41,12 @@ def generate_match_node_clause(node: Node) -> str:
         "MATCH (n:"
         + node.label
         + " {"
-        + f"{generate_set_unique_property(node.node_keys or node.unique_properties)}"
+        + f"{generate_set_unique_property(node.node_keys or node.unique_properties, client_casting=client_casting, columnar=columnar)}"
         + "})"
     )
 
 
-def generate_match_same_node_labels_clause(node: Node) -> str:
+def generate_match_same_node_labels_clause(node: Node, columnar: bool = False) -> str:
     """
     Generate the two match statements for node with two unique csv mappings.
     This is used when a relationship connects two nodes with the same label.
@@ -29,8 +54,12 @@ def generate_match_same_node_labels_clause(node: Node) -> str:
     """
     from_unique, to_unique = [
         [
-            "{" + f"{prop.name}: row.{prop.csv_mapping}" + "}",
-            "{" + f"{prop.name}: row.{prop.csv_mapping_other}" + "}",
+            "{"
+            + f"{prop.name}: {get_column_reference(prop.csv_mapping, columnar)}"
+            + "}",
+            "{"
+            + f"{prop.name}: {get_column_reference(prop.csv_mapping_other, columnar)}"
+            + "}",
         ]
         for prop in node.unique_properties
         if prop.csv_mapping_other is not None
@@ -41,16 +70,24 @@ MATCH (target:{node.label} {to_unique})"""
 
 
 def generate_set_property(
-    properties: List[Property], strict_typing: bool = True
+    properties: List[Property],
+    strict_typing: bool = True,
+    client_casting: bool = False,
+    sparse_rows: bool = False,
+    columnar: bool = False,
 ) -> str:
     """
     Generate a set property string.
+    If `sparse_rows`, then a property missing from a row keeps its current value.
     """
 
     temp_set_list = []
 
     for prop in properties:
-        temp_set_list.append(f"n.{prop.name} = {cast_value(prop, strict_typing)}")
+        value = cast_value(prop, strict_typing, client_casting, columnar)
+        if sparse_rows:
+            value = f"coalesce({value}, n.{prop.name})"
+        temp_set_list.append(f"n.{prop.name} = {value}")
 
     result = ", ".join(temp_set_list)
 
@@ -61,7 +98,10 @@ def generate_set_property(
 
 
 def generate_set_unique_property(
-    unique_properties: List[Property], strict_typing: bool = True
+    unique_properties: List[Property],
+    strict_typing: bool = True,
+    client_casting: bool = False,
+    columnar: bool = False,
 ) -> str:
     """
     Generate the unique properties to match a node on within a MERGE statement.
@@ -69,20 +109,43 @@ def generate_set_unique_property(
     """
 
     res = [
-        f"{prop.name}: {cast_value(prop, strict_typing)}" for prop in unique_properties
+        f"{prop.name}: {cast_value(prop, strict_typing, client_casting, columnar)}"
+        for prop in unique_properties
     ]
     return ", ".join(res)
 
 
-def generate_merge_node_clause_standard(node: Node, strict_typing: bool = True) -> str:
+def generate_merge_node_clause_standard(
+    node: Node,
+    strict_typing: bool = True,
+    client_casting: bool = False,
+    sparse_rows: bool = False,
+    columnar: bool = False,
+) -> str:
     """
     Generate a MERGE node clause.
+    If `columnar`, then the statement reads a batch with one list per column.
     """
 
-    return f"""WITH $dict.rows AS rows
-UNWIND rows AS row
-MERGE (n:{node.label} {{{generate_set_unique_property(node.node_keys or node.unique_properties, strict_typing)}}})
-{generate_set_property(node.nonidentifying_properties, strict_typing)}"""
+    return f"""{generate_unwind_clause(columnar)}
+MERGE (n:{node.label} {{{generate_set_unique_property(node.node_keys or node.unique_properties, strict_typing, client_casting, columnar)}}})
+{generate_set_property(node.nonidentifying_properties, strict_typing, client_casting, sparse_rows, columnar)}"""
+
+
+def generate_create_node_clause_standard(
+    node: Node,
+    strict_typing: bool = True,
+    client_casting: bool = False,
+    columnar: bool = False,
+) -> str:
+    """
+    Generate a CREATE node clause, for an initial load into an empty database.
+    Each row creates a node, so rows must be deduplicated on the node keys before they are sent.
+    """
+
+    return f"""{generate_unwind_clause(columnar)}
+CREATE (n:{node.label} {{{generate_set_unique_property(node.node_keys or node.unique_properties, strict_typing, client_casting, columnar)}}})
+{generate_set_property(node.nonidentifying_properties, strict_typing, client_casting, columnar=columnar)}"""
 
 
 def generate_merge_node_load_csv_clause(
@@ -120,23 +183,48 @@ def generate_merge_relationship_clause_standard(
     source_node: Node,
     target_node: Node,
     strict_typing: bool = True,
+    client_casting: bool = False,
+    sparse_rows: bool = False,
+    columnar: bool = False,
 ) -> str:
     """
     Generate a MERGE relationship clause.
+    If `columnar`, then the statement reads a batch with one list per column.
     """
     if source_node.label == target_node.label:
-        return f"""WITH $dict.rows AS rows
-UNWIND rows as row
-{generate_match_same_node_labels_clause(node=source_node)}
+        return f"""{generate_unwind_clause(columnar, as_keyword="as")}
+{generate_match_same_node_labels_clause(node=source_node, columnar=columnar)}
 MERGE (source)-[n:{relationship.type}]->(target)
-{generate_set_property(relationship.nonidentifying_properties, strict_typing)}"""
+{generate_set_property(relationship.nonidentifying_properties, strict_typing, client_casting, sparse_rows, columnar)}"""
     else:
-        return f"""WITH $dict.rows AS rows
-UNWIND rows as row
-{generate_match_node_clause(source_node).replace('(n:', '(source:')}
-{generate_match_node_clause(target_node).replace('(n:', '(target:')}
+        return f"""{generate_unwind_clause(columnar, as_keyword="as")}
+{generate_match_node_clause(source_node, client_casting, columnar).replace('(n:', '(source:')}
+{generate_match_node_clause(target_node, client_casting, columnar).replace('(n:', '(target:')}
 MERGE (source)-[n:{relationship.type}]->(target)
-{generate_set_property(relationship.nonidentifying_properties, strict_typing)}"""
+{generate_set_property(relationship.nonidentifying_properties, strict_typing, client_casting, sparse_rows, columnar)}"""
+
+
+def generate_create_relationship_clause_standard(
+    relationship: Relationship,
+    source_node: Node,
+    target_node: Node,
+    strict_typing: bool = True,
+    client_casting: bool = False,
+    columnar: bool = False,
+) -> str:
+    """
+    Generate a CREATE relationship clause, for an initial load into an empty database.
+    Each row creates a relationship, so rows must be deduplicated on the source and target keys before they are sent.
+    """
+
+    return generate_merge_relationship_clause_standard(
+        relationship=relationship,
+        source_node=source_node,
+        target_node=target_node,
+        strict_typing=strict_typing,
+        client_casting=client_casting,
+        columnar=columnar,
+    ).replace("\nMERGE (source)-[", "\nCREATE (source)-[", 1)
 
 
 def generate_merge_relationship_load_csv_clause(
@@ -174,9 +262,94 @@ CALL {{
 """
 
 
-def cast_value(prop: Property, strict_typing: bool = True) -> str:
+def get_client_cast(prop: Property) -> Optional[str]:
+    """
+    The cast applied by the client to the columns of a property, or None if the property is cast by the database.
+    """
+
+    prop_type = prop.type.lower()
+    # "point" ends with "int", so the casts are checked in the same order as `cast_value`
+    if prop_type.endswith("date") or prop_type.endswith("datetime"):
+        return "date" if prop_type.endswith("date") else "datetime"
+    if prop_type.endswith("time") or prop_type.endswith("point"):
+        return None
+    for client_cast in ["int", "float", "bool"]:
+        if prop_type.endswith(client_cast):
+            return client_cast
+    return None
+
+
+def get_client_column_types(
+    properties: List[Property], strict_typing: bool = True
+) -> Dict[str, str]:
+    """
+    Map the columns of properties to the casts applied by the client. This is the `column_types` of a PyIngest `files` entry.
+    """
+
+    if not strict_typing:
+        return dict()
+
+    column_types = dict()
+    for prop in properties:
+        client_cast = get_client_cast(prop)
+        if client_cast is None:
+            continue
+        csv_mappings = (
+            prop.csv_mapping
+            if isinstance(prop.csv_mapping, list)
+            else [prop.csv_mapping]
+        )
+        if prop.csv_mapping_other is not None:
+            csv_mappings = csv_mappings + [prop.csv_mapping_other]
+        for csv_mapping in csv_mappings:
+            column_types[csv_mapping] = client_cast
+    return column_types
+
+
+def generate_call_in_transactions_clause(
+    standard_clause: str,
+    batch_size: int = 1000,
+    concurrency: Optional[int] = None,
+    on_error: Optional[str] = None,
+) -> str:
+    """
+    Wrap a statement made by `generate_merge_node_clause_standard` or `generate_merge_relationship_clause_standard`
+    in CALL { ... } IN TRANSACTIONS, so a large batch is committed by the server in transactions of `batch_size` rows.
+    If `concurrency` is set, then that many transactions are run at once. `on_error` is one of "continue", "break"
+    or "fail" and sets how the server handles a failed inner transaction. The statement must be run in an auto-commit transaction.
+    """
+
+    if on_error is not None and on_error.lower() not in ["continue", "break", "fail"]:
+        raise ValueError(
+            f"Unsupported `on_error` value {on_error}. Supported values are continue, break and fail."
+        )
+
+    unwind_clause, standard_clause = (
+        "\n".join(standard_clause.split("\n", 2)[:2]),
+        standard_clause.split("\n", 2)[2],
+    )
+    imported = "cols, i" if unwind_clause == COLUMNAR_UNWIND_CLAUSE else "row"
+    concurrent = f"{concurrency} CONCURRENT " if concurrency else ""
+    error_handling = f" ON ERROR {on_error.upper()}" if on_error else ""
+    standard_clause = standard_clause.rstrip().replace("\n", "\n    ")
+
+    return f"""{unwind_clause}
+CALL {{
+    WITH {imported}
+    {standard_clause}
+}} IN {concurrent}TRANSACTIONS OF {str(batch_size)} ROWS{error_handling}"""
+
+
+def cast_value(
+    prop: Property,
+    strict_typing: bool = True,
+    client_casting: bool = False,
+    columnar: bool = False,
+) -> str:
     """
     format property to be cast to correct type during ingestion.
+    If `client_casting`, then values that PyIngest casts before sending are used as they are.
+    If `columnar`, then the value is read from a columnar batch.
     """
 
     # take the first val as this is the identifying column
@@ -191,11 +364,14 @@ def cast_value(prop: Property, strict_typing: bool = True) -> str:
         else csv_mapping
     )
 
-    base = f"row.{csv_mapping}"
+    base = get_column_reference(csv_mapping, columnar)
 
     if not strict_typing:
         return base
 
+    if client_casting and get_client_cast(prop) is not None:
+        return base
+
     if prop.type.lower().endswith("date"):
         return f"date({base})"
     elif prop.type.lower().endswith("datetime"):
@@ -8,8 +8,11 @@ from typing import Any, Dict, List, Optional, Union
 import yaml
 
 
-from ..base import BaseCodeGenerator
-from ..cypher import format_pyingest_pre_or_post_ingest_code
+from ..base import BaseCodeGenerator, literal_unicode
+from ..cypher import (
+    format_pyingest_pre_or_post_ingest_code,
+    generate_call_in_transactions_clause,
+)
 from ...models.core import DataModel
 
 
@@ -34,6 +37,13 @@ class PyIngestConfigGenerator(BaseCodeGenerator):
         pyingest_file_config: Optional[Dict[str, Any]] = dict(),
         pre_ingest_code: Optional[Union[str, List[str]]] = None,
         post_ingest_code: Optional[Union[str, List[str]]] = None,
+        client_side_casting: bool = False,
+        sparse_rows: bool = False,
+        columnar: bool = False,
+        transaction_batch_size: Optional[int] = None,
+        concurrent_transactions: Optional[int] = None,
+        on_error: Optional[str] = None,
+        initial_load: bool = False,
     ):
         """
         Class responsible for generating the PyIngest config yaml. Output is compatible with Runway ingest as well as
@@ -66,7 +76,8 @@ class PyIngestConfigGenerator(BaseCodeGenerator):
             The global field separator to use. Will be overwritten by any batch sizes declared in the pyingest_file_config arg. By default None
         pyingest_file_config : Optional[Dict[str, Any]], optional
             Additional configuration parameters to inject into the final YAML configuration. Parameters are file specific.
-            Supported parameters are: batch_size <int>, skip_records <int>, skip_file <int> and field_separator <str>. By default dict()
+            Supported parameters are: batch_size <int>, skip_records <int>, skip_file <int>, field_separator <str>,
+            partitions <int>, deduplicate <str> and parse_processes <int>. By default dict()
             Example: pyingest_config = {
                 "A.csv": {"field_separator": "|", "skip_file": False, "skip_records": 5},
                 "B.csv": {"skip_file": True, "batch_size": 1234},
@@ -75,14 +86,52 @@ class PyIngestConfigGenerator(BaseCodeGenerator):
             Code to be run before data is ingested. This should include any constraints or indexes that will not be auto-generated by Runway. By default = None
         post_ingest_code : Union[str, List[str], None], optional
             Code to be run after all data is ingested. By default = None
+        client_side_casting : bool, optional
+            Whether PyIngest casts integer, float, boolean, date and datetime columns with vectorized pandas operations
+            before rows are sent. The generated Cypher then uses the values as they are, and each file entry declares
+            its `column_types`. Only applies if `strict_typing` is True. By default False
+        sparse_rows : bool, optional
+            Whether PyIngest leaves missing values out of each row, rather than sending them as empty strings. The generated
+            SET clauses then only change the properties present in a row, so sparse data does not write empty string
+            properties. By default False
+        columnar : bool, optional
+            Whether PyIngest sends each batch as one list per column, so column names are not repeated for every row.
+            The generated statements unwind the row indexes and read `cols.x[i]`. This suits data with many rows and
+            few short columns. By default False
+        transaction_batch_size : Optional[int], optional
+            If set, then each statement is wrapped in CALL { ... } IN TRANSACTIONS OF `transaction_batch_size` ROWS.
+            PyIngest then sends batches of `batch_size` rows that the server commits in smaller transactions, which saves
+            round trips on high latency connections. Set `global_batch_size` to a multiple of this size. By default None
+        concurrent_transactions : Optional[int], optional
+            The number of inner transactions the server runs at once, with IN CONCURRENT TRANSACTIONS. Requires Neo4j 5.21
+            or later. Only applies if `transaction_batch_size` is set. By default None
+        on_error : Optional[str], optional
+            How the server handles a failed inner transaction: "continue", "break" or "fail". Only applies if
+            `transaction_batch_size` is set. By default None, which fails the batch
+        initial_load : bool, optional
+            Whether the configuration loads an empty database, such as for a full rebuild. Nodes and relationships are
+            then written with CREATE rather than MERGE, and PyIngest deduplicates the rows of each file on their keys and
+            refuses to load a database that already holds nodes. The first row of each key sets its properties, as with
+            the AdminImportCodeGenerator, rather than the last as MERGE and SET would. The node constraints are created once the nodes are loaded,
+            with `pre_relationships`, so their indexes are built in one pass and are ready for the relationship MATCHes.
+            Relationship constraints are created with `post_ingest`. May not be used with `transaction_batch_size`, as a
+            retried batch would create the rows its committed inner transactions already created. By default False
 
         """
+        if initial_load and transaction_batch_size:
+            raise ValueError(
+                "`initial_load` may not be used with `transaction_batch_size`, as a retried batch could create duplicates."
+            )
         super().__init__(
             data_model=data_model,
             file_directory=file_directory,
             file_output_directory=file_output_directory,
             csv_name=csv_name,
             strict_typing=strict_typing,
+            client_side_casting=client_side_casting,
+            sparse_rows=sparse_rows,
+            columnar=columnar,
+            initial_load=initial_load,
         )
         self.username: Union[str, None] = username
         self.password: Union[str, None] = password
@@ -93,6 +142,9 @@ class PyIngestConfigGenerator(BaseCodeGenerator):
         self.pyingest_file_config = pyingest_file_config
         self.pre_ingest_code = pre_ingest_code
         self.post_ingest_code = post_ingest_code
+        self.transaction_batch_size = transaction_batch_size
+        self.concurrent_transactions = concurrent_transactions
+        self.on_error = on_error
 
         self._config_files_list = list()
 
@@ -109,11 +161,26 @@ class PyIngestConfigGenerator(BaseCodeGenerator):
             if self._cypher[item]["csv"]:
                 file_dict["url"] = self._cypher[item]["csv"]
                 file_dict["cql"] = self._cypher[item]["cypher"]
+                if self.transaction_batch_size:
+                    file_dict["cql"] = literal_unicode(
+                        generate_call_in_transactions_clause(
+                            self._cypher[item]["cypher"],
+                            batch_size=self.transaction_batch_size,
+                            concurrency=self.concurrent_transactions,
+                            on_error=self.on_error,
+                        )
+                    )
 
                 # set globals
                 file_dict["chunk_size"] = self.global_batch_size
                 if self.global_field_separator:
                     file_dict["field_separator"] = self.global_field_separator
+                if self.sparse_rows:
+                    file_dict["sparse_rows"] = True
+                if self.columnar:
+                    file_dict["columnar"] = True
+                if self._cypher[item].get("column_types"):
+                    file_dict["column_types"] = self._cypher[item]["column_types"]
 
                 # set distict file params
                 if self._cypher[item]["csv"] in self.pyingest_file_config:
@@ -145,6 +212,27 @@ class PyIngestConfigGenerator(BaseCodeGenerator):
                         file_dict["skip_file"] = self.pyingest_file_config[
                             self._cypher[item]["csv"]
                         ]["skip_file"]
+                    if (
+                        "partitions"
+                        in self.pyingest_file_config[self._cypher[item]["csv"]]
+                    ):
+                        file_dict["partitions"] = self.pyingest_file_config[
+                            self._cypher[item]["csv"]
+                        ]["partitions"]
+                    if (
+                        "deduplicate"
+                        in self.pyingest_file_config[self._cypher[item]["csv"]]
+                    ):
+                        file_dict["deduplicate"] = self.pyingest_file_config[
+                            self._cypher[item]["csv"]
+                        ]["deduplicate"]
+                    if (
+                        "parse_processes"
+                        in self.pyingest_file_config[self._cypher[item]["csv"]]
+                    ):
+                        file_dict["parse_processes"] = self.pyingest_file_config[
+                            self._cypher[item]["csv"]
+                        ]["parse_processes"]
 
                 self._config_files_list.append(file_dict)
 
@@ -203,8 +291,11 @@ class PyIngestConfigGenerator(BaseCodeGenerator):
             + f"admin_pass: {self.password}\n"
             + f"database: {self.database}\n"
             + "basepath: ./\n\n"
-            + "pre_ingest:\n"
         )
+        if self.initial_load:
+            return to_return + self._generate_initial_load_config_string(config_dump)
+
+        to_return += "pre_ingest:\n"
         if self.pre_ingest_code:
             pre_ingest_code_string = format_pyingest_pre_or_post_ingest_code(
                 data=self.pre_ingest_code
@@ -222,3 +313,38 @@ class PyIngestConfigGenerator(BaseCodeGenerator):
             to_return += "\npost_ingest:\n" + post_ingest_code_string
 
         return to_return
+
+    def _generate_initial_load_config_string(self, config_dump: str) -> str:
+        """
+        Generate the settings and statements of an initial load. Node constraints are deferred until the nodes are
+        loaded, and relationship constraints until everything is loaded.
+        """
+
+        node_constraints = [
+            f"  - {self._constraints[constraint]}"
+            for constraint in self._constraints
+            if constraint not in self._relationship_constraint_keys
+        ]
+        relationship_constraints = [
+            f"  - {self._constraints[constraint]}"
+            for constraint in self._constraints
+            if constraint in self._relationship_constraint_keys
+        ]
+
+        to_return = "initial_load: true\n\n"
+        if self.pre_ingest_code:
+            to_return += "pre_ingest:\n" + format_pyingest_pre_or_post_ingest_code(
+                data=self.pre_ingest_code
+            )
+        if node_constraints:
+            to_return += "pre_relationships:\n" + "".join(node_constraints)
+        to_return += config_dump
+
+        if relationship_constraints or self.post_ingest_code:
+            to_return += "\npost_ingest:\n" + "".join(relationship_constraints)
+            if self.post_ingest_code:
+                to_return += format_pyingest_pre_or_post_ingest_code(
+                    data=self.post_ingest_code
+                )
+
+        return to_return
@@ -1,2 +1,5 @@
 from ..code_generation.generate_ingest import IngestionGenerator
 from .pyingest import PyIngest
+from .async_pyingest import AsyncPyIngest
+from .fairness import FairScheduler
+from .report import IngestReport
@@ -0,0 +1,336 @@
+"""
+This file contains the asyncio counterpart of PyIngest. It uses the same YAML configuration.
+"""
+
+import asyncio
+from contextlib import closing
+import datetime
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from neo4j import AsyncDriver, AsyncGraphDatabase, Query, unit_of_work
+from neo4j.exceptions import DriverError, Neo4jError
+import pandas as pd
+
+from . import pyingest
+from .casting import cast_columns, get_batch_size, to_batch
+from .dedup import RowDeduplicator, get_deduplicator
+from .parallel_csv import check_not_bootstrapping
+from .report import BatchReport, IngestReport, get_counters
+from .scheduler import count_leading_node_entries
+from .sources import iter_source_chunks
+from .statements import get_statement_info
+from .pyingest import (
+    COUNT_NODES_QUERY,
+    check_initial_load_files,
+    get_driver_config,
+    get_file_params,
+    get_retry_delay,
+    get_transaction_metadata,
+    get_yaml,
+    iter_dataframe_chunks,
+    parse_config,
+    project_columns,
+    raise_if_not_empty,
+)
+
+
+class AsyncLocalServer(object):
+    """
+    Handles asynchronous data ingestion.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        driver: Optional[AsyncDriver] = None,
+        driver_config: Optional[Dict[str, Any]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        read_in_thread: bool = False,
+    ):
+        config = config if config is not None else pyingest.global_config
+        self.config = config
+        self._owns_driver = driver is None
+        self._driver = driver or AsyncGraphDatabase.driver(
+            config["server_uri"],
+            auth=(config["admin_user"], config["admin_pass"]),
+            **get_driver_config(config, driver_config),
+        )
+        self.db_config = {}
+        self.database = config["database"] if "database" in config else None
+        if self.database is not None:
+            self.db_config["database"] = self.database
+        self.basepath = config["basepath"] if "basepath" in config else None
+        self.initial_load = bool(config.get("initial_load"))
+        self.max_in_flight = max_in_flight
+        self.read_in_thread = read_in_thread
+        self.report = IngestReport()
+
+    async def close(self):
+        if self._owns_driver:
+            await self._driver.close()
+
+    def get_params(self, file):
+        return get_file_params(
+            file, basepath=self.basepath, initial_load=self.initial_load
+        )
+
+    async def load_dataframe(self, file, dataframe: pd.DataFrame) -> None:
+        """
+        Load a Pandas DataFrame directly using a PyIngest yaml config file.
+        """
+        params = self.get_params(file)
+        if params["skip_file"]:
+            return
+
+        self.report.start_file(params)
+        try:
+            await self.load_chunks(
+                params, iter_dataframe_chunks(dataframe, params["chunk_size"])
+            )
+        except BaseException:
+            self.report.finish_file(params, completed=False)
+            raise
+        self.report.finish_file(params)
+
+        print(f"{datetime.datetime.now()} : Completed file {params['url']}")
+
+    async def load_csv(self, file) -> None:
+        params = self.get_params(file)
+        if params["skip_file"]:
+            return
+
+        self.report.start_file(params)
+        try:
+            with closing(iter_source_chunks(params)) as row_chunks:
+                await self.load_chunks(params, row_chunks)
+        except BaseException:
+            self.report.finish_file(params, completed=False)
+            raise
+        self.report.finish_file(params)
+
+        print(f"{datetime.datetime.now()} : Completed file {params['url']}")
+
+    async def load_chunks(self, params, row_chunks: Iterable[pd.DataFrame]) -> None:
+        """
+        Write each chunk of rows with the file's statement, keeping up to `max_in_flight` batches in flight.
+        The next chunk is read and converted while earlier batches are waiting on the database. If `read_in_thread`,
+        then this is done in a worker thread of the default executor, so the event loop is not blocked.
+        The batches of a relationship statement are written one at a time, since concurrent batches would lock the
+        same nodes and may deadlock.
+        """
+        in_flight: Set[asyncio.Task] = set()
+        max_in_flight = (
+            1
+            if get_statement_info(params["cql"]).kind == "relationship"
+            else self.max_in_flight
+        )
+
+        async def wait_for(return_when: str) -> None:
+            nonlocal in_flight
+            done, in_flight = await asyncio.wait(in_flight, return_when=return_when)
+            for task in done:
+                # raise any ingestion error
+                task.result()
+
+        deduplicator = get_deduplicator(params)
+        chunks = enumerate(row_chunks)
+
+        try:
+            while True:
+                if self.read_in_thread:
+                    prepared = await asyncio.to_thread(
+                        self._next_batch, params, chunks, deduplicator
+                    )
+                else:
+                    prepared = self._next_batch(params, chunks, deduplicator)
+                if prepared is None:
+                    break
+                i, batch = prepared
+                while len(in_flight) >= max_in_flight:
+                    await wait_for(asyncio.FIRST_COMPLETED)
+                in_flight.add(
+                    asyncio.create_task(
+                        self._run_batch(params, batch, metadata={"chunk": i})
+                    )
+                )
+                # let the new batch reach the network before reading the next chunk
+                await asyncio.sleep(0)
+            if in_flight:
+                await wait_for(asyncio.ALL_COMPLETED)
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    def _next_batch(
+        self,
+        params,
+        chunks: Iterator[Tuple[int, pd.DataFrame]],
+        deduplicator: Optional[RowDeduplicator],
+    ) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Read and convert the next chunk that has rows to send. Returns None once every chunk is read.
+        """
+        for i, rows in chunks:
+            print(params["url"], i, datetime.datetime.now(), flush=True)
+            rows = project_columns(rows, params["columns"])
+            if deduplicator is not None:
+                rows = deduplicator.filter(rows)
+            if len(rows) == 0:
+                continue
+            rows = cast_columns(rows, params["column_types"])
+            return i, to_batch(rows, params)
+        return None
+
+    async def _run_batch(
+        self, params, batch: Dict[str, Any], metadata: Dict[str, Any]
+    ) -> None:
+        """
+        Write a batch in a managed write transaction, retrying as `LocalServer` does.
+        Each batch uses its own session, as sessions may not be shared between concurrent tasks.
+        A statement that uses `CALL { ... } IN TRANSACTIONS` is run in an auto-commit transaction.
+        """
+
+        @unit_of_work(
+            metadata=get_transaction_metadata(params, metadata),
+            timeout=params["transaction_timeout"],
+        )
+        async def write_rows(tx) -> Any:
+            result = await tx.run(params["cql"], dict=batch)
+            return await result.consume()
+
+        async def write_rows_auto_commit(session) -> Any:
+            query = Query(
+                params["cql"],
+                metadata=get_transaction_metadata(params, metadata),
+                timeout=params["transaction_timeout"],
+            )
+            result = await session.run(query, dict=batch)
+            return await result.consume()
+
+        attempt = 0
+        start = time.perf_counter()
+        async with self._driver.session(**self.db_config) as session:
+            while True:
+                try:
+                    summary = (
+                        await write_rows_auto_commit(session)
+                        if params["call_in_transactions"]
+                        else await session.execute_write(write_rows)
+                    )
+                    self.report.record_batch(
+                        params,
+                        BatchReport(
+                            metadata=metadata,
+                            rows=get_batch_size(batch),
+                            seconds=time.perf_counter() - start,
+                            retries=attempt,
+                            counters=get_counters(summary),
+                        ),
+                    )
+                    return
+                except (DriverError, Neo4jError) as e:
+                    await asyncio.sleep(get_retry_delay(params, attempt, e, metadata))
+                    attempt += 1
+
+    async def check_initial_load(self):
+        """
+        Refuse to start an initial load, which writes with CREATE, unless the database holds no nodes.
+        """
+        async with self._driver.session(**self.db_config) as session:
+            result = await session.run(COUNT_NODES_QUERY)
+            nodes = (await result.single())["nodes"]
+        raise_if_not_empty(nodes)
+
+    async def pre_ingest(self):
+        await self._run_statements(self.config.get("pre_ingest"))
+
+    async def pre_relationships(self):
+        await self._run_statements(self.config.get("pre_relationships"))
+
+    async def post_ingest(self):
+        await self._run_statements(self.config.get("post_ingest"))
+
+    async def _run_statements(self, statements: Optional[List[str]]) -> None:
+        if statements:
+            async with self._driver.session(**self.db_config) as session:
+                for statement in statements:
+                    result = await session.run(statement)
+                    await result.consume()
+
+
+async def AsyncPyIngest(
+    config: str,
+    dataframe: Optional[pd.DataFrame] = None,
+    max_in_flight: int = 4,
+    driver: Optional[AsyncDriver] = None,
+    driver_config: Optional[Dict[str, Any]] = None,
+    read_in_thread: bool = False,
+) -> IngestReport:
+    """
+    Coroutine to ingest data according to a configuration YAML, using the Neo4j async driver.
+    Files are loaded in order, while the batches of each file are written concurrently.
+    The `initial_load` and `pre_relationships` settings of the YAML are handled as PyIngest handles them.
+
+    Parameters
+    ----------
+    config : str
+        A string representation of the YAML file that is generated by the PyIngestConfigGenerator class.
+        May also be a filepath to a YAML file.
+    dataframe : Optional[pd.DataFrame], optional
+        The data to ingest in Pandas DataFrame format.
+        If None, then will search for CSVs according to the urls in YAML config, by default None
+    max_in_flight : int, optional
+        The maximum number of batches of a node file that may be written at once. The batches of a relationship file
+        are written one at a time, as they would otherwise lock the same nodes. By default 4
+    driver : Optional[AsyncDriver], optional
+        An existing Neo4j async driver to load with. It is reused and left open. If None, then a driver is created from
+        the YAML and closed at the end. By default None
+    driver_config : Optional[Dict[str, Any]], optional
+        Settings for the driver created from the YAML, such as `max_connection_pool_size`. These take precedence over a
+        `driver_config` mapping in the YAML. By default None
+    read_in_thread : bool, optional
+        Whether to read and convert each chunk in a worker thread of the event loop's default executor, so the event
+        loop is not blocked while large chunks are parsed. If False, then no threads are started and chunks are read
+        on the event loop between batches. By default False
+
+    Returns
+    -------
+    IngestReport
+        The timings, retries and update counters of every committed batch, by `files` entry.
+    """
+
+    check_not_bootstrapping()
+    ingest_config = parse_config(get_yaml(config))
+
+    server = AsyncLocalServer(
+        max_in_flight=max_in_flight,
+        driver=driver,
+        driver_config=driver_config,
+        config=ingest_config,
+        read_in_thread=read_in_thread,
+    )
+    start = time.perf_counter()
+    try:
+        if server.initial_load:
+            check_initial_load_files(server.config["files"])
+            await server.check_initial_load()
+        await server.pre_ingest()
+        node_entries = count_leading_node_entries(server.config["files"])
+        for idx, file in enumerate(server.config["files"]):
+            # the `pre_relationships` statements run once the leading node entries are loaded
+            if idx == node_entries:
+                await server.pre_relationships()
+            if dataframe is not None:
+                await server.load_dataframe(file, dataframe=dataframe)
+            else:
+                await server.load_csv(file)
+        if node_entries == len(server.config["files"]):
+            await server.pre_relationships()
+        await server.post_ingest()
+    finally:
+        server.report.seconds = time.perf_counter() - start
+        await server.close()
+
+    print(server.report)
+    return server.report
@@ -0,0 +1,80 @@
+"""
+This file contains the controller used to adapt the size of ingestion batches while loading.
+"""
+
+from typing import List
+
+from neo4j.exceptions import Neo4jError
+
+
+def is_memory_error(error: Exception) -> bool:
+    """
+    Whether a server error was caused by a transaction exceeding its memory limit.
+    """
+
+    return isinstance(error, Neo4jError) and "Memory" in (error.code or "")
+
+
+class BatchSizeController:
+    """
+    Chooses the number of rows to write in each transaction.
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        target_latency: float,
+        min_size: int = 1,
+        max_size: int = 100_000,
+    ):
+        """
+        Chooses the number of rows to write in each transaction.
+        After each full batch the size is scaled toward the size expected to commit in `target_latency` seconds.
+        The size changes by at most a factor of 2 per batch, and is halved when the server runs out of memory.
+
+        Attributes
+        ----------
+        initial_size : int
+            The size of the first batch.
+        target_latency : float
+            The desired number of seconds to commit a batch.
+        min_size : int, optional
+            The smallest allowed size, by default 1
+        max_size : int, optional
+            The largest allowed size, by default 100,000
+        """
+
+        self.target_latency = target_latency
+        self.min_size = min_size
+        self.max_size = max_size
+        self.size = self._clamp(initial_size)
+        self.latencies: List[float] = list()
+
+    def _clamp(self, size: int) -> int:
+        return max(self.min_size, min(self.max_size, int(size)))
+
+    def record_success(self, rows: int, seconds: float) -> None:
+        """
+        Adjust the size after a batch of `rows` rows committed in `seconds` seconds.
+        """
+
+        self.latencies.append(seconds)
+        if rows < self.size:
+            # the last rows of a file say little about the chosen size
+            return
+        ratio = self.target_latency / max(seconds, 1e-3)
+        # ignore small deviations, so the size settles
+        if 0.8 <= ratio <= 1.25:
+            return
+        self.size = self._clamp(self.size * min(max(ratio, 0.5), 2.0))
+
+    def record_memory_error(self) -> bool:
+        """
+        Halve the size after the server ran out of memory.
+        Returns False if the size could not be reduced any further.
+        """
+
+        if self.size <= self.min_size:
+            return False
+        self.size = self._clamp(self.size // 2)
+        return True
@@ -0,0 +1,267 @@
+"""
+This file contains the vectorized casts applied to columns on the client before rows are sent,
+so the ingestion statements do not need to parse strings on the server. It also contains the conversion
+of chunks to the batches sent to the database.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+INTEGER_PATTERN = r"\s*[-+]?\d+\s*"
+# the digits of the largest magnitudes of a 64 bit integer, by sign
+INT64_MAX_DIGITS = str(np.iinfo(np.int64).max)
+INT64_MIN_DIGITS = str(np.iinfo(np.int64).min)[1:]
+# the settings of a `files` entry used by `to_batch`
+BATCH_PARAMS = ["column_types", "sparse_rows", "columnar", "key_columns"]
+
+
+def _as_text(column: pd.Series) -> pd.Series:
+    return column.astype("string")
+
+
+def cast_integer(column: pd.Series) -> pd.Series:
+    """
+    Cast to nullable integers like `toIntegerOrNull`. Decimals are truncated and invalid values are null,
+    as are values outside of the 64 bit integer range. Integer strings are parsed exactly, so large ids do not
+    lose precision.
+    """
+    # cast by position, as the index of a chunk may repeat labels
+    text = _as_text(column).reset_index(drop=True)
+    result = pd.Series(pd.NA, index=text.index, dtype="Int64")
+    is_integer = text.str.fullmatch(INTEGER_PATTERN).fillna(False).astype(bool)
+    if is_integer.any():
+        integers = text[is_integer].str.strip()
+        in_range = _is_int64_text(integers)
+        result[in_range[in_range].index] = pd.to_numeric(integers[in_range]).astype(
+            "Int64"
+        )
+    if not is_integer.all():
+        decimals = np.trunc(
+            pd.to_numeric(text[~is_integer].astype(object), errors="coerce")
+        )
+        # every float below 2 ** 63 in magnitude is a 64 bit integer, infinities and NaN are not kept
+        in_range = decimals.abs() < 2.0**63
+        result[in_range[in_range].index] = decimals[in_range].astype("Int64")
+    result.index = column.index
+    return result
+
+
+def _is_int64_text(integers: pd.Series) -> pd.Series:
+    """
+    Whether each stripped integer string is within the 64 bit integer range.
+    """
+    negative = integers.str.startswith("-")
+    digits = integers.str.lstrip("+-").str.lstrip("0")
+    limits = negative.map({True: INT64_MIN_DIGITS, False: INT64_MAX_DIGITS})
+    lengths = digits.str.len()
+    limit_lengths = limits.str.len()
+    return (lengths < limit_lengths) | (
+        (lengths == limit_lengths) & (digits.astype(object) <= limits.astype(object))
+    )
+
+
+def cast_float(column: pd.Series) -> pd.Series:
+    """
+    Cast to floats like `toFloatOrNull`. Invalid values are null.
+    """
+    return pd.to_numeric(_as_text(column).astype(object), errors="coerce")
+
+
+def cast_boolean(column: pd.Series) -> pd.Series:
+    """
+    Cast to nullable booleans like `toBooleanOrNull`. Only "true" and "false", in any case, are valid.
+    """
+    return (
+        _as_text(column)
+        .str.strip()
+        .str.lower()
+        .map({"true": True, "false": False})
+        .astype("boolean")
+    )
+
+
+def cast_date(column: pd.Series) -> pd.Series:
+    """
+    Cast ISO 8601 strings to dates like `date`. Invalid values are null.
+    """
+    dates = pd.to_datetime(
+        _as_text(column).astype(object), errors="coerce", format="ISO8601"
+    )
+    return dates.dt.date.astype(object)
+
+
+def cast_datetime(column: pd.Series) -> pd.Series:
+    """
+    Cast ISO 8601 strings to zoned datetimes like `datetime`. Values without an offset are taken as UTC,
+    and values with an offset are sent as the same instant in UTC. Invalid values are null.
+    """
+    return pd.to_datetime(
+        _as_text(column).astype(object), errors="coerce", format="ISO8601", utc=True
+    ).astype(object)
+
+
+CASTS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    "int": cast_integer,
+    "float": cast_float,
+    "bool": cast_boolean,
+    "date": cast_date,
+    "datetime": cast_datetime,
+}
+
+
+def get_column_types(
+    column_types: Optional[Dict[str, str]],
+) -> Optional[Dict[str, str]]:
+    """
+    Validate the `column_types` of a `files` entry, a map of column names to one of the supported casts.
+    """
+    if not column_types:
+        return None
+    for column, column_type in column_types.items():
+        if column_type not in CASTS:
+            raise ValueError(
+                f"Unsupported type {column_type} for column {column}. Supported types are {list(CASTS)}."
+            )
+    return column_types
+
+
+def cast_columns(
+    rows: pd.DataFrame, column_types: Optional[Dict[str, str]]
+) -> pd.DataFrame:
+    """
+    Cast the columns of a chunk according to `column_types`. Columns that are not listed are left as strings.
+    """
+    if not column_types:
+        return rows
+    casts = {
+        column: CASTS[column_type](rows[column])
+        for column, column_type in column_types.items()
+        if column in rows.columns
+    }
+    return rows.assign(**casts) if casts else rows
+
+
+def to_records(
+    rows: pd.DataFrame,
+    column_types: Optional[Dict[str, str]] = None,
+    sparse: bool = False,
+    key_columns: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Convert a chunk to the records sent to the database. Missing strings are sent as empty strings,
+    while missing values of cast columns are sent as null so the property is not set.
+    If `sparse`, then missing values are left out of each record instead, except in the `key_columns` that identify
+    the written nodes, which are sent as they are without `sparse` so a row still matches the same node.
+    """
+    if sparse:
+        return to_sparse_records(_fill_key_columns(rows, column_types, key_columns))
+    if not column_types:
+        return rows.fillna(value="").to_dict("records")
+    return _fill_missing(rows, column_types).to_dict("records")
+
+
+def _fill_key_columns(
+    rows: pd.DataFrame,
+    column_types: Optional[Dict[str, str]],
+    key_columns: Optional[List[str]],
+) -> pd.DataFrame:
+    """
+    Replace the missing values of key columns with empty strings, unless the column is cast.
+    """
+    fill = {
+        column: ""
+        for column in key_columns or list()
+        if column in rows.columns and not (column_types and column in column_types)
+    }
+    return rows.fillna(value=fill) if fill else rows
+
+
+def _fill_missing(
+    rows: pd.DataFrame,
+    column_types: Optional[Dict[str, str]],
+    sparse: bool = False,
+    key_columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Replace missing values with empty strings, or with None in cast columns. If `sparse`, then every missing value
+    is None, except in the `key_columns`.
+    """
+    nullable = [
+        column
+        for column in rows.columns
+        if (sparse and column not in (key_columns or list()))
+        or (column_types and column in column_types)
+    ]
+    rows = rows.fillna(
+        value={column: "" for column in rows.columns if column not in nullable}
+    )
+    if nullable:
+        values = rows[nullable].astype(object)
+        rows = rows.assign(**values.where(values.notna(), None))
+    return rows
+
+
+def to_columns(
+    rows: pd.DataFrame,
+    column_types: Optional[Dict[str, str]] = None,
+    sparse: bool = False,
+    key_columns: Optional[List[str]] = None,
+) -> Dict[str, List[Any]]:
+    """
+    Convert a chunk to one list of values per column. Each column name is sent once rather than once per row.
+    Missing values are sent as `to_records` sends them, except that with `sparse` they are sent as null.
+    """
+    rows = _fill_missing(rows, column_types, sparse, key_columns)
+    return {column: rows[column].tolist() for column in rows.columns}
+
+
+def to_batch(rows: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a chunk to the `$dict` parameter of a `files` entry's statement. This is {"rows": [...]} with a record per row,
+    or, if the entry is `columnar`, {"cols": {...}, "size": ...} with a list per column.
+    """
+    if params["columnar"]:
+        return {
+            "cols": to_columns(
+                rows,
+                params["column_types"],
+                params["sparse_rows"],
+                params["key_columns"],
+            ),
+            "size": len(rows),
+        }
+    return {
+        "rows": to_records(
+            rows, params["column_types"], params["sparse_rows"], params["key_columns"]
+        )
+    }
+
+
+def get_batch_size(batch: Dict[str, Any]) -> int:
+    """
+    The number of rows in a batch returned by `to_batch`.
+    """
+    return batch["size"] if "cols" in batch else len(batch["rows"])
+
+
+def to_sparse_records(rows: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Convert a chunk to records that only hold the values that are present.
+    Sparse rows are smaller to send, and statements that set `coalesce(row.x, n.x)` do not write the missing properties.
+    """
+    if len(rows) == 0:
+        return list()
+    records = rows.to_dict("records")
+    present = rows.notna().to_numpy()
+    if present.all():
+        return records
+    return [
+        {
+            column: value
+            for (column, value), is_present in zip(record.items(), row_present)
+            if is_present
+        }
+        for record, row_present in zip(records, present)
+    ]
@@ -0,0 +1,173 @@
+"""
+This file contains the checkpoint store used to resume an interrupted PyIngest run.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict
+
+import pandas as pd
+
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024
+
+
+def get_file_entry_key(params: Dict[str, Any], byte_ranges: bool = False) -> str:
+    """
+    Identify a `files` entry. Entries often share a source, so the statement and the chunking
+    are included. Changing any of these restarts the entry. Parsing a CSV in byte ranges numbers
+    the chunks differently, so `byte_ranges` gives it a separate key.
+    """
+
+    fields = [
+        params["url"],
+        params["cql"],
+        params["chunk_size"],
+        params["skip_records"],
+    ]
+    if byte_ranges:
+        fields.append("byte_ranges")
+    key = json.dumps(fields)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_file_fingerprint(path: str) -> str:
+    """
+    Fingerprint a source file by its size and the content at its start and end.
+    This avoids reading the entire file while still catching replaced or appended sources.
+    """
+
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if size > FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(FINGERPRINT_SAMPLE_BYTES, size - FINGERPRINT_SAMPLE_BYTES))
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def get_dataframe_fingerprint(dataframe: pd.DataFrame) -> str:
+    """
+    Fingerprint a Pandas DataFrame by its columns and content.
+    """
+
+    digest = hashlib.sha256(
+        json.dumps([str(col) for col in dataframe.columns]).encode()
+    )
+    digest.update(
+        pd.util.hash_pandas_object(dataframe, index=True).to_numpy().tobytes()
+    )
+
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """
+    Records the committed chunks of each `files` entry in a local JSON file.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 5.0):
+        """
+        Records the committed chunks of each `files` entry in a local JSON file.
+        Chunks may commit out of order when loading concurrently, so only the contiguous
+        run of committed chunks from the start of an entry is considered safe to skip.
+
+        Attributes
+        ----------
+        path : str
+            The location of the checkpoint file. It is created if it does not exist.
+        flush_interval : float, optional
+            The minimum number of seconds between writes of the checkpoint file while recording chunks, by default 5.0
+        """
+
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._entries: Dict[str, Dict[str, Any]] = dict()
+
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._entries = json.load(f)["files"]
+
+    def reset(self) -> None:
+        """
+        Forget all recorded progress.
+        """
+
+        with self._lock:
+            self._entries = dict()
+        self.flush()
+
+    def _get_entry(self, key: str, fingerprint: str) -> Dict[str, Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            # the source changed, so previous progress no longer applies
+            entry = {
+                "fingerprint": fingerprint,
+                "committed_chunks": 0,
+                "pending_chunks": [],
+                "completed": False,
+            }
+            self._entries[key] = entry
+        return entry
+
+    def get_committed_chunks(self, key: str, fingerprint: str) -> int:
+        """
+        The number of chunks, counted from the start of the entry, that have been committed.
+        """
+
+        with self._lock:
+            return self._get_entry(key, fingerprint)["committed_chunks"]
+
+    def is_completed(self, key: str, fingerprint: str) -> bool:
+        """
+        Whether every chunk of the entry has been committed.
+        """
+
+        with self._lock:
+            return self._get_entry(key, fingerprint)["completed"]
+
+    def record_chunk(self, key: str, fingerprint: str, chunk: int) -> None:
+        """
+        Record that a chunk has been committed.
+        """
+
+        with self._lock:
+            entry = self._get_entry(key, fingerprint)
+            pending = set(entry["pending_chunks"])
+            pending.add(chunk)
+            while entry["committed_chunks"] in pending:
+                pending.remove(entry["committed_chunks"])
+                entry["committed_chunks"] += 1
+            entry["pending_chunks"] = sorted(pending)
+            flush = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if flush:
+            self.flush()
+
+    def record_completed(self, key: str, fingerprint: str) -> None:
+        """
+        Record that every chunk of the entry has been committed.
+        """
+
+        with self._lock:
+            self._get_entry(key, fingerprint)["completed"] = True
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the checkpoint file. The file is replaced atomically so it is never left partially written.
+        """
+
+        with self._lock:
+            content = json.dumps({"files": self._entries}, indent=2)
+            self._last_flush = time.monotonic()
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                f.write(content)
+            os.replace(temp_path, self.path)
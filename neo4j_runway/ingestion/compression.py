@@ -0,0 +1,136 @@
+"""
+This file contains the functions used to stream the decompressed content of PyIngest sources, including the members of archives.
+"""
+
+import bz2
+from contextlib import ExitStack
+import gzip
+import io
+import lzma
+import os
+import tarfile
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+import zipfile
+
+from ..resources.mappings import SOURCE_COMPRESSIONS_BY_EXTENSION
+
+COMPRESSIONS = ["gzip", "bz2", "xz", "zstd", "zip", "tar"]
+
+
+def get_compression(params: Dict[str, Any]) -> Optional[str]:
+    """
+    The compression of a `files` entry source. This is the `compression` of the entry if provided,
+    otherwise it is inferred from the file extension. None if the source is not compressed.
+    """
+    compression = (params["compression"] or "infer").lower()
+    if compression == "none":
+        return None
+    if compression == "infer":
+        url = params["url"].lower()
+        for extension, inferred in SOURCE_COMPRESSIONS_BY_EXTENSION.items():
+            if url.endswith(extension):
+                return inferred
+        return None
+    if compression not in COMPRESSIONS:
+        raise ValueError(
+            f"Unsupported compression {params['compression']} for {params['url']}. Supported compressions are {COMPRESSIONS}."
+        )
+    return compression
+
+
+def strip_compression_extension(url: str) -> str:
+    """
+    Remove a compression or archive extension from a url, so the format of the content may be inferred.
+    """
+    for extension in SOURCE_COMPRESSIONS_BY_EXTENSION:
+        if url.lower().endswith(extension):
+            return url[: -len(extension)]
+    return url
+
+
+def _open_zstd(fileobj: BinaryIO) -> BinaryIO:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "Reading zstd compressed sources requires zstandard. Please install it with `pip install neo4j-runway[ingest-zstd]`."
+        ) from e
+    return io.BufferedReader(
+        zstandard.ZstdDecompressor().stream_reader(fileobj, read_across_frames=True)
+    )
+
+
+class _ReadOnlyStream(io.RawIOBase):
+    """
+    Adapts a file object that only supports `read`, such as a member of a streamed tar archive.
+    """
+
+    def __init__(self, fileobj: Any):
+        self._fileobj = fileobj
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._fileobj.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _is_data_member(name: str) -> bool:
+    """
+    Skip directories and the hidden files that archiving tools add.
+    """
+    base_name = os.path.basename(name.rstrip("/"))
+    return (
+        not name.endswith("/")
+        and not base_name.startswith(".")
+        and not name.startswith("__MACOSX/")
+    )
+
+
+def iter_source_streams(params: Dict[str, Any]) -> Iterator[BinaryIO]:
+    """
+    Open the source of a `files` entry as binary streams of its decompressed content.
+    Archives yield one stream per file member, zip members in name order and tar members in stored order.
+    Other sources yield a single stream. Content is decompressed as it is read, so nothing is written to disk.
+    Each stream must be read before the next is requested.
+
+    Parameters
+    ----------
+    params : Dict[str, Any]
+        The settings of the `files` entry.
+
+    Returns
+    -------
+    Iterator[BinaryIO]
+        The decompressed streams.
+    """
+    compression = get_compression(params)
+
+    with ExitStack() as stack:
+        raw = stack.enter_context(open(params["url"], "rb"))
+        if compression is None:
+            yield raw
+        elif compression == "gzip":
+            # gzip and bz2 both read every member of concatenated files
+            yield stack.enter_context(gzip.GzipFile(fileobj=raw))
+        elif compression == "bz2":
+            yield stack.enter_context(bz2.BZ2File(raw))
+        elif compression == "xz":
+            yield stack.enter_context(lzma.LZMAFile(raw))
+        elif compression == "zstd":
+            yield stack.enter_context(_open_zstd(raw))
+        elif compression == "zip":
+            archive = stack.enter_context(zipfile.ZipFile(raw))
+            for name in sorted(archive.namelist()):
+                if _is_data_member(name):
+                    with archive.open(name) as member:
+                        yield member
+        elif compression == "tar":
+            # stream mode reads the archive front to back without seeking
+            archive = stack.enter_context(tarfile.open(fileobj=raw, mode="r|*"))
+            for member in archive:
+                if member.isfile() and _is_data_member(member.name):
+                    with archive.extractfile(member) as member_file:
+                        yield io.BufferedReader(_ReadOnlyStream(member_file))
@@ -0,0 +1,166 @@
+"""
+This file contains the client-side deduplication of ingestion rows.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .statements import get_statement_info
+
+DEFAULT_MAX_KEYS = 1_000_000
+# an initial load must remember every key, so it holds more keys by default
+INITIAL_LOAD_MAX_KEYS = 10_000_000
+
+
+class RowDeduplicator:
+    """
+    Drops rows whose key has already been sent.
+    """
+
+    def __init__(
+        self,
+        key_columns: Optional[List[str]] = None,
+        max_keys: int = DEFAULT_MAX_KEYS,
+        exact: bool = False,
+        strict: bool = False,
+    ):
+        """
+        Drops rows whose key has already been sent, across every chunk of a `files` entry.
+        Only a 64 bit hash of each key is kept. Once `max_keys` hashes are held no new keys are remembered,
+        so memory stays bounded and unremembered duplicates are simply sent again. Two distinct keys with the same
+        hash are very unlikely, but the second would be dropped.
+
+        An `exact` deduplicator never drops a distinct key. The key values are kept along with their hashes so that
+        colliding keys are told apart. A `strict` one also never sends a key twice, as is needed when each row CREATEs
+        an entity, so a ValueError is raised once more than `max_keys` keys are seen, rather than forgetting keys.
+
+        Attributes
+        ----------
+        key_columns : Optional[List[str]], optional
+            The columns that identify a row. If None, then every column of the row is used. By default None
+        max_keys : int, optional
+            The maximum number of keys to remember, by default 1,000,000
+        exact : bool, optional
+            Whether keys are compared by value rather than by hash. By default False
+        strict : bool, optional
+            Whether every key of an `exact` deduplicator must be remembered. By default False
+        """
+
+        self.key_columns = key_columns
+        self.max_keys = max_keys
+        self.exact = exact
+        self.strict = strict
+        self._seen: set = set()
+        # the key values of exact deduplication, by hash, and the keys whose hash was taken by another key
+        self._keys: Dict[int, tuple] = dict()
+        self._collided: set = set()
+
+    def filter(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep the first occurrence of each key that has not been seen in a previous chunk.
+        """
+
+        if len(rows) == 0:
+            return rows
+
+        key_columns = (
+            self.key_columns if self.key_columns is not None else list(rows.columns)
+        )
+        hashes = pd.util.hash_pandas_object(rows[key_columns], index=False).to_numpy()
+        if self.exact:
+            return rows[self._filter_exact(rows[key_columns], hashes)]
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        seen = self._seen
+        keep &= np.fromiter(
+            (key not in seen for key in hashes.tolist()), dtype=bool, count=len(hashes)
+        )
+
+        room = self.max_keys - len(seen)
+        if room > 0:
+            seen.update(hashes[keep][:room].tolist())
+
+        return rows[keep]
+
+    def _filter_exact(self, keys: pd.DataFrame, hashes: np.ndarray) -> np.ndarray:
+        """
+        Keep the first occurrence of each key value. Once `max_keys` keys are held, new keys are sent without being
+        remembered, or a ValueError is raised if `strict`.
+        """
+
+        values = keys.astype(object).where(keys.notna(), None)
+        seen = self._keys
+        keep = np.zeros(len(hashes), dtype=bool)
+        for idx, (key_hash, key) in enumerate(
+            zip(hashes.tolist(), values.itertuples(index=False, name=None))
+        ):
+            stored = seen.get(key_hash)
+            if stored == key or key in self._collided:
+                continue
+            keep[idx] = True
+            if len(seen) + len(self._collided) >= self.max_keys:
+                if self.strict:
+                    raise ValueError(
+                        f"Unable to remember more than {self.max_keys} keys, so duplicates may not be dropped. "
+                        "Please raise `dedup_max_keys` for this entry."
+                    )
+            elif stored is None:
+                seen[key_hash] = key
+            else:
+                self._collided.add(key)
+        return keep
+
+
+def get_deduplicator(params: Dict[str, Any]) -> Optional[RowDeduplicator]:
+    """
+    Build the deduplicator of a `files` entry from its `deduplicate` setting.
+        * `rows` drops rows identical to a previously sent row. Rows are compared by value, so this never changes the
+          loaded graph. Each remembered row is held in memory.
+        * `keys` (or True) drops rows whose node key, or relationship (source, target) keys, were already sent.
+          Only the first occurrence of a key sets its properties.
+
+    The deduplicator of an `initial_load` entry is exact and strict, since its statement creates an entity for every row
+    it is sent.
+
+    Parameters
+    ----------
+    params : Dict[str, Any]
+        The settings of the `files` entry.
+
+    Returns
+    -------
+    Optional[RowDeduplicator]
+        The deduplicator, or None if deduplication is disabled.
+    """
+
+    mode = params["deduplicate"]
+    if not mode:
+        return None
+    if mode is True:
+        mode = "keys"
+    if mode not in ["rows", "keys"]:
+        raise ValueError(
+            f"Unknown `deduplicate` setting {mode} for {params['url']}. Expected `rows` or `keys`."
+        )
+
+    key_columns = None
+    if mode == "keys":
+        info = get_statement_info(params["cql"])
+        if info.kind == "node" and info.key_columns:
+            key_columns = info.key_columns
+        elif (
+            info.kind == "relationship"
+            and info.source_key_columns
+            and info.target_key_columns
+        ):
+            key_columns = list(
+                dict.fromkeys(info.source_key_columns + info.target_key_columns)
+            )
+
+    return RowDeduplicator(
+        key_columns=key_columns,
+        max_keys=params["dedup_max_keys"],
+        exact=mode == "rows" or params.get("initial_load", False),
+        strict=params.get("initial_load", False),
+    )
@@ -0,0 +1,81 @@
+"""
+This file contains the scheduler that shares a connection pool fairly between concurrent ingests in one process.
+"""
+
+from contextlib import contextmanager
+import itertools
+import threading
+from typing import Any, Dict, Iterator, List, Tuple
+import weakref
+
+
+class FairScheduler:
+    """
+    Shares a fixed number of concurrent batches between the ingests that use it.
+    """
+
+    def __init__(self, max_concurrent_batches: int):
+        """
+        Shares a fixed number of concurrent batches between the ingests that use it.
+        When a slot frees up, it goes to the waiting ingest with the fewest batches in flight. Ties go to the
+        ingest that was granted a slot least recently, so tied ingests take turns. An ingest with many workers
+        therefore cannot starve the others of connections. Set `max_concurrent_batches` to at most the size of the shared
+        connection pool, so a batch never waits on the pool while holding a slot.
+
+        Attributes
+        ----------
+        max_concurrent_batches : int
+            The number of batches that may be written at once across every ingest.
+        """
+
+        if max_concurrent_batches < 1:
+            raise ValueError("`max_concurrent_batches` must be at least 1.")
+        self.max_concurrent_batches = max_concurrent_batches
+        self._condition = threading.Condition()
+        self._tickets = itertools.count()
+        # the (ingest, ticket) of each waiting batch
+        self._waiting: List[Tuple[Any, int]] = list()
+        self._granted: set = set()
+        self._grants = itertools.count()
+        # the grant number of the last slot given to each ingest, forgotten once the ingest is released
+        self._last_grants: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.active: Dict[Any, int] = dict()
+
+    def _grant(self) -> None:
+        while self._waiting and sum(self.active.values()) < self.max_concurrent_batches:
+            waiter = min(
+                self._waiting,
+                key=lambda waiter: (
+                    self.active.get(waiter[0], 0),
+                    self._last_grants.get(waiter[0], -1),
+                    waiter[1],
+                ),
+            )
+            self._waiting.remove(waiter)
+            self._granted.add(waiter[1])
+            self._last_grants[waiter[0]] = next(self._grants)
+            self.active[waiter[0]] = self.active.get(waiter[0], 0) + 1
+        self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, ingest: Any) -> Iterator[None]:
+        """
+        Wait for a slot to write a batch of `ingest`, holding it until the context exits.
+        `ingest` identifies the ingest, such as its `LocalServer`, and must support weak references.
+        """
+
+        with self._condition:
+            ticket = next(self._tickets)
+            self._waiting.append((ingest, ticket))
+            self._grant()
+            while ticket not in self._granted:
+                self._condition.wait()
+            self._granted.remove(ticket)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.active[ingest] -= 1
+                if self.active[ingest] == 0:
+                    del self.active[ingest]
+                self._grant()
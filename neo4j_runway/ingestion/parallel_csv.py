@@ -0,0 +1,230 @@
+"""
+This file contains the functions used to parse a single large CSV on a pool of processes.
+The file is split into byte ranges that start and end on row boundaries, and each range is parsed
+and converted to batches in its own process.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import io
+import multiprocessing
+import os
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+import warnings
+
+import pandas as pd
+
+from .casting import BATCH_PARAMS, cast_columns, to_batch
+
+RANGE_SIZE = 8 * 1024 * 1024
+BLOCK_SIZE = 1024 * 1024
+
+
+def find_range_offsets(
+    path: str, start: int, range_size: int = RANGE_SIZE, block_size: int = BLOCK_SIZE
+) -> List[int]:
+    """
+    Find the offsets that split a CSV into ranges of roughly `range_size` bytes.
+    Each offset is the start of a row. A newline inside a quoted field is not a row boundary,
+    so the quote parity is tracked from `start` to the end of the file.
+
+    Parameters
+    ----------
+    path : str
+        The path to the CSV.
+    start : int
+        The offset of the first row, after the header.
+    range_size : int, optional
+        The desired number of bytes in each range, by default 8 MiB
+    block_size : int, optional
+        The number of bytes to scan at once, by default 1 MiB
+
+    Returns
+    -------
+    List[int]
+        The offsets, starting with `start` and ending with the size of the file.
+    """
+
+    size = os.path.getsize(path)
+    offsets = [start]
+    target = start + range_size
+    in_quotes = False
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        while target < size:
+            block = f.read(block_size)
+            if not block:
+                break
+            search_from = max(target - position, 0)
+            while search_from < len(block):
+                newline = block.find(b"\n", search_from)
+                if newline == -1:
+                    break
+                if in_quotes == (block.count(b'"', 0, newline) % 2 == 0):
+                    # the newline is inside a quoted field
+                    search_from = newline + 1
+                    continue
+                offsets.append(position + newline + 1)
+                target = position + newline + 1 + range_size
+                search_from = max(target - position, newline + 1)
+            if block.count(b'"') % 2 == 1:
+                in_quotes = not in_quotes
+            position += len(block)
+
+    if offsets[-1] < size:
+        offsets.append(size)
+    return offsets
+
+
+def parse_range(
+    path: str,
+    header: List[str],
+    read_columns: Optional[List[str]],
+    field_sep: str,
+    chunk_size: int,
+    start: int,
+    end: int,
+    batch_params: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+    Parse the rows between two offsets of a CSV into batches of at most `chunk_size` rows, converted by `to_batch`
+    with the `batch_params` of the `files` entry.
+    This runs in a worker process, so the casts and the conversion to batches do not hold the writer's GIL.
+    """
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if not data.strip():
+        return list()
+
+    rows = pd.read_csv(
+        io.BytesIO(data),
+        dtype=str,
+        sep=field_sep,
+        on_bad_lines="skip",
+        index_col=False,
+        names=header,
+        usecols=read_columns,
+        low_memory=False,
+        engine="c",
+        header=None,
+        encoding="utf-8",
+    )
+    rows = cast_columns(rows, batch_params["column_types"])
+
+    return [
+        to_batch(rows.iloc[batch_start : batch_start + chunk_size], batch_params)
+        for batch_start in range(0, len(rows), chunk_size)
+    ]
+
+
+def check_not_bootstrapping() -> None:
+    """
+    Raise a RuntimeError in a spawned worker process that is importing the main module of a program that does not guard
+    its entry point with `if __name__ == "__main__":`. The ingest then stops in the worker before it has any side
+    effects, and the parent process parses the CSV itself.
+    """
+    # set by multiprocessing while a spawned process prepares, as it does to refuse starting processes of its own
+    if getattr(multiprocessing.current_process(), "_inheriting", False):
+        raise RuntimeError(
+            "An ingest may not be started while a worker process imports the main module of the program. "
+            'Please guard the entry point of the program with `if __name__ == "__main__":` to parse in parallel.'
+        )
+
+
+def iter_parallel_csv_batches(
+    params: Dict[str, Any], processes: int
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Parse the CSV of a `files` entry on `processes` worker processes, yielding numbered batches in file order.
+    At most `processes` + 1 ranges are parsed or waiting at once, which bounds memory use.
+    Batches are numbered by their position in the file, which does not depend on the number of processes.
+
+    Worker processes are started with spawn, which imports the main module of the program again. If the program does
+    not guard its entry point with `if __name__ == "__main__":`, then the workers fail to start. `PyIngest` and
+    `AsyncPyIngest` raise in the workers before any side effects, with `check_not_bootstrapping`. The remaining ranges
+    are then parsed in this process, with a warning, so the batches are the same.
+
+    Parameters
+    ----------
+    params : Dict[str, Any]
+        The settings of the `files` entry.
+    processes : int
+        The number of worker processes.
+
+    Returns
+    -------
+    Iterator[Tuple[int, Dict[str, Any]]]
+        The batch number with the batch, as returned by `to_batch`.
+    """
+
+    with open(params["url"], "rb") as f:
+        header_line = f.readline()
+    header = header_line.decode("utf-8").strip().split(params["field_sep"])
+    read_columns = (
+        [col for col in header if col in params["columns"]]
+        if params["columns"] is not None
+        else None
+    )
+    offsets = find_range_offsets(
+        params["url"], start=len(header_line), range_size=RANGE_SIZE
+    )
+    ranges = list(zip(offsets[:-1], offsets[1:]))
+
+    range_args = [
+        (
+            params["url"],
+            header,
+            read_columns,
+            params["field_sep"],
+            params["chunk_size"],
+            start,
+            end,
+            {key: params[key] for key in BATCH_PARAMS},
+        )
+        for start, end in ranges
+    ]
+
+    # the driver runs threads, which are not safe to fork
+    context = multiprocessing.get_context("spawn")
+    batch_idx = 0
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        pending: Deque[Tuple[int, Future]] = deque()
+        next_range = 0
+        try:
+            while pending or next_range < len(ranges):
+                while next_range < len(ranges) and len(pending) <= processes:
+                    pending.append(
+                        (
+                            next_range,
+                            executor.submit(parse_range, *range_args[next_range]),
+                        )
+                    )
+                    next_range += 1
+                range_idx, future = pending.popleft()
+                try:
+                    batches = future.result()
+                except BrokenProcessPool:
+                    warnings.warn(
+                        f"Unable to parse {params['url']} on {processes} processes, so it is parsed by a single process. "
+                        'Please guard the entry point of the program with `if __name__ == "__main__":` to parse in parallel.'
+                    )
+                    break
+                for batch in batches:
+                    yield batch_idx, batch
+                    batch_idx += 1
+            else:
+                return
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    # the pool could not be used, so the ranges from the failed one onwards are parsed here
+    for args in range_args[range_idx:]:
+        for batch in parse_range(*args):
+            yield batch_idx, batch
+            batch_idx += 1
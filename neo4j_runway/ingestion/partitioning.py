@@ -0,0 +1,173 @@
+"""
+This file contains the functions used to split ingestion batches so they may be written concurrently
+without competing for the same locks.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .casting import to_records
+
+
+def _hash_keys(rows: pd.DataFrame, key_columns: List[str]) -> np.ndarray:
+    """
+    Hash the key columns of each row. The hash depends only on the values, so the same key
+    found in differently named columns has the same hash.
+    """
+
+    return pd.util.hash_pandas_object(rows[key_columns], index=False).to_numpy()
+
+
+def hash_partition_rows(
+    rows: pd.DataFrame, key_columns: List[str], partitions: int
+) -> List[pd.DataFrame]:
+    """
+    Split rows into partitions based on a hash of the key columns.
+    Rows with the same key are always placed in the same partition, across every chunk of a file.
+
+    Parameters
+    ----------
+    rows : pd.DataFrame
+        The rows to partition.
+    key_columns : List[str]
+        The columns that identify a node. These are the columns of `Node.node_keys` or `Node.unique_properties`.
+    partitions : int
+        The number of partitions.
+
+    Returns
+    -------
+    List[pd.DataFrame]
+        A list of length `partitions`. Partitions may be empty.
+    """
+
+    assignments = _hash_keys(rows, key_columns) % partitions
+
+    return [rows[assignments == partition] for partition in range(partitions)]
+
+
+def bucket_relationship_rows(
+    rows: pd.DataFrame,
+    source_key_columns: List[str],
+    target_key_columns: List[str],
+    partitions: int,
+) -> Dict[Tuple[int, int], pd.DataFrame]:
+    """
+    Split relationship rows into (source partition, target partition) buckets.
+    All rows that touch a given node are found in buckets sharing that node's partition.
+
+    Parameters
+    ----------
+    rows : pd.DataFrame
+        The rows to bucket.
+    source_key_columns : List[str]
+        The columns that identify the source node.
+    target_key_columns : List[str]
+        The columns that identify the target node.
+    partitions : int
+        The number of partitions for each endpoint.
+
+    Returns
+    -------
+    Dict[Tuple[int, int], pd.DataFrame]
+        A map of (source partition, target partition) to the rows in that bucket. Empty buckets are omitted.
+    """
+
+    source_partitions = _hash_keys(rows, source_key_columns) % partitions
+    target_partitions = _hash_keys(rows, target_key_columns) % partitions
+    bucket_ids = source_partitions * partitions + target_partitions
+
+    return {
+        (int(bucket_id // partitions), int(bucket_id % partitions)): rows[
+            bucket_ids == bucket_id
+        ]
+        for bucket_id in np.unique(bucket_ids)
+    }
+
+
+def schedule_buckets(
+    buckets: Iterable[Tuple[int, int]], same_label: bool = False
+) -> List[List[Tuple[int, int]]]:
+    """
+    Arrange buckets into rounds. Buckets in the same round never share a source or target partition,
+    so they may be written concurrently. Rounds must be written one after another.
+
+    Parameters
+    ----------
+    buckets : Iterable[Tuple[int, int]]
+        The (source partition, target partition) buckets to schedule.
+    same_label : bool, optional
+        Whether the source and target nodes have the same label. If True, then a source partition
+        also conflicts with the same target partition. By default False
+
+    Returns
+    -------
+    List[List[Tuple[int, int]]]
+        The rounds of buckets.
+    """
+
+    def locks(bucket: Tuple[int, int]) -> set:
+        if same_label:
+            return {bucket[0], bucket[1]}
+        return {("source", bucket[0]), ("target", bucket[1])}
+
+    buckets = list(buckets)
+    if not buckets:
+        return list()
+    size = max([max(bucket) for bucket in buckets]) + 1
+
+    # visit buckets by wrapped diagonal, each diagonal is a full round of disjoint buckets
+    remaining = sorted(
+        buckets, key=lambda bucket: ((bucket[1] - bucket[0]) % size, bucket[0])
+    )
+    rounds = list()
+    while remaining:
+        held: set = set()
+        current, deferred = list(), list()
+        for bucket in remaining:
+            if locks(bucket) & held:
+                deferred.append(bucket)
+            else:
+                held |= locks(bucket)
+                current.append(bucket)
+        rounds.append(current)
+        remaining = deferred
+
+    return rounds
+
+
+def group_rows_by_source(
+    rows: pd.DataFrame,
+    source_key_columns: List[str],
+    column_types: Optional[Dict[str, str]] = None,
+    sparse: bool = False,
+    key_columns: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Collapse relationship rows that share a source node into a single group.
+    Each group is formatted as {"rows": [...]}, for use with a grouped relationship statement.
+
+    Parameters
+    ----------
+    rows : pd.DataFrame
+        The rows to group.
+    source_key_columns : List[str]
+        The columns that identify the source node.
+    column_types : Optional[Dict[str, str]], optional
+        The client side casts of the `files` entry, which decide how missing values are sent. By default None
+    sparse : bool, optional
+        Whether missing values are left out of each row. By default False
+    key_columns : Optional[List[str]], optional
+        The columns that identify the source and target nodes, which are sent even if `sparse`. By default None
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The groups of rows.
+    """
+
+    return [
+        {"rows": to_records(group, column_types, sparse, key_columns)}
+        for _, group in rows.groupby(source_key_columns, sort=False, dropna=False)
+    ]
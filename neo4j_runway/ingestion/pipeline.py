@@ -0,0 +1,169 @@
+"""
+This file contains the pipeline that overlaps reading, converting and sending the batches of a PyIngest `files` entry.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+import pandas as pd
+
+DEFAULT_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+QUEUE_DEPTH = 4
+
+
+class MemoryBudget:
+    """
+    Limits the estimated number of bytes held by the batches between reading and sending.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Limits the estimated number of bytes held by the batches between reading and sending.
+        A batch larger than the budget is still admitted once nothing else is in flight.
+
+        Attributes
+        ----------
+        max_bytes : int
+            The maximum number of bytes in flight.
+        """
+
+        self.max_bytes = max_bytes
+        self.used = 0
+        self._cancelled = False
+        self._condition = threading.Condition()
+
+    def acquire(self, size: int) -> bool:
+        """
+        Wait until `size` bytes fit in the budget. Returns False if the pipeline was cancelled.
+        """
+
+        with self._condition:
+            while (
+                not self._cancelled
+                and self.used > 0
+                and self.used + size > self.max_bytes
+            ):
+                self._condition.wait()
+            if self._cancelled:
+                return False
+            self.used += size
+            return True
+
+    def release(self, size: int) -> None:
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+
+
+def get_rows_size(rows: pd.DataFrame) -> int:
+    """
+    Estimate the number of bytes held by a chunk of rows.
+    """
+    return int(rows.memory_usage(index=False, deep=True).sum())
+
+
+def iter_pipelined(
+    items: Iterable[Any],
+    transform: Callable[[Any], Any],
+    get_size: Callable[[Any], int],
+    max_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+    depth: int = QUEUE_DEPTH,
+) -> Iterator[Any]:
+    """
+    Run the read and transform stages of a pipeline on their own threads, yielding the transformed items in order
+    to the send stage, the caller. The stages are connected by queues of at most `depth` items, and reading waits
+    while the items that were read but not yet sent exceed `max_bytes`. An item is considered sent once the next
+    item is requested, so a slow database holds back reading instead of filling memory.
+    Errors raised by a stage are raised to the caller. Close the iterator to stop the stages early.
+
+    Parameters
+    ----------
+    items : Iterable[Any]
+        The items to read. This is iterated on the read thread.
+    transform : Callable[[Any], Any]
+        The conversion applied to each item on the transform thread.
+    get_size : Callable[[Any], int]
+        Estimates the number of bytes held by an item.
+    max_bytes : int, optional
+        The maximum number of bytes in flight, by default 256 MiB
+    depth : int, optional
+        The maximum number of items waiting in each queue, by default 4
+
+    Returns
+    -------
+    Iterator[Any]
+        The transformed items.
+    """
+
+    budget = MemoryBudget(max_bytes=max_bytes)
+    stopped = threading.Event()
+    read_queue: queue.Queue = queue.Queue(maxsize=depth)
+    send_queue: queue.Queue = queue.Queue(maxsize=depth)
+
+    def put(stage_queue: queue.Queue, entry: Tuple[str, Any, int]) -> bool:
+        while not stopped.is_set():
+            try:
+                stage_queue.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read() -> None:
+        try:
+            for item in items:
+                size = get_size(item)
+                if not budget.acquire(size) or not put(
+                    read_queue, ("item", item, size)
+                ):
+                    return
+        except BaseException as e:
+            put(read_queue, ("error", e, 0))
+            return
+        put(read_queue, ("done", None, 0))
+
+    def convert() -> None:
+        while not stopped.is_set():
+            try:
+                kind, value, size = read_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if kind == "item":
+                try:
+                    value = transform(value)
+                except BaseException as e:
+                    kind, value = "error", e
+            if not put(send_queue, (kind, value, size)) or kind != "item":
+                return
+
+    threads = [
+        threading.Thread(target=read, daemon=True),
+        threading.Thread(target=convert, daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    sent_size = 0
+    try:
+        while True:
+            # the previous item has been sent
+            budget.release(sent_size)
+            sent_size = 0
+            kind, value, size = send_queue.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            sent_size = size
+            yield value
+    finally:
+        stopped.set()
+        budget.cancel()
+        for thread in threads:
+            thread.join()
@@ -2,17 +2,57 @@
 This is a modified PyIngest file for Neo4j Runway. It currently only supports Pandas DataFrame and CSV ingestion.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager, nullcontext
 import datetime
-from typing import Optional, Union
+import queue
+import signal
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import warnings
 
-from neo4j import GraphDatabase
-import numpy as np
+from neo4j import Driver, GraphDatabase, Query, unit_of_work
+from neo4j.exceptions import DriverError, Neo4jError
 import pandas as pd
 import yaml
 
+from .batching import BatchSizeController, is_memory_error
+from .compression import get_compression
+from .casting import cast_columns, get_batch_size, get_column_types, to_batch
+from .checkpoint import (
+    CheckpointStore,
+    get_dataframe_fingerprint,
+    get_file_entry_key,
+    get_file_fingerprint,
+)
+from .dedup import DEFAULT_MAX_KEYS, INITIAL_LOAD_MAX_KEYS, get_deduplicator
+from .fairness import FairScheduler
+from .parallel_csv import check_not_bootstrapping, iter_parallel_csv_batches
+from .report import BatchReport, IngestReport, get_counters
+from .pipeline import DEFAULT_MAX_INFLIGHT_BYTES, get_rows_size, iter_pipelined
+from .partitioning import (
+    bucket_relationship_rows,
+    group_rows_by_source,
+    hash_partition_rows,
+    schedule_buckets,
+)
+from .scheduler import (
+    count_leading_node_entries,
+    plan_read_passes,
+    run_with_dependencies,
+)
+from .sources import get_source_format, iter_source_chunks
+from .statements import (
+    StatementInfo,
+    get_grouped_relationship_statement,
+    get_statement_info,
+    is_call_in_transactions,
+)
 
 global_config = dict()
+# counts the nodes from the count store, without scanning them
+COUNT_NODES_QUERY = "MATCH (n) RETURN count(n) AS nodes"
 
 
 class LocalServer(object):
@@ -20,96 +60,660 @@ class LocalServer(object):
     Handles data ingestion.
     """
 
-    def __init__(self):
-        self._driver = GraphDatabase.driver(
-            global_config["server_uri"],
-            auth=(global_config["admin_user"], global_config["admin_pass"]),
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        driver: Optional[Driver] = None,
+        driver_config: Optional[Dict[str, Any]] = None,
+        scheduler: Optional[FairScheduler] = None,
+    ):
+        # each server keeps its own configuration, so ingests may run concurrently in one process
+        self.config = config if config is not None else global_config
+        # an injected driver belongs to the caller, so it is reused and left open
+        self._owns_driver = driver is None
+        self._driver = driver or GraphDatabase.driver(
+            self.config["server_uri"],
+            auth=(self.config["admin_user"], self.config["admin_pass"]),
+            **get_driver_config(self.config, driver_config),
         )
+        self.scheduler = scheduler
         self.db_config = {}
-        self.database = (
-            global_config["database"] if "database" in global_config else None
-        )
+        self.database = self.config["database"] if "database" in self.config else None
         if self.database is not None:
             self.db_config["database"] = self.database
-        self.basepath = (
-            global_config["basepath"] if "basepath" in global_config else None
-        )
+        self.basepath = self.config["basepath"] if "basepath" in self.config else None
+        self.initial_load = bool(self.config.get("initial_load"))
+        self.checkpoint: Optional[CheckpointStore] = None
+        self.stop_event = threading.Event()
+        self._dataframe_fingerprints: Dict[int, str] = dict()
+        self.target_batch_latency: Optional[float] = None
+        self.parse_processes = 1
+        self.max_inflight_bytes = DEFAULT_MAX_INFLIGHT_BYTES
+        self.report = IngestReport()
+        # the batch sizes chosen for entries loaded with adaptive batching
+        self.batch_sizes: List[Dict[str, Any]] = list()
+        self._batch_sizes_lock = threading.Lock()
 
     def close(self):
-        self._driver.close()
+        if self._owns_driver:
+            self._driver.close()
 
     def get_params(self, file):
-        params = dict()
-        params["skip_records"] = file.get("skip_records") or 0
-        params["compression"] = file.get("compression") or "none"
-
-        file_url = file["url"]
-        if self.basepath and file_url.startswith("$BASE"):
-            file_url = file_url.replace("$BASE", self.basepath, 1)
-        params["url"] = file_url
-        print("File {}", params["url"])
-        params["cql"] = file["cql"]
-        params["chunk_size"] = file.get("chunk_size") or 1000
-        params["field_sep"] = file.get("field_separator") or ","
+        params = get_file_params(
+            file, basepath=self.basepath, initial_load=self.initial_load
+        )
+        if params["target_batch_latency"] is None:
+            params["target_batch_latency"] = self.target_batch_latency
+        if params["parse_processes"] is None:
+            params["parse_processes"] = self.parse_processes
+        if params["max_inflight_bytes"] is None:
+            params["max_inflight_bytes"] = self.max_inflight_bytes
         return params
 
-    def load_dataframe(self, file, dataframe: pd.DataFrame) -> None:
+    def load_dataframe(
+        self, file, dataframe: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+    ) -> None:
         """
-        Load a Pandas DataFrame directly using a PyIngest yaml global_config file.
+        Load a Pandas DataFrame, or an iterable of DataFrames, directly using a PyIngest yaml config file.
         """
-        with self._driver.session(**self.db_config) as session:
-            params = self.get_params(file)
+        params = self.get_params(file)
+        if not self._should_load(params, dataframe=dataframe):
+            return
 
-            partition = max(1, int(len(dataframe) / params["chunk_size"]))
+        with self._report_files([params]):
+            self.load_chunks(
+                params, iter_dataframe_chunks(dataframe, params["chunk_size"])
+            )
 
-            for i, rows in enumerate(np.array_split(dataframe, partition)):
-                print("loading...", i, datetime.datetime.now(), flush=True)
-                # Chunk up the rows to enable additional fastness :-)
-                rows_dict = {"rows": rows.fillna(value="").to_dict("records")}
-                session.run(params["cql"], dict=rows_dict).consume()
+    def load_csv(self, file):
+        """
+        Load the source file of a `files` entry. Despite the name, CSV, Parquet, Arrow IPC
+        and JSON Lines sources are supported, selected by the `format` of the entry or the file extension.
+        """
+        params = self.get_params(file)
+        parse_in_parallel = self._can_parse_in_parallel(params)
+        if parse_in_parallel:
+            params["checkpoint_key"] = get_file_entry_key(params, byte_ranges=True)
 
-        print("{} : Completed file", datetime.datetime.now())
+        # check if we load this file...
+        if not self._should_load(params):
+            return
+        with self._report_files([params]):
+            if parse_in_parallel:
+                self._load_parallel_csv(params)
+            else:
+                with closing(iter_source_chunks(params)) as row_chunks:
+                    self.load_chunks(params, row_chunks)
 
-    def load_csv(self, file):
-        with self._driver.session(**self.db_config) as session:
-            params = self.get_params(file)
+    @contextmanager
+    def _report_files(self, entries: List[Dict[str, Any]]) -> Iterator[None]:
+        """
+        Time the loading of `files` entries for the ingest report.
+        """
+        for params in entries:
+            self.report.start_file(params)
+        completed = False
+        try:
+            yield
+            completed = not self.stop_event.is_set()
+        finally:
+            for params in entries:
+                self.report.finish_file(params, completed=completed)
+        if completed:
+            for params in entries:
+                print(f"{datetime.datetime.now()} : Completed file {params['url']}")
 
-            # check if we load this file...
-            skip = params["skip_file"] if "skip_file" in params else False
-            if skip:
-                return
-            with open(params["url"]) as openfile:
-                # Grab the header from the file and pass that to pandas.  This allow the header
-                # to be applied even if we are skipping lines of the file
-                header = str(openfile.readline()).strip().split(params["field_sep"])
-
-                # Pandas' read_csv method is highly optimized and fast :-)
-                row_chunks = pd.read_csv(
-                    openfile,
-                    dtype=str,
-                    sep=params["field_sep"],
-                    on_bad_lines="skip",
-                    index_col=False,
-                    skiprows=params["skip_records"],
-                    names=header,
-                    low_memory=False,
-                    engine="c",
-                    compression="infer",
-                    header=None,
-                    chunksize=params["chunk_size"],
+    def _can_parse_in_parallel(self, params) -> bool:
+        """
+        Whether the CSV of an entry may be parsed in byte ranges on `parse_processes` processes.
+        This requires an uncompressed CSV read with the default engine from the first record, written
+        by a single session in fixed size batches without deduplication.
+        """
+        return (
+            params["parse_processes"] > 1
+            and get_source_format(params) == "csv"
+            and params["csv_engine"] == "c"
+            and get_compression(params) is None
+            and params["skip_records"] == 0
+            and params["partitions"] == 1
+            and params["target_batch_latency"] is None
+            and not params["deduplicate"]
+        )
+
+    def _load_parallel_csv(self, params) -> None:
+        """
+        Write the batches parsed from byte ranges of the CSV by a pool of processes.
+        The batches are converted in the worker processes, so the writer only sends them.
+        """
+        committed = (
+            self.checkpoint.get_committed_chunks(
+                params["checkpoint_key"], params["fingerprint"]
+            )
+            if self.checkpoint is not None
+            else 0
+        )
+        if committed > 0:
+            print(f"{params['url']} : Resuming after chunk {committed - 1}")
+
+        batches = iter_parallel_csv_batches(params, processes=params["parse_processes"])
+        with closing(batches), self._driver.session(**self.db_config) as session:
+            for i, batch in batches:
+                if self.stop_event.is_set():
+                    break
+                if i < committed:
+                    continue
+                print(params["url"], i, datetime.datetime.now(), flush=True)
+                self._run_batch(session, params, batch, metadata={"chunk": i})
+                self._record_chunks(params, [i])
+
+        if self.checkpoint is not None and not self.stop_event.is_set():
+            self.checkpoint.record_completed(
+                params["checkpoint_key"], params["fingerprint"]
+            )
+
+    def load_shared_read(
+        self,
+        files: List[Dict[str, Any]],
+        dataframe: Optional[Union[pd.DataFrame, Iterable[pd.DataFrame]]] = None,
+    ) -> None:
+        """
+        Load several `files` entries that read the same source from a single read.
+        Each chunk is parsed once and written with every entry's statement, in the configured order,
+        before the next chunk is read. Only the union of the entries' columns is read.
+        """
+        if len(files) == 1:
+            if dataframe is not None:
+                self.load_dataframe(files[0], dataframe=dataframe)
+            else:
+                self.load_csv(files[0])
+            return
+
+        entries = [
+            params
+            for params in [self.get_params(file) for file in files]
+            if self._should_load(params, dataframe=dataframe)
+        ]
+        if not entries:
+            return
+        committed = [
+            (
+                self.checkpoint.get_committed_chunks(
+                    params["checkpoint_key"], params["fingerprint"]
                 )
+                if self.checkpoint is not None
+                else 0
+            )
+            for params in entries
+        ]
+        deduplicators = [get_deduplicator(params) for params in entries]
+
+        read_params = dict(entries[0])
+        if all([params["columns"] is not None for params in entries]):
+            read_params["columns"] = sorted(
+                set().union(*[params["columns"] for params in entries])
+            )
+        else:
+            read_params["columns"] = None
+
+        if dataframe is not None:
+            row_chunks = iter_dataframe_chunks(dataframe, read_params["chunk_size"])
+        else:
+            row_chunks = iter_source_chunks(read_params)
+
+        with closing(row_chunks), self._report_files(entries), self._driver.session(
+            **self.db_config
+        ) as session:
+            for i, rows in enumerate(row_chunks):
+                if self.stop_event.is_set():
+                    break
+                if i < min(committed) and all([d is None for d in deduplicators]):
+                    continue
+                print(read_params["url"], i, datetime.datetime.now(), flush=True)
+                for params, entry_committed, deduplicator in zip(
+                    entries, committed, deduplicators
+                ):
+                    entry_rows = project_columns(rows, params["columns"])
+                    if deduplicator is not None:
+                        entry_rows = deduplicator.filter(entry_rows)
+                    # the keys of committed chunks are still remembered, so they are not sent again
+                    if i < entry_committed:
+                        continue
+                    if len(entry_rows) > 0:
+                        entry_rows = cast_columns(entry_rows, params["column_types"])
+                        self._run_batch(
+                            session,
+                            params,
+                            to_batch(entry_rows, params),
+                            metadata={"chunk": i},
+                        )
+                    self._record_chunks(params, [i])
 
-                for i, rows in enumerate(row_chunks):
-                    print(params["url"], i, datetime.datetime.now(), flush=True)
+        if self.checkpoint is not None and not self.stop_event.is_set():
+            for params in entries:
+                self.checkpoint.record_completed(
+                    params["checkpoint_key"], params["fingerprint"]
+                )
+
+    def load_chunks(self, params, row_chunks: Iterable[pd.DataFrame]) -> None:
+        """
+        Write each chunk of rows with the file's statement.
+        Node statements are written by `partitions` concurrent sessions if configured.
+        Otherwise, if a `target_batch_latency` is set, the rows are regrouped into adaptively sized batches.
+        Otherwise, the chunks are read, converted to records and sent by the stages of a pipeline, so parsing
+        overlaps with commits. At most `max_inflight_bytes` of rows are held between reading and sending.
+        """
+        info = get_statement_info(params["cql"])
+        chunks = self._iter_chunks(params, row_chunks)
+        if params["partitions"] > 1 and info.kind == "node" and info.key_columns:
+            self._load_partitioned_chunks(params, chunks, info.key_columns)
+        elif (
+            params["partitions"] > 1
+            and info.kind == "relationship"
+            and info.source_key_columns
+            and info.target_key_columns
+        ):
+            self._load_bucketed_relationship_chunks(params, chunks, info)
+        elif params["target_batch_latency"] is not None:
+            self._load_adaptive_chunks(params, chunks)
+        else:
+            batches = iter_pipelined(
+                chunks,
+                transform=lambda chunk: (
+                    chunk[0],
+                    to_batch(chunk[1], params),
+                ),
+                get_size=lambda chunk: get_rows_size(chunk[1]),
+                max_bytes=params["max_inflight_bytes"],
+            )
+            with closing(batches), self._driver.session(**self.db_config) as session:
+                for i, batch in batches:
+                    # batches read ahead are dropped once a shutdown is requested
+                    if self.stop_event.is_set():
+                        break
                     # Chunk up the rows to enable additional fastness :-)
-                    rows_dict = {"rows": rows.fillna(value="").to_dict("records")}
-                    session.run(params["cql"], dict=rows_dict).consume()
+                    if get_batch_size(batch) > 0:
+                        self._run_batch(session, params, batch, metadata={"chunk": i})
+                    self._record_chunks(params, [i])
+
+        if self.checkpoint is not None and not self.stop_event.is_set():
+            self.checkpoint.record_completed(
+                params["checkpoint_key"], params["fingerprint"]
+            )
 
-        print("{} : Completed file", datetime.datetime.now())
+    def _iter_chunks(
+        self, params, row_chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """
+        Number the chunks, skipping chunks committed by a previous run.
+        Stops early if a shutdown was requested.
+        """
+        committed = (
+            self.checkpoint.get_committed_chunks(
+                params["checkpoint_key"], params["fingerprint"]
+            )
+            if self.checkpoint is not None
+            else 0
+        )
+        if committed > 0:
+            print(f"{params['url']} : Resuming after chunk {committed - 1}")
+        deduplicator = get_deduplicator(params)
+        for i, rows in enumerate(row_chunks):
+            if self.stop_event.is_set():
+                return
+            if i < committed:
+                # the keys of committed chunks are still remembered, so they are not sent again
+                if deduplicator is not None:
+                    deduplicator.filter(project_columns(rows, params["columns"]))
+                continue
+            print(params["url"], i, datetime.datetime.now(), flush=True)
+            rows = project_columns(rows, params["columns"])
+            if deduplicator is not None:
+                rows = deduplicator.filter(rows)
+            yield i, cast_columns(rows, params["column_types"])
+
+    def _should_load(self, params, dataframe: Optional[pd.DataFrame] = None) -> bool:
+        """
+        Whether an entry must be loaded. Sets the source fingerprint used by the checkpoint.
+        """
+        if params["skip_file"]:
+            return False
+        if self.checkpoint is not None:
+            if dataframe is not None:
+                if id(dataframe) not in self._dataframe_fingerprints:
+                    self._dataframe_fingerprints[id(dataframe)] = (
+                        get_dataframe_fingerprint(dataframe)
+                    )
+                params["fingerprint"] = self._dataframe_fingerprints[id(dataframe)]
+            else:
+                params["fingerprint"] = get_file_fingerprint(params["url"])
+            if self._is_completed(params):
+                return False
+        return True
+
+    def _record_chunks(self, params, chunks: Iterable[int]) -> None:
+        if self.checkpoint is not None:
+            for chunk in chunks:
+                self.checkpoint.record_chunk(
+                    params["checkpoint_key"], params["fingerprint"], chunk
+                )
+
+    def _is_completed(self, params) -> bool:
+        if self.checkpoint.is_completed(
+            params["checkpoint_key"], params["fingerprint"]
+        ):
+            print(f"{params['url']} : Already loaded, skipping file")
+            return True
+        return False
+
+    def _run_batch(
+        self,
+        session,
+        params,
+        batch: Dict[str, Any],
+        metadata: Dict[str, Any],
+        cql: Optional[str] = None,
+        raise_memory_errors: bool = False,
+        row_count: Optional[int] = None,
+    ) -> None:
+        """
+        Write a batch, the `$dict` parameter of the statement, in a managed write transaction.
+        The driver retries transient failures within `execute_write`. If the batch still fails with a
+        retryable error, it is retried up to `max_retries` times with exponential backoff starting at `retry_delay` seconds.
+        If `raise_memory_errors` is True, then memory limit errors are raised immediately so the batch may be split instead.
+        Transactions are tagged with the file and chunk so they may be identified in `SHOW TRANSACTIONS`.
+        A statement that uses `CALL { ... } IN TRANSACTIONS` commits its own transactions, so it is run in an
+        auto-commit transaction instead.
+        The timing, retries and update counters of the committed batch are added to the ingest report.
+        `row_count` is the number of rows in the batch if the rows are grouped.
+        """
+
+        @unit_of_work(
+            metadata=get_transaction_metadata(params, metadata),
+            timeout=params["transaction_timeout"],
+        )
+        def write_rows(tx) -> Any:
+            return tx.run(cql or params["cql"], dict=batch).consume()
+
+        def write_rows_auto_commit() -> Any:
+            query = Query(
+                cql or params["cql"],
+                metadata=get_transaction_metadata(params, metadata),
+                timeout=params["transaction_timeout"],
+            )
+            return session.run(query, dict=batch).consume()
+
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            try:
+                with (
+                    self.scheduler.slot(self)
+                    if self.scheduler is not None
+                    else nullcontext()
+                ):
+                    summary = (
+                        write_rows_auto_commit()
+                        if params["call_in_transactions"]
+                        else session.execute_write(write_rows)
+                    )
+                self.report.record_batch(
+                    params,
+                    BatchReport(
+                        metadata=metadata,
+                        rows=(
+                            row_count
+                            if row_count is not None
+                            else get_batch_size(batch)
+                        ),
+                        seconds=time.perf_counter() - start,
+                        retries=attempt,
+                        counters=get_counters(summary),
+                    ),
+                )
+                return
+            except (DriverError, Neo4jError) as e:
+                if raise_memory_errors and is_memory_error(e):
+                    raise
+                time.sleep(get_retry_delay(params, attempt, e, metadata))
+                attempt += 1
+
+    def _load_adaptive_chunks(
+        self, params, chunks: Iterable[Tuple[int, pd.DataFrame]]
+    ) -> None:
+        """
+        Regroup the rows of the chunks into batches sized by a `BatchSizeController`.
+        Small chunks are combined into a single transaction and large chunks are split.
+        A chunk is only recorded in the checkpoint once all of its rows are committed.
+        """
+        controller = BatchSizeController(
+            initial_size=params["chunk_size"],
+            target_latency=params["target_batch_latency"],
+        )
+        buffer = pd.DataFrame()
+        # the index of each buffered chunk with the number of rows read up to its end
+        chunk_ends: List[Tuple[int, int]] = list()
+        read_rows, sent_rows = 0, 0
+
+        def send(session) -> None:
+            nonlocal buffer, sent_rows
+            batch = buffer.iloc[: controller.size]
+            metadata = {"chunk": chunk_ends[0][0], "batch_size": len(batch)}
+            start = time.perf_counter()
+            try:
+                self._run_batch(
+                    session,
+                    params,
+                    to_batch(batch, params),
+                    metadata=metadata,
+                    raise_memory_errors=True,
+                )
+            except Neo4jError as e:
+                if not is_memory_error(e) or not controller.record_memory_error():
+                    raise
+                warnings.warn(
+                    f"Batch {metadata} of {params['url']} exceeded the memory limit. Retrying with {controller.size} rows."
+                )
+                return
+            controller.record_success(len(batch), time.perf_counter() - start)
+            buffer = buffer.iloc[len(batch) :]
+            sent_rows += len(batch)
+            committed = [i for i, end in chunk_ends if end <= sent_rows]
+            del chunk_ends[: len(committed)]
+            self._record_chunks(params, committed)
+
+        with self._driver.session(**self.db_config) as session:
+            for i, rows in chunks:
+                buffer = pd.concat([buffer, rows]) if len(buffer) > 0 else rows
+                read_rows += len(rows)
+                chunk_ends.append((i, read_rows))
+                while read_rows - sent_rows >= controller.size:
+                    send(session)
+            while read_rows > sent_rows:
+                send(session)
+        # chunks left without rows
+        self._record_chunks(params, [i for i, _ in chunk_ends])
+
+        with self._batch_sizes_lock:
+            self.batch_sizes.append(
+                {
+                    "url": params["url"],
+                    "cql": params["cql"],
+                    "batch_size": controller.size,
+                    "batches": len(controller.latencies),
+                    "mean_latency": (
+                        sum(controller.latencies) / len(controller.latencies)
+                        if controller.latencies
+                        else None
+                    ),
+                }
+            )
+
+    def _load_partitioned_chunks(
+        self,
+        params,
+        chunks: Iterable[Tuple[int, pd.DataFrame]],
+        key_columns: List[str],
+    ) -> None:
+        """
+        Hash partition each chunk on the node key columns and stream every partition to its own session.
+        A key always lands in the same partition, so the writers never wait on each other's node locks.
+        """
+        partitions = params["partitions"]
+        queues = [queue.Queue(maxsize=2) for _ in range(partitions)]
+        # the number of partitions of each chunk that are not yet committed
+        remaining_parts: Dict[int, int] = dict()
+        remaining_lock = threading.Lock()
+
+        def write_partition(partition_queue: queue.Queue) -> None:
+            with self._driver.session(**self.db_config) as session:
+                while True:
+                    item = partition_queue.get()
+                    if item is None:
+                        return
+                    i, rows = item
+                    self._run_batch(
+                        session,
+                        params,
+                        to_batch(rows, params),
+                        metadata={"chunk": i},
+                    )
+                    with remaining_lock:
+                        remaining_parts[i] -= 1
+                        committed = remaining_parts[i] == 0
+                    if committed:
+                        self._record_chunks(params, [i])
+
+        with ThreadPoolExecutor(max_workers=partitions) as executor:
+            writers = [executor.submit(write_partition, q) for q in queues]
+
+            def put(partition: int, item: Optional[Tuple[int, pd.DataFrame]]) -> None:
+                while True:
+                    try:
+                        queues[partition].put(item, timeout=1)
+                        return
+                    except queue.Full:
+                        if writers[partition].done():
+                            # the writer failed, raise its error
+                            writers[partition].result()
+
+            try:
+                for i, rows in chunks:
+                    parts = [
+                        (partition, partition_rows)
+                        for partition, partition_rows in enumerate(
+                            hash_partition_rows(rows, key_columns, partitions)
+                        )
+                        if len(partition_rows) > 0
+                    ]
+                    if not parts:
+                        self._record_chunks(params, [i])
+                    with remaining_lock:
+                        remaining_parts[i] = len(parts)
+                    for partition, partition_rows in parts:
+                        put(partition, (i, partition_rows))
+            finally:
+                for partition in range(partitions):
+                    if not writers[partition].done():
+                        put(partition, None)
+
+            for writer in writers:
+                writer.result()
+
+    def _load_bucketed_relationship_chunks(
+        self,
+        params,
+        chunks: Iterable[Tuple[int, pd.DataFrame]],
+        info: StatementInfo,
+    ) -> None:
+        """
+        Load relationships concurrently without deadlocking on shared nodes.
+        Rows are buffered into windows and split into (source, target) buckets. Buckets that share
+        no endpoint partition are written concurrently, while conflicting buckets wait for the next round.
+        Within a bucket, rows are grouped by source so each source node is matched once per batch.
+        """
+        partitions = params["partitions"]
+        chunk_size = params["chunk_size"]
+        window_size = chunk_size * partitions * partitions
+        grouped_cql = get_grouped_relationship_statement(params["cql"])
+        same_label = len(set(info.matched_labels)) == 1
+
+        def write_bucket(
+            window_idx: int, bucket: Tuple[int, int], rows: pd.DataFrame
+        ) -> None:
+            metadata = {"chunk": window_idx, "bucket": f"{bucket[0]}-{bucket[1]}"}
+            rows = rows.sort_values(info.source_key_columns, kind="stable")
+            with self._driver.session(**self.db_config) as session:
+                for start in range(0, len(rows), chunk_size):
+                    batch = rows.iloc[start : start + chunk_size]
+                    if grouped_cql:
+                        self._run_batch(
+                            session,
+                            params,
+                            {
+                                "rows": group_rows_by_source(
+                                    batch,
+                                    info.source_key_columns,
+                                    params["column_types"],
+                                    params["sparse_rows"],
+                                    params["key_columns"],
+                                )
+                            },
+                            metadata=metadata,
+                            cql=grouped_cql,
+                            row_count=len(batch),
+                        )
+                    else:
+                        self._run_batch(
+                            session,
+                            params,
+                            to_batch(batch, params),
+                            metadata=metadata,
+                        )
+
+        with ThreadPoolExecutor(max_workers=partitions) as executor:
+
+            def write_window(
+                window_idx: int, window: List[Tuple[int, pd.DataFrame]]
+            ) -> None:
+                buckets = bucket_relationship_rows(
+                    pd.concat([rows for _, rows in window]),
+                    info.source_key_columns,
+                    info.target_key_columns,
+                    partitions,
+                )
+                for bucket_round in schedule_buckets(buckets, same_label=same_label):
+                    # wait for the round to finish before writing conflicting buckets
+                    list(
+                        executor.map(
+                            write_bucket,
+                            [window_idx] * len(bucket_round),
+                            bucket_round,
+                            [buckets[bucket] for bucket in bucket_round],
+                        )
+                    )
+                self._record_chunks(params, [i for i, _ in window])
+
+            window, window_rows, window_idx = list(), 0, 0
+            for i, rows in chunks:
+                window.append((i, rows))
+                window_rows += len(rows)
+                if window_rows >= window_size:
+                    write_window(window_idx, window)
+                    window, window_rows, window_idx = list(), 0, window_idx + 1
+            if window_rows > 0:
+                write_window(window_idx, window)
+
+    def check_initial_load(self):
+        """
+        Refuse to start an initial load, which writes with CREATE, unless the database holds no nodes.
+        """
+        with self._driver.session(**self.db_config) as session:
+            nodes = session.run(COUNT_NODES_QUERY).single()["nodes"]
+        raise_if_not_empty(nodes)
 
     def pre_ingest(self):
-        if "pre_ingest" in global_config:
-            statements = global_config["pre_ingest"]
+        if "pre_ingest" in self.config:
+            statements = self.config["pre_ingest"] or list()
             if len(statements) > 0:
                 with self._driver.session(**self.db_config) as session:
                     for statement in statements:
@@ -117,9 +721,20 @@ class LocalServer(object):
             else:
                 print("no pre ingest scripts found.")
 
+    def pre_relationships(self):
+        """
+        Run the statements that follow the leading node entries, such as the node constraints of an initial load.
+        Their indexes are then built in one pass over the loaded nodes, and are ready for the relationship MATCHes.
+        """
+        statements = self.config.get("pre_relationships") or list()
+        if len(statements) > 0:
+            with self._driver.session(**self.db_config) as session:
+                for statement in statements:
+                    session.run(statement)
+
     def post_ingest(self):
-        if "post_ingest" in global_config:
-            statements = global_config["post_ingest"]
+        if "post_ingest" in self.config:
+            statements = self.config["post_ingest"] or list()
             if len(statements) > 0:
                 with self._driver.session(**self.db_config) as session:
                     for statement in statements:
@@ -128,64 +743,443 @@ class LocalServer(object):
                 print("no post ingest scripts found.")
 
 
+def get_file_params(
+    file: Dict[str, Any], basepath: Optional[str] = None, initial_load: bool = False
+):
+    """
+    Read the settings of a `files` entry, applying defaults.
+    In an `initial_load`, every statement CREATEs its entities, so rows are deduplicated on their keys by default,
+    and CALL IN TRANSACTIONS statements are refused since a retried batch would create its committed rows again.
+    Every key is compared by value and remembered, so that no node or relationship is created twice, and the load
+    fails once more than `dedup_max_keys` keys are seen. The first row of each key sets its properties.
+    """
+    params = dict()
+    params["skip_records"] = file.get("skip_records") or 0
+    params["compression"] = file.get("compression") or "infer"
+
+    file_url = file["url"]
+    if basepath and file_url.startswith("$BASE"):
+        file_url = file_url.replace("$BASE", basepath, 1)
+    params["url"] = file_url
+    print(f"File {params['url']}")
+    params["cql"] = file["cql"]
+    params["call_in_transactions"] = is_call_in_transactions(params["cql"])
+    if initial_load:
+        check_initial_load_files([params])
+    params["chunk_size"] = file.get("chunk_size") or 1000
+    params["field_sep"] = file.get("field_separator") or ","
+    params["format"] = file.get("format")
+    params["csv_engine"] = file.get("csv_engine") or "c"
+    params["partitions"] = file.get("partitions") or 1
+    params["max_retries"] = file.get("max_retries", 3)
+    params["retry_delay"] = file.get("retry_delay", 1.0)
+    params["transaction_timeout"] = file.get("transaction_timeout")
+    params["skip_file"] = file.get("skip_file") or False
+    params["target_batch_latency"] = file.get("target_batch_latency")
+    params["parse_processes"] = file.get("parse_processes")
+    params["max_inflight_bytes"] = file.get("max_inflight_bytes")
+    params["column_types"] = get_column_types(file.get("column_types"))
+    params["sparse_rows"] = file.get("sparse_rows") or False
+    params["columnar"] = file.get("columnar") or False
+    params["deduplicate"] = file.get("deduplicate") or (
+        "keys" if initial_load else False
+    )
+    params["dedup_max_keys"] = file.get("dedup_max_keys") or (
+        INITIAL_LOAD_MAX_KEYS if initial_load else DEFAULT_MAX_KEYS
+    )
+    params["initial_load"] = initial_load
+    params["checkpoint_key"] = get_file_entry_key(params)
+    info = get_statement_info(params["cql"])
+    # only the columns used by the statement are read and sent
+    params["columns"] = file.get("columns") or info.columns
+    # the columns that identify the written nodes, which sparse rows still send
+    params["key_columns"] = list(
+        dict.fromkeys(
+            info.key_columns + info.source_key_columns + info.target_key_columns
+        )
+    )
+    return params
+
+
+def check_initial_load_files(files: List[Dict[str, Any]]) -> None:
+    """
+    Refuse the `files` entries that may not be part of an initial load. A CALL IN TRANSACTIONS batch that fails
+    after some inner transactions have committed is retried in full, which would create those rows again.
+    """
+    for file in files:
+        if is_call_in_transactions(file["cql"]):
+            raise ValueError(
+                f"Unable to run the CALL IN TRANSACTIONS statement of {file['url']} in an initial load, as a retried "
+                "batch could create duplicates. Please remove `initial_load` from the config, or the CALL IN "
+                "TRANSACTIONS wrapper."
+            )
+
+
+def raise_if_not_empty(nodes: int) -> None:
+    """
+    Refuse an initial load, which writes with CREATE, into a database that already holds `nodes` nodes.
+    """
+    if nodes > 0:
+        raise ValueError(
+            f"Unable to run an initial load as the database already holds {nodes} nodes. "
+            "Please load into an empty database, or remove `initial_load` from the config to MERGE into existing data."
+        )
+
+
+def project_columns(rows: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+    """
+    Select the columns used by a statement. If `columns` is None, then all columns are kept.
+    """
+    if columns is None:
+        return rows
+    return rows[[col for col in rows.columns if col in columns]]
+
+
+def iter_dataframe_chunks(
+    dataframe: Union[pd.DataFrame, Iterable[pd.DataFrame]], chunk_size: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Slice a Pandas DataFrame, or each DataFrame of an iterable, into chunks of at most `chunk_size` rows.
+    The chunks are positional views, so the data is not copied.
+    """
+    frames = [dataframe] if isinstance(dataframe, pd.DataFrame) else dataframe
+    for frame in frames:
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start : start + chunk_size]
+
+
+def get_transaction_metadata(params, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The metadata attached to ingestion transactions, visible in `SHOW TRANSACTIONS`.
+    """
+    return {"app": "neo4j-runway", "file": params["url"], **metadata}
+
+
+def get_retry_delay(
+    params, attempt: int, error: Exception, metadata: Dict[str, Any]
+) -> float:
+    """
+    The number of seconds to wait before retrying a failed batch.
+    Raises the error if it is not retryable or `max_retries` has been reached.
+    """
+    if not error.is_retryable() or attempt >= params["max_retries"]:
+        raise error
+    delay = params["retry_delay"] * 2**attempt
+    warnings.warn(
+        f"Retrying chunk {metadata} of {params['url']} in {delay} seconds. Error: {error}"
+    )
+    return delay
+
+
+def print_batch_sizes(batch_sizes: List[Dict[str, Any]]) -> None:
+    """
+    Print the batch sizes chosen by adaptive batching, so they may be pinned as `chunk_size`.
+    """
+    print("Adaptive batch sizes. Set these as `chunk_size` to reuse them:")
+    for entry in batch_sizes:
+        statement = entry["cql"].strip().split("\n")[2:4]
+        print(
+            f"{entry['url']} : chunk_size {entry['batch_size']} after {entry['batches']} batches",
+            *statement,
+            sep="\n    ",
+        )
+
+
+def get_driver_config(
+    config: Dict[str, Any], driver_config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    The driver and connection pool settings, such as `max_connection_pool_size`, `connection_acquisition_timeout`,
+    `keep_alive` and `fetch_size`. Settings passed as `driver_config` take precedence over the `driver_config` of the YAML.
+    """
+    return {**(config.get("driver_config") or dict()), **(driver_config or dict())}
+
+
+def parse_config(configuration: str) -> Dict[str, Any]:
+    """
+    Parse the YAML configuration of PyIngest.
+    """
+    return yaml.safe_load(configuration)
+
+
 def load_config(configuration):
+    """
+    Parse a YAML configuration into the module level `global_config`, used by a `LocalServer` created without a config.
+    PyIngest does not use `global_config`, so concurrent ingests do not overwrite each other's configuration.
+    """
     global global_config
-    global_config = yaml.safe_load(configuration)
+    global_config = parse_config(configuration)
 
 
 def PyIngest(
-    config: str = None, dataframe: Optional[pd.DataFrame] = None, **kwargs
-) -> None:
+    config: str = None,
+    dataframe: Optional[Union[pd.DataFrame, Iterable[pd.DataFrame]]] = None,
+    max_workers: int = 1,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+    share_reads: bool = False,
+    target_batch_latency: Optional[float] = None,
+    parse_processes: int = 1,
+    max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+    driver: Optional[Driver] = None,
+    driver_config: Optional[Dict[str, Any]] = None,
+    scheduler: Optional[FairScheduler] = None,
+    **kwargs,
+) -> IngestReport:
     """
     Function to ingest data according to a configuration YAML.
     This is a modified version of the original PyIngest that focuses on loading local files.
 
+    A YAML that sets `initial_load: true` loads an empty database with CREATE statements, such as those generated with
+    `initial_load=True`. The load is refused if the database holds any nodes, and the rows of every `files` entry are
+    deduplicated on their keys unless the entry sets `deduplicate`. The first row of each key sets its properties, where
+    MERGE and SET would keep the last, as the admin import does. Up to `dedup_max_keys` keys of each entry, by default
+    10,000,000, are held in memory with their values. The `pre_relationships` statements of a YAML run once
+    the leading node entries are loaded, before the other entries, so node constraints may be built after the nodes.
+
     Parameters
     ----------
     config : str
         A string representation of the YAML file that is generated by the IngestionGenerator class.
         May also be a filepath to a YAML file.
-    dataframe : Optional[pd.DataFrame], optional
-        The data to ingest in Pandas DataFrame format.
+    dataframe : Optional[Union[pd.DataFrame, Iterable[pd.DataFrame]]], optional
+        The data to ingest in Pandas DataFrame format. May also be an iterable of DataFrames, such as the
+        result of `pd.read_sql(..., chunksize=...)`, to stream data that does not fit in memory. A stream is only
+        read once, so every `files` entry is fed from a single shared read and no entry may need another read.
         If None, then will search for CSVs according to the urls in YAML config, by default None
+    max_workers : int, optional
+        The number of `files` entries to load concurrently. Entries are only loaded once the entries they
+        depend on have finished, so relationships always wait on their endpoint nodes. By default 1
+    checkpoint_path : Optional[str], optional
+        The file used to record the committed chunks of each `files` entry. If None and `resume` is True, then
+        this defaults to the `config` filepath with a `.checkpoint.json` suffix. By default None
+    resume : bool, optional
+        Whether to skip the chunks and files committed by a previous run, as recorded in the checkpoint file.
+        If False, then any previous checkpoint is cleared. An `initial_load` config, which refuses to load a database
+        that holds nodes, may only continue into its partly loaded database when resuming. By default False
+    share_reads : bool, optional
+        Whether `files` entries that read the same source should share a single read. Each chunk is then parsed once
+        and written with every statement that uses it, nodes before the relationships between them. Relationships that
+        match nodes on other columns, or from other sources, wait for a later read. By default False
+    target_batch_latency : Optional[float], optional
+        The desired number of seconds to commit each transaction. If set, then the number of rows per transaction starts at
+        `chunk_size` and adapts to this latency, shrinking if the server runs out of memory. The chosen sizes are printed
+        at the end so they may be pinned as `chunk_size` in the config. A `target_batch_latency` set on a `files` entry
+        takes precedence. Partitioned entries and shared reads keep a fixed size. By default None
+    parse_processes : int, optional
+        The number of processes used to parse each CSV. If greater than 1, then an uncompressed CSV is split into
+        byte ranges on row boundaries, and the ranges are parsed and converted to records in parallel while the
+        batches are written in file order. Entries that are compressed, skip records, are partitioned, deduplicated
+        or adaptively batched are read by a single process. A `parse_processes` set on a `files` entry takes
+        precedence. The worker processes are spawned, so the calling script must guard its entry point with
+        `if __name__ == "__main__":`. Otherwise the workers stop before they ingest anything, and the CSV is parsed by a
+        single process, with a warning. By default 1
+    max_inflight_bytes : int, optional
+        The maximum estimated size of the rows that have been read but not yet committed, for each `files` entry being
+        loaded. Reading and converting the next chunks overlaps with sending the current batch, and waits once this cap
+        is reached, so a slow database applies backpressure. A `max_inflight_bytes` set on a `files` entry takes
+        precedence. By default 256 MiB
+    driver : Optional[Driver], optional
+        An existing Neo4j driver to load with. Its connection pool is reused, so connections and TLS handshakes are not
+        repeated across many loads. The driver is left open and the credentials of the YAML are not required.
+        If None, then a driver is created from the YAML and closed at the end. By default None
+    driver_config : Optional[Dict[str, Any]], optional
+        Settings for the driver created from the YAML, such as `max_connection_pool_size`, `connection_acquisition_timeout`,
+        `keep_alive` or `fetch_size`. These take precedence over a `driver_config` mapping in the YAML. By default None
+    scheduler : Optional[FairScheduler], optional
+        Shares a number of concurrent batches fairly between ingests. PyIngest may be called from several threads at once,
+        each with its own config, so to run many ingests in one process pass them the same `driver` and `scheduler`.
+        If None, then batches are written as soon as a worker is ready. By default None
     yaml_string : str
         A string representation of the YAML file that is generated by the IngestionGenerator class.
         May also be a filepath to a YAML file.
         .. deprecated:: 0.5.2
             Replaced by the `config` arg as this is more encompassing.
 
-
+    Returns
+    -------
+    IngestReport
+        The timings, retries and update counters of every committed batch, by `files` entry. Compare the counters
+        with the number of rows to catch statements that create more or fewer entities than expected.
     """
+    check_not_bootstrapping()
     if "yaml_string" in kwargs:
-        load_config(get_yaml(kwargs["yaml_string"]))
+        config = kwargs["yaml_string"]
         warnings.warn(
             "the yaml_string parameter will be depreciated in future releases. Please use the 'config' to identify the YAML file instead."
         )
-    else:
-        load_config(get_yaml(config))
+    ingest_config = parse_config(get_yaml(config))
+
+    if checkpoint_path is None and resume:
+        if not _is_yaml_path(config):
+            raise ValueError(
+                "A `checkpoint_path` must be provided to resume when `config` is not a filepath."
+            )
+        checkpoint_path = f"{config}.checkpoint.json"
+    if checkpoint_path is not None and _is_dataframe_stream(dataframe):
+        raise ValueError(
+            "Checkpoints are not supported when `dataframe` is a stream of DataFrames."
+        )
+
+    server = LocalServer(
+        config=ingest_config,
+        driver=driver,
+        driver_config=driver_config,
+        scheduler=scheduler,
+    )
+    server.target_batch_latency = target_batch_latency
+    server.parse_processes = parse_processes
+    server.max_inflight_bytes = max_inflight_bytes
+    if checkpoint_path is not None:
+        server.checkpoint = CheckpointStore(path=checkpoint_path)
+        if not resume:
+            server.checkpoint.reset()
+
+    # on the first interrupt, let in-flight batches commit and save the checkpoint before stopping
+    def request_stop(signum, frame) -> None:
+        print("Stopping after in-flight batches commit. Interrupt again to force quit.")
+        signal.signal(signal.SIGINT, previous_handler)
+        server.stop_event.set()
+
+    handle_interrupt = threading.current_thread() is threading.main_thread()
+    if handle_interrupt:
+        previous_handler = signal.signal(signal.SIGINT, request_stop)
+
+    start = time.perf_counter()
+    try:
+        if server.initial_load:
+            check_initial_load_files(server.config["files"])
+            if not resume:
+                server.check_initial_load()
+        _run_ingest(
+            server=server,
+            dataframe=dataframe,
+            max_workers=max_workers,
+            share_reads=share_reads,
+        )
+    finally:
+        server.report.seconds = time.perf_counter() - start
+        if handle_interrupt:
+            signal.signal(signal.SIGINT, previous_handler)
+        if server.checkpoint is not None:
+            server.checkpoint.flush()
+        server.close()
+
+    if server.batch_sizes:
+        print_batch_sizes(server.batch_sizes)
+    print(server.report)
+
+    if server.stop_event.is_set():
+        raise KeyboardInterrupt(
+            f"Ingestion stopped. Progress is saved to {checkpoint_path}."
+            if checkpoint_path is not None
+            else "Ingestion stopped."
+        )
+
+    return server.report
+
+
+def _run_ingest(
+    server: LocalServer,
+    dataframe: Optional[Union[pd.DataFrame, Iterable[pd.DataFrame]]],
+    max_workers: int,
+    share_reads: bool = False,
+) -> None:
+    file_list = server.config["files"]
+
+    if _is_dataframe_stream(dataframe):
+        # every entry reads the same stream, which may only be read once
+        read_passes = plan_read_passes(
+            [dict(file, url="dataframe", partitions=1) for file in file_list]
+        )
+        if len(read_passes) > 1:
+            raise ValueError(
+                "Unable to load a stream of DataFrames in a single read. Some `files` entries match nodes written by "
+                "other entries on different columns. Please pass a DataFrame instead."
+            )
+        server.pre_ingest()
+        # the nodes and relationships share the read, so the statements are run first
+        server.pre_relationships()
+        server.load_shared_read(file_list, dataframe=dataframe)
+        if not server.stop_event.is_set():
+            server.post_ingest()
+        return
 
-    server = LocalServer()
     server.pre_ingest()
-    file_list = global_config["files"]
-    for file in file_list:
+
+    # the leading node entries are loaded before the `pre_relationships` statements and the other entries
+    phases = [file_list]
+    if server.config.get("pre_relationships"):
+        node_entries = count_leading_node_entries(file_list)
+        phases = [file_list[:node_entries], file_list[node_entries:]]
+
+    for phase_idx, phase in enumerate(phases):
+        if phase_idx > 0:
+            server.pre_relationships()
+        _load_files(
+            server=server,
+            file_list=phase,
+            dataframe=dataframe,
+            max_workers=max_workers,
+            share_reads=share_reads,
+        )
+        if server.stop_event.is_set():
+            return
+    server.post_ingest()
+
+
+def _load_files(
+    server: LocalServer,
+    file_list: List[Dict[str, Any]],
+    dataframe: Optional[pd.DataFrame],
+    max_workers: int,
+    share_reads: bool = False,
+) -> None:
+    if share_reads:
+        for read_pass in plan_read_passes(file_list):
+            # the read groups of a pass are independent of each other
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(
+                    executor.map(
+                        lambda group: server.load_shared_read(
+                            [file_list[idx] for idx in group], dataframe=dataframe
+                        ),
+                        read_pass,
+                    )
+                )
+            if server.stop_event.is_set():
+                return
+        return
+
+    def load_file(file) -> None:
         if dataframe is not None:
             server.load_dataframe(file, dataframe=dataframe)
         else:
             server.load_csv(file)
-    server.post_ingest()
-    server.close()
+
+    if max_workers > 1:
+        run_with_dependencies(
+            files=file_list, load_file=load_file, max_workers=max_workers
+        )
+    else:
+        for file in file_list:
+            load_file(file)
+
+
+def _is_dataframe_stream(dataframe: Any) -> bool:
+    return dataframe is not None and not isinstance(dataframe, pd.DataFrame)
+
+
+def _is_yaml_path(data: str) -> bool:
+    return isinstance(data, str) and (".yml" in data.lower() or ".yaml" in data.lower())
 
 
 def get_yaml(data: str) -> str:
     # yaml already in String format
-    if (
-        isinstance(data, str)
-        and ".yml" not in data.lower()
-        and ".yaml" not in data.lower()
-    ):
+    if isinstance(data, str) and not _is_yaml_path(data):
         return data
     # load the yaml
-    elif isinstance(data, str) and (".yml" in data.lower() or ".yaml" in data.lower()):
+    elif _is_yaml_path(data):
         with open(data, "r") as f:
             yml_file = f.read()
 
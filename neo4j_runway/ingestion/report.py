@@ -0,0 +1,180 @@
+"""
+This file contains the report returned by PyIngest, with the timings and server-side counters of every batch.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, PrivateAttr
+
+COUNTER_NAMES = [
+    "nodes_created",
+    "nodes_deleted",
+    "relationships_created",
+    "relationships_deleted",
+    "properties_set",
+    "labels_added",
+    "labels_removed",
+    "indexes_added",
+    "indexes_removed",
+    "constraints_added",
+    "constraints_removed",
+]
+
+
+def get_counters(summary: Any) -> Dict[str, int]:
+    """
+    Read the update counters from the `ResultSummary` returned by `consume()`.
+    """
+    if summary is None:
+        return dict()
+    return {name: getattr(summary.counters, name) for name in COUNTER_NAMES}
+
+
+def sum_counters(counters: List[Dict[str, int]]) -> Dict[str, int]:
+    """
+    Add up update counters. Counters that are zero everywhere are left out.
+    """
+    total: Dict[str, int] = dict()
+    for batch_counters in counters:
+        for name, value in batch_counters.items():
+            if value:
+                total[name] = total.get(name, 0) + value
+    return total
+
+
+class BatchReport(BaseModel):
+    """
+    A committed batch.
+    """
+
+    metadata: Dict[str, Any]
+    rows: int
+    seconds: float
+    retries: int = 0
+    counters: Dict[str, int] = dict()
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        return self.rows / self.seconds if self.seconds > 0 else None
+
+
+class FileReport(BaseModel):
+    """
+    The committed batches of a `files` entry.
+    """
+
+    url: str
+    cql: str
+    seconds: float = 0.0
+    completed: bool = False
+    batches: List[BatchReport] = list()
+
+    @property
+    def rows(self) -> int:
+        """
+        The number of rows committed.
+        """
+        return sum([batch.rows for batch in self.batches])
+
+    @property
+    def retries(self) -> int:
+        """
+        The number of times a batch was retried.
+        """
+        return sum([batch.retries for batch in self.batches])
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """
+        The update counters of every batch, added up.
+        """
+        return sum_counters([batch.counters for batch in self.batches])
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        return self.rows / self.seconds if self.seconds > 0 else None
+
+
+class IngestReport(BaseModel):
+    """
+    The outcome of an ingestion, returned by PyIngest.
+    """
+
+    files: List[FileReport] = list()
+    seconds: float = 0.0
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _file_starts: Dict[int, float] = PrivateAttr(default_factory=dict)
+
+    @property
+    def rows(self) -> int:
+        """
+        The number of rows committed.
+        """
+        return sum([file.rows for file in self.files])
+
+    @property
+    def retries(self) -> int:
+        """
+        The number of times a batch was retried.
+        """
+        return sum([file.retries for file in self.files])
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """
+        The update counters of every batch, added up.
+        """
+        return sum_counters([file.counters for file in self.files])
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        return self.rows / self.seconds if self.seconds > 0 else None
+
+    def get_file_report(self, params: Dict[str, Any]) -> FileReport:
+        """
+        The report of a `files` entry, created on first use. Entries are identified by their source and statement.
+        """
+        with self._lock:
+            for file in self.files:
+                if file.url == params["url"] and file.cql == params["cql"]:
+                    return file
+            file = FileReport(url=params["url"], cql=params["cql"])
+            self.files.append(file)
+            return file
+
+    def start_file(self, params: Dict[str, Any]) -> None:
+        file = self.get_file_report(params)
+        with self._lock:
+            self._file_starts[id(file)] = time.perf_counter()
+
+    def finish_file(self, params: Dict[str, Any], completed: bool = True) -> None:
+        file = self.get_file_report(params)
+        with self._lock:
+            start = self._file_starts.pop(id(file), None)
+            if start is not None:
+                file.seconds += time.perf_counter() - start
+            file.completed = completed
+
+    def record_batch(self, params: Dict[str, Any], batch: BatchReport) -> None:
+        file = self.get_file_report(params)
+        with self._lock:
+            file.batches.append(batch)
+
+    def __str__(self) -> str:
+        lines = [
+            f"Ingested {self.rows} rows in {self.seconds:.2f} seconds with {self.retries} retries. {self.counters}"
+        ]
+        for file in self.files:
+            rate = (
+                f"{file.rows_per_second:.0f} rows/s"
+                if file.rows_per_second is not None
+                else "-"
+            )
+            status = "completed" if file.completed else "incomplete"
+            lines.append(
+                f"{file.url} : {file.rows} rows in {len(file.batches)} batches, {file.seconds:.2f} seconds, "
+                f"{rate}, {file.retries} retries, {status}. {file.counters}"
+            )
+        return "\n".join(lines)
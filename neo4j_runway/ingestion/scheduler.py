@@ -0,0 +1,202 @@
+"""
+This file contains the dependency aware scheduling of PyIngest `files` entries.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from .statements import StatementInfo, get_statement_info
+
+
+def build_dependency_graph(files: List[Dict[str, Any]]) -> Dict[int, Set[int]]:
+    """
+    Build a dependency graph from the `files` entries of a PyIngest configuration.
+    An entry only depends on entries that appear before it in the configuration, so the
+    configured order is always a valid serial order.
+
+    An entry depends on an earlier entry when
+        * it matches a node label that the earlier entry writes (relationships wait on their endpoint nodes)
+        * both entries write the same node label
+        * both are relationship entries that share an endpoint label, since these would lock the same nodes
+        * either statement could not be parsed, in which case the configured order is kept
+
+    Parameters
+    ----------
+    files : List[Dict[str, Any]]
+        The `files` entries of the PyIngest configuration.
+
+    Returns
+    -------
+    Dict[int, Set[int]]
+        A map of each entry index to the indexes of the entries it depends on.
+    """
+
+    infos = [get_statement_info(file["cql"]) for file in files]
+    graph: Dict[int, Set[int]] = dict()
+
+    for idx, info in enumerate(infos):
+        graph[idx] = set()
+        for prev_idx, prev_info in enumerate(infos[:idx]):
+            if info.kind == "other" or prev_info.kind == "other":
+                graph[idx].add(prev_idx)
+            elif set(info.matched_labels) & set(prev_info.written_labels):
+                graph[idx].add(prev_idx)
+            elif set(info.written_labels) & set(prev_info.written_labels):
+                graph[idx].add(prev_idx)
+            elif (
+                info.kind == "relationship"
+                and prev_info.kind == "relationship"
+                and set(info.matched_labels) & set(prev_info.matched_labels)
+            ):
+                graph[idx].add(prev_idx)
+
+    return graph
+
+
+def run_with_dependencies(
+    files: List[Dict[str, Any]],
+    load_file: Callable[[Dict[str, Any]], None],
+    max_workers: int = 1,
+) -> None:
+    """
+    Run `load_file` on every entry of `files` on a pool of `max_workers` threads.
+    An entry is only submitted once all of the entries it depends on have finished.
+
+    Parameters
+    ----------
+    files : List[Dict[str, Any]]
+        The `files` entries of the PyIngest configuration.
+    load_file : Callable[[Dict[str, Any]], None]
+        The function that loads a single entry.
+    max_workers : int, optional
+        The number of entries that may be loaded at once, by default 1
+    """
+
+    remaining = build_dependency_graph(files)
+    finished: Set[int] = set()
+    running: Dict[Future, int] = dict()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def submit_ready() -> None:
+            for idx in sorted(remaining):
+                if remaining[idx] <= finished:
+                    del remaining[idx]
+                    running[executor.submit(load_file, files[idx])] = idx
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = running.pop(future)
+                # raise any ingestion error instead of scheduling dependent entries
+                future.result()
+                finished.add(idx)
+            submit_ready()
+
+
+def _get_read_key(file: Dict[str, Any], idx: int) -> Tuple[Any, ...]:
+    """
+    Entries may only share a read if they read their source in the same way.
+    Partitioned entries are always read on their own.
+    """
+
+    return (
+        file["url"],
+        file.get("field_separator"),
+        file.get("skip_records"),
+        file.get("chunk_size"),
+        file.get("compression"),
+        file.get("format"),
+        idx if (file.get("partitions") or 1) > 1 else None,
+    )
+
+
+def _is_row_local(dependency: StatementInfo, info: StatementInfo) -> bool:
+    """
+    Whether every row of `info` only depends on the same row of `dependency`.
+    This is the case for a relationship that matches a node by the same columns the node statement merged it on.
+    """
+
+    if dependency.kind == "relationship" and info.kind == "relationship":
+        # these only share locks
+        return True
+    if dependency.kind != "node" or info.kind != "relationship":
+        return False
+
+    endpoints = zip(
+        info.matched_labels, [info.source_key_columns, info.target_key_columns]
+    )
+    return all(
+        [
+            key_columns == dependency.key_columns
+            for label, key_columns in endpoints
+            if label in dependency.written_labels
+        ]
+    )
+
+
+def plan_read_passes(files: List[Dict[str, Any]]) -> List[List[List[int]]]:
+    """
+    Plan how to load the `files` entries while reading each source as few times as possible.
+    Entries that read the same source are fed from a single read, chunk by chunk, in the configured order.
+    An entry is placed in a later pass than an entry it depends on, unless both share a read and each of its
+    rows only depends on the same row of the other entry.
+
+    Parameters
+    ----------
+    files : List[Dict[str, Any]]
+        The `files` entries of the PyIngest configuration.
+
+    Returns
+    -------
+    List[List[List[int]]]
+        The passes, in order. Each pass is a list of independent read groups and each read group is a
+        list of entry indexes that share a single read.
+    """
+
+    infos = [get_statement_info(file["cql"]) for file in files]
+    graph = build_dependency_graph(files)
+    read_keys = [_get_read_key(file, idx) for idx, file in enumerate(files)]
+
+    entry_passes: List[int] = list()
+    for idx in range(len(files)):
+        entry_pass = 0
+        for dependency in graph[idx]:
+            shared = read_keys[dependency] == read_keys[idx] and _is_row_local(
+                infos[dependency], infos[idx]
+            )
+            entry_pass = max(
+                entry_pass, entry_passes[dependency] + (0 if shared else 1)
+            )
+        entry_passes.append(entry_pass)
+
+    passes: List[Dict[Tuple[Any, ...], List[int]]] = [
+        dict() for _ in range(max(entry_passes, default=-1) + 1)
+    ]
+    for idx, entry_pass in enumerate(entry_passes):
+        passes[entry_pass].setdefault(read_keys[idx], list()).append(idx)
+
+    return [list(read_groups.values()) for read_groups in passes]
+
+
+def count_leading_node_entries(files: List[Dict[str, Any]]) -> int:
+    """
+    Count the `files` entries that only write nodes, from the start of the configuration up to the first entry that does not.
+    These may be loaded before the statements that prepare the relationship entries, such as deferred node constraints.
+
+    Parameters
+    ----------
+    files : List[Dict[str, Any]]
+        The `files` entries of the PyIngest configuration.
+
+    Returns
+    -------
+    int
+        The number of leading node entries.
+    """
+
+    for idx, file in enumerate(files):
+        if get_statement_info(file["cql"]).kind != "node":
+            return idx
+    return len(files)
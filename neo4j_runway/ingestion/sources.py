@@ -0,0 +1,303 @@
+"""
+This file contains the readers that stream the rows of a PyIngest `files` entry source in chunks.
+Parquet and Arrow IPC sources, and the pyarrow CSV engine, require the optional pyarrow package.
+"""
+
+from contextlib import closing
+import csv
+import io
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from ..resources.mappings import SOURCE_FORMATS_BY_EXTENSION
+from .compression import (
+    get_compression,
+    iter_source_streams,
+    strip_compression_extension,
+)
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Reading Parquet and Arrow IPC sources, or CSVs with the pyarrow csv_engine, requires pyarrow. "
+            "Please install it with `pip install neo4j-runway[ingest-arrow]`."
+        ) from e
+    return pyarrow
+
+
+def _get_read_columns(
+    names: List[str], columns: Optional[List[str]]
+) -> Optional[List[str]]:
+    """
+    The source columns to read, in source order. If `columns` is None, then all columns are read.
+    """
+    if columns is None:
+        return None
+    return [name for name in names if name in columns]
+
+
+def _skip_records(
+    row_chunks: Iterable[pd.DataFrame], skip_records: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Drop the first `skip_records` rows of a stream of chunks.
+    """
+    for rows in row_chunks:
+        if skip_records >= len(rows):
+            skip_records -= len(rows)
+            continue
+        if skip_records > 0:
+            rows = rows.iloc[skip_records:]
+            skip_records = 0
+        yield rows
+
+
+def _iter_table_chunks(batches: Iterable[Any], chunk_size: int) -> Iterator[Any]:
+    """
+    Regroup a stream of Arrow record batches into tables of exactly `chunk_size` rows, except the last.
+    Slicing and combining the batches does not copy the data.
+    """
+    pa = _import_pyarrow()
+
+    pending = list()
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows < chunk_size:
+            continue
+        table = pa.Table.from_batches(pending)
+        start = 0
+        while pending_rows - start >= chunk_size:
+            yield table.slice(start, chunk_size)
+            start += chunk_size
+        pending = table.slice(start).to_batches()
+        pending_rows -= start
+    if pending_rows > 0:
+        yield pa.Table.from_batches(pending)
+
+
+def _check_uncompressed(params: Dict[str, Any]) -> None:
+    if get_compression(params) is not None:
+        raise ValueError(
+            f"Unable to read {params['url']}. Parquet and Arrow IPC sources may not be externally compressed, "
+            "please use the compression of the format instead."
+        )
+
+
+def get_source_format(params: Dict[str, Any]) -> str:
+    """
+    The format of a `files` entry source. This is the `format` of the entry if provided,
+    otherwise it is inferred from the file extension, ignoring any compression extension. Defaults to csv.
+    """
+    if params["format"] is not None:
+        source_format = params["format"].lower()
+        if source_format not in SOURCE_READERS:
+            raise ValueError(
+                f"Unsupported format {params['format']} for {params['url']}. Supported formats are {list(SOURCE_READERS)}."
+            )
+        return source_format
+
+    url = strip_compression_extension(params["url"]).lower()
+    for extension, source_format in SOURCE_FORMATS_BY_EXTENSION.items():
+        if url.endswith(extension):
+            return source_format
+    return "csv"
+
+
+def iter_source_chunks(params: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+    """
+    Read the source of a `files` entry in chunks of at most `chunk_size` rows, using the reader for its format.
+    CSV sources are parsed with pyarrow if the `csv_engine` of the entry is `pyarrow`.
+
+    Parameters
+    ----------
+    params : Dict[str, Any]
+        The settings of the `files` entry.
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        The chunks of rows.
+    """
+    source_format = get_source_format(params)
+    if source_format == "csv":
+        if params["csv_engine"] not in CSV_READERS:
+            raise ValueError(
+                f"Unsupported csv_engine {params['csv_engine']} for {params['url']}. Supported engines are {list(CSV_READERS)}."
+            )
+        return CSV_READERS[params["csv_engine"]](params)
+    return SOURCE_READERS[source_format](params)
+
+
+def _iter_member_chunks(
+    params: Dict[str, Any],
+    read_stream: Callable[[BinaryIO, int], Iterator[pd.DataFrame]],
+) -> Iterator[pd.DataFrame]:
+    """
+    Read every decompressed stream of a source with `read_stream`, which is passed the number of records to skip.
+    `skip_records` only applies to the first member of an archive.
+    """
+    with closing(iter_source_streams(params)) as streams:
+        for i, stream in enumerate(streams):
+            yield from read_stream(stream, params["skip_records"] if i == 0 else 0)
+
+
+def iter_csv_chunks(params: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+    """
+    Read the CSV of a `files` entry in chunks of `chunk_size` rows.
+    Compressed files and archives of CSV shards are decompressed as they are read. Each shard has its own header.
+    """
+
+    def read_stream(stream: BinaryIO, skip_records: int) -> Iterator[pd.DataFrame]:
+        openfile = io.TextIOWrapper(stream, encoding="utf-8")
+        # Grab the header from the file and pass that to pandas.  This allow the header
+        # to be applied even if we are skipping lines of the file
+        header = str(openfile.readline()).strip().split(params["field_sep"])
+
+        # Pandas' read_csv method is highly optimized and fast :-)
+        row_chunks = pd.read_csv(
+            openfile,
+            dtype=str,
+            sep=params["field_sep"],
+            on_bad_lines="skip",
+            index_col=False,
+            skiprows=skip_records,
+            names=header,
+            usecols=_get_read_columns(header, params["columns"]),
+            low_memory=False,
+            engine="c",
+            header=None,
+            chunksize=params["chunk_size"],
+        )
+
+        yield from row_chunks
+
+    return _iter_member_chunks(params, read_stream)
+
+
+def iter_arrow_csv_chunks(params: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+    """
+    Read the CSV of a `files` entry in chunks of `chunk_size` rows with the multithreaded pyarrow CSV parser.
+    Values are kept as Arrow strings, so each chunk is a DataFrame backed by Arrow arrays rather than one
+    Python string per cell. The values are only converted to Python objects when a batch is sent.
+    Unlike the default engine, rows with a different number of fields than the header are skipped.
+    """
+    pa = _import_pyarrow()
+    import pyarrow.csv as pa_csv
+
+    def read_stream(stream: BinaryIO, skip_records: int) -> Iterator[pd.DataFrame]:
+        header_line = stream.readline().decode("utf-8")
+        header = next(csv.reader([header_line], delimiter=params["field_sep"]), [])
+
+        reader = pa_csv.open_csv(
+            stream,
+            read_options=pa_csv.ReadOptions(
+                use_threads=True, column_names=header, skip_rows=skip_records
+            ),
+            parse_options=pa_csv.ParseOptions(
+                delimiter=params["field_sep"], invalid_row_handler=lambda row: "skip"
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.string() for col in header},
+                include_columns=_get_read_columns(header, params["columns"]),
+                strings_can_be_null=True,
+            ),
+        )
+        try:
+            for table in _iter_table_chunks(reader, params["chunk_size"]):
+                yield table.to_pandas(types_mapper=pd.ArrowDtype)
+        finally:
+            reader.close()
+
+    return _iter_member_chunks(params, read_stream)
+
+
+def iter_parquet_chunks(params: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+    """
+    Read the Parquet file of a `files` entry in chunks of at most `chunk_size` rows.
+    Only one row group is decoded at a time, and only the used columns are read.
+    """
+    _check_uncompressed(params)
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    with pq.ParquetFile(params["url"], memory_map=True) as parquet_file:
+        batches = parquet_file.iter_batches(
+            batch_size=params["chunk_size"],
+            columns=_get_read_columns(
+                parquet_file.schema_arrow.names, params["columns"]
+            ),
+        )
+        yield from _skip_records(
+            (batch.to_pandas() for batch in batches), params["skip_records"]
+        )
+
+
+def iter_arrow_chunks(params: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+    """
+    Read the Arrow IPC or Feather (v2) file of a `files` entry in chunks of at most `chunk_size` rows.
+    The file is memory mapped, so only the used columns of the current chunk are copied into memory.
+    Both the IPC file and IPC stream formats are supported.
+    """
+    _check_uncompressed(params)
+    pa = _import_pyarrow()
+
+    def iter_batches(source) -> Iterator[Any]:
+        try:
+            reader = pa.ipc.open_file(source)
+        except pa.ArrowInvalid:
+            source.seek(0)
+            yield from pa.ipc.open_stream(source)
+            return
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+    def iter_projected_batches(source) -> Iterator[Any]:
+        for batch in iter_batches(source):
+            columns = _get_read_columns(batch.schema.names, params["columns"])
+            yield batch.select(columns) if columns is not None else batch
+
+    with pa.memory_map(params["url"], "r") as source:
+        tables = _iter_table_chunks(
+            iter_projected_batches(source), params["chunk_size"]
+        )
+        yield from _skip_records(
+            (table.to_pandas() for table in tables), params["skip_records"]
+        )
+
+
+def iter_jsonl_chunks(params: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+    """
+    Read the JSON Lines file of a `files` entry in chunks of `chunk_size` rows.
+    Each line is an object mapping column names to values. Compressed files and archives are decompressed as they are read.
+    """
+
+    def read_stream(stream: BinaryIO, skip_records: int) -> Iterator[pd.DataFrame]:
+        with pd.read_json(
+            io.TextIOWrapper(stream, encoding="utf-8"),
+            lines=True,
+            chunksize=params["chunk_size"],
+            dtype=False,
+            convert_dates=False,
+        ) as reader:
+            yield from _skip_records(reader, skip_records)
+
+    return _iter_member_chunks(params, read_stream)
+
+
+CSV_READERS: Dict[str, Callable[[Dict[str, Any]], Iterator[pd.DataFrame]]] = {
+    "c": iter_csv_chunks,
+    "pyarrow": iter_arrow_csv_chunks,
+}
+
+SOURCE_READERS: Dict[str, Callable[[Dict[str, Any]], Iterator[pd.DataFrame]]] = {
+    "csv": iter_csv_chunks,
+    "parquet": iter_parquet_chunks,
+    "arrow": iter_arrow_chunks,
+    "jsonl": iter_jsonl_chunks,
+}
@@ -0,0 +1,156 @@
+"""
+This file contains functions to inspect the Cypher statements found in a PyIngest configuration.
+The statements generated by Runway follow a small number of shapes, so the information needed to schedule
+and parallelize ingestion can be recovered from the statement text alone.
+"""
+
+import re
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+LABEL_PATTERN = r"(?:`[^`]+`|\w+)"
+
+NODE_WRITE_PATTERN = re.compile(
+    r"\b(?:MERGE|CREATE)\s*\(\s*\w*\s*:\s*(" + LABEL_PATTERN + r")\s*(?:\{([^}]*)\})?",
+    re.IGNORECASE,
+)
+NODE_MATCH_PATTERN = re.compile(
+    r"\bMATCH\s*\(\s*\w*\s*:\s*(" + LABEL_PATTERN + r")\s*(?:\{([^}]*)\})?",
+    re.IGNORECASE,
+)
+# a column of a row, `row.x`, or of a columnar batch, `cols.x[i]`
+ROW_COLUMN_PATTERN = re.compile(r"\brow\.(`[^`]+`|\w+)|\bcols\.(`[^`]+`|\w+)\[i\]")
+# any use of `row` or `cols` other than a column lookup, its declaration or its import into a subquery,
+# such as `SET n += row`
+ROW_OTHER_USE_PATTERN = re.compile(
+    r"(?<!AS )(?<!as )(?<!WITH )\brow\b(?!\s*\.)"
+    r"|(?<!AS )(?<!as )(?<!WITH )(?<!\.)\bcols\b(?!\.(?:`[^`]+`|\w+)\[i\])"
+)
+ROW_DECLARATION_PATTERN = re.compile(r"\bAS (?:row|cols)\b", re.IGNORECASE)
+RELATIONSHIP_WRITE_PATTERN = re.compile(
+    r"\b(?:MERGE|CREATE)\s*\(\s*\w+\s*\)\s*<?-\s*\[", re.IGNORECASE
+)
+IN_TRANSACTIONS_PATTERN = re.compile(
+    r"\}\s*IN\s+(?:\d+\s+)?(?:CONCURRENT\s+)?TRANSACTIONS\b", re.IGNORECASE
+)
+
+
+class StatementInfo(BaseModel):
+    """
+    Information parsed from a single ingestion statement.
+    """
+
+    kind: str
+    written_labels: List[str] = []
+    matched_labels: List[str] = []
+    key_columns: List[str] = []
+    source_key_columns: List[str] = []
+    target_key_columns: List[str] = []
+    columns: Optional[List[str]] = None
+
+
+def _strip_backticks(label: str) -> str:
+    return label[1:-1] if label.startswith("`") else label
+
+
+def _get_row_columns(clause: str) -> List[str]:
+    columns = list()
+    for row_column, cols_column in ROW_COLUMN_PATTERN.findall(clause):
+        column = _strip_backticks(row_column or cols_column)
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def get_statement_info(cql: str) -> StatementInfo:
+    """
+    Parse an ingestion statement.
+
+    Parameters
+    ----------
+    cql : str
+        The Cypher statement of a PyIngest `files` entry.
+
+    Returns
+    -------
+    StatementInfo
+        The statement kind ("node", "relationship" or "other") along with the node labels it writes and matches.
+        The key columns are the CSV columns used to identify the written node, or the source and target nodes
+        of a relationship. These are the columns of `Node.node_keys` or `Node.unique_properties`.
+        The columns are every column referenced by the statement, or None if the statement uses the row
+        in a way that may reference any column.
+    """
+
+    written = NODE_WRITE_PATTERN.findall(cql)
+    matched = NODE_MATCH_PATTERN.findall(cql)
+    written_labels = [_strip_backticks(label) for label, _ in written]
+    matched_labels = [_strip_backticks(label) for label, _ in matched]
+
+    if matched_labels and RELATIONSHIP_WRITE_PATTERN.search(cql):
+        kind = "relationship"
+    elif written_labels and not matched_labels:
+        kind = "node"
+    else:
+        kind = "other"
+
+    info = StatementInfo(
+        kind=kind, written_labels=written_labels, matched_labels=matched_labels
+    )
+    if ROW_DECLARATION_PATTERN.search(cql) and not ROW_OTHER_USE_PATTERN.search(cql):
+        info.columns = _get_row_columns(cql)
+    if kind == "node" and len(written) == 1:
+        info.key_columns = _get_row_columns(written[0][1])
+    elif kind == "relationship" and len(matched) == 2:
+        info.source_key_columns = _get_row_columns(matched[0][1])
+        info.target_key_columns = _get_row_columns(matched[1][1])
+
+    return info
+
+
+def is_call_in_transactions(cql: str) -> bool:
+    """
+    Whether a statement commits its own transactions with `CALL { ... } IN TRANSACTIONS`.
+    Such statements must be run in an auto-commit transaction.
+    """
+
+    return IN_TRANSACTIONS_PATTERN.search(cql) is not None
+
+
+def get_grouped_relationship_statement(cql: str) -> Optional[str]:
+    """
+    Rewrite a relationship statement to accept rows grouped by source node, as returned by
+    `group_rows_by_source`. The source node is then matched once per group rather than once per row.
+
+    Parameters
+    ----------
+    cql : str
+        A relationship statement in the format generated by `generate_merge_relationship_clause_standard`.
+
+    Returns
+    -------
+    Optional[str]
+        The grouped statement, or None if the statement is not in the expected format.
+    """
+
+    lines = cql.strip().split("\n")
+    if (
+        len(lines) < 5
+        or lines[0].strip() != "WITH $dict.rows AS rows"
+        or lines[1].strip().lower() != "unwind rows as row"
+        or not lines[2].strip().startswith("MATCH (source:")
+        or not lines[3].strip().startswith("MATCH (target:")
+    ):
+        return None
+
+    return "\n".join(
+        [
+            "WITH $dict.rows AS rows",
+            "UNWIND rows AS group",
+            "WITH group, group.rows[0] AS row",
+            lines[2].strip(),
+            "WITH source, group",
+            "UNWIND group.rows AS row",
+        ]
+        + [line.strip() for line in lines[3:]]
+    )
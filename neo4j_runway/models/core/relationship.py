@@ -3,6 +3,10 @@ from typing import List, Dict, Union
 from pydantic import BaseModel, field_validator
 
 from .property import Property
+from ...resources.mappings import (
+    SOURCE_COMPRESSIONS_BY_EXTENSION,
+    SOURCE_FORMATS_BY_EXTENSION,
+)
 from ..arrows import ArrowsRelationship
 from ..solutions_workbench import (
     SolutionsWorkbenchRelationship,
@@ -42,13 +46,16 @@ class Relationship(BaseModel):
     @field_validator("csv_name")
     def validate_csv_name(cls, v: str) -> str:
         """
-        Validate the CSV name provided.
+        Validate the CSV name provided. Names of other supported source files, such as Parquet or compressed files, are kept.
         """
 
         if v == "":
             return v
         else:
-            if not v.endswith(".csv"):
+            if not v.lower().endswith(
+                tuple(SOURCE_FORMATS_BY_EXTENSION)
+                + tuple(SOURCE_COMPRESSIONS_BY_EXTENSION)
+            ):
                 return v + ".csv"
         return v
 
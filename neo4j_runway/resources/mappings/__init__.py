@@ -4,3 +4,7 @@ from .type_mappings import (
     TYPES_MAP_SOLUTIONS_WORKBENCH_TO_PYTHON,
     TYPES_MAP_PYTHON_TO_SOLUTIONS_WORKBENCH,
 )
+from .source_formats import (
+    SOURCE_COMPRESSIONS_BY_EXTENSION,
+    SOURCE_FORMATS_BY_EXTENSION,
+)
@@ -1,17 +1,22 @@
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 
-from neo4j import GraphDatabase
+from neo4j import Driver, GraphDatabase
 
 
 def test_database_connection(
-    credentials: Dict[str, str]
+    credentials: Optional[Dict[str, str]] = None, driver: Optional[Driver] = None
 ) -> Dict[str, Union[str, bool]]:
     """
     Verify accurate credentials upon user submission.
+    A driver created from `credentials` is closed once verified. An existing `driver` is verified
+    and left open, so the same driver and its connections may then be passed to PyIngest.
 
     Parameters
     ----------
-    credentials : Dict[str, str]
+    credentials : Optional[Dict[str, str]], optional
+        The uri, username and password to verify. Ignored if `driver` is provided. By default None
+    driver : Optional[Driver], optional
+        An existing driver to verify. By default None
 
     Returns
     -------
@@ -29,11 +34,16 @@ def test_database_connection(
 
     valid = True
     try:
-        d = GraphDatabase.driver(
-            credentials["uri"], auth=(credentials["username"], credentials["password"])
-        )
-        d.verify_connectivity()
-        d.verify_authentication()
+        if driver is not None:
+            driver.verify_connectivity()
+            driver.verify_authentication()
+        else:
+            with GraphDatabase.driver(
+                credentials["uri"],
+                auth=(credentials["username"], credentials["password"]),
+            ) as d:
+                d.verify_connectivity()
+                d.verify_authentication()
     except Exception as e:
         valid = False
         return {
@@ -2,6 +2,7 @@ TEST_DIRS = [
     "test_code_generator/",
     "test_discovery/",
     "test_ingest/",
+    "test_ingest/unit/",
     "test_integration/",
     "test_modeler/",
     "test_models/test_arrows/",
@@ -14,6 +15,7 @@ TEST_DIRS = [
 UNIT_TEST_DIRS = [
     "test_code_generator/",
     "test_discovery/",
+    "test_ingest/unit/",
     "test_modeler/",
     "test_models/test_arrows/",
     "test_models/test_core/",
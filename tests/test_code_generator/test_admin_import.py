@@ -0,0 +1,174 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from neo4j_runway.models import Node, Relationship, Property, DataModel
+from neo4j_runway.code_generation import AdminImportCodeGenerator
+
+
+nodes = [
+    Node(
+        label="Person",
+        properties=[
+            Property(name="id", type="int", csv_mapping="person_id", is_unique=True),
+            Property(name="name", type="str", csv_mapping="name"),
+            Property(name="active", type="bool", csv_mapping="active"),
+        ],
+        csv_name="people.csv",
+    ),
+    Node(
+        label="City",
+        properties=[
+            Property(name="name", type="str", csv_mapping="city", part_of_key=True),
+            Property(
+                name="country", type="str", csv_mapping="country", part_of_key=True
+            ),
+        ],
+        csv_name="people.csv",
+    ),
+]
+relationships = [
+    Relationship(
+        type="LIVES_IN",
+        source="Person",
+        target="City",
+        properties=[
+            Property(name="since", type="neo4j.time.Date", csv_mapping="since")
+        ],
+        csv_name="people.csv",
+    ),
+]
+
+data_model = DataModel(nodes=nodes, relationships=relationships)
+
+people = """person_id,name,active,city,country,since
+1,Alice,true,Paris,France,2020-01-31
+2,Bob,FALSE,Rome,Italy,not a date
+1,Alicia,true,Paris,France,2021-02-28
+,Nobody,true,Oslo,Norway,
+3,Carol,maybe,,,
+"""
+
+
+class TestAdminImportCodeGenerator(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        os.makedirs("data")
+        with open("data/people.csv", "w") as f:
+            f.write(people)
+        self.gen = AdminImportCodeGenerator(
+            data_model=data_model, file_directory="data/", file_output_directory="out/"
+        )
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_node_rows_are_deduplicated_and_typed(self) -> None:
+        rows = self.gen.generate_node_rows(nodes[0])
+
+        self.assertEqual(
+            [":ID(Person)", "id:long", "name:string", "active:boolean"],
+            list(rows.columns),
+        )
+        # the first row of a key wins, as with an initial load, and rows without a key are dropped
+        self.assertEqual(["1", "2", "3"], rows[":ID(Person)"].tolist())
+        self.assertEqual(["Alice", "Bob", "Carol"], rows["name:string"].tolist())
+        self.assertEqual("false", rows["active:boolean"].iloc[1])
+        self.assertTrue(pd.isna(rows["active:boolean"].iloc[2]))
+
+    def test_composite_keys(self) -> None:
+        rows = self.gen.generate_node_rows(nodes[1])
+
+        self.assertEqual(
+            ["Paris\x1fFrance", "Rome\x1fItaly", "Oslo\x1fNorway"],
+            rows[":ID(City)"].tolist(),
+        )
+
+    def test_relationship_rows(self) -> None:
+        rows = self.gen.generate_relationship_rows(relationships[0])
+
+        self.assertEqual(
+            [":START_ID(Person)", ":END_ID(City)", "since:date"], list(rows.columns)
+        )
+        self.assertEqual(
+            [["1", "Paris\x1fFrance", "2020-01-31"], ["2", "Rome\x1fItaly", None]],
+            rows.astype(object).where(rows.notna(), None).values.tolist(),
+        )
+
+    def test_import_files(self) -> None:
+        self.gen.generate_import_files()
+        self.gen.generate_import_command_file()
+        self.gen.generate_constraints_file()
+
+        self.assertEqual(
+            ["City.csv", "LIVES_IN_Person_City.csv", "Person.csv"],
+            sorted(os.listdir("out/import")),
+        )
+        with open("out/import/Person.csv") as f:
+            self.assertEqual(
+                ":ID(Person),id:long,name:string,active:boolean", f.readline().strip()
+            )
+        with open("out/import.sh") as f:
+            self.assertEqual(
+                """#!/bin/sh
+neo4j-admin database import full \\
+    --nodes=Person=import/Person.csv \\
+    --nodes=City=import/City.csv \\
+    --relationships=LIVES_IN=import/LIVES_IN_Person_City.csv \\
+    --skip-bad-relationships=true \\
+    neo4j
+""",
+                f.read(),
+            )
+        with open("out/constraints.cypher") as f:
+            self.assertIn("REQUIRE n.id IS UNIQUE", f.read())
+
+    def test_duplicates_across_chunks(self) -> None:
+        gen = AdminImportCodeGenerator(
+            data_model=data_model,
+            file_directory="data/",
+            file_output_directory="out/",
+            chunk_size=2,
+        )
+        gen.generate_import_files()
+
+        self.assertEqual(
+            3, len(list(gen.iter_node_rows(nodes[0]))), "a chunk per 2 source rows"
+        )
+        people = pd.read_csv("out/import/Person.csv", dtype=str)
+        self.assertEqual(["1", "2", "3"], people[":ID(Person)"].tolist())
+        self.assertEqual(["Alice", "Bob", "Carol"], people["name:string"].tolist())
+        lives_in = pd.read_csv("out/import/LIVES_IN_Person_City.csv", dtype=str)
+        self.assertEqual(
+            [["1", "Paris\x1fFrance"], ["2", "Rome\x1fItaly"]],
+            lives_in[[":START_ID(Person)", ":END_ID(City)"]].values.tolist(),
+        )
+
+    def test_empty_source(self) -> None:
+        with open("data/people.csv", "w") as f:
+            f.write(people.splitlines()[0] + "\n")
+        self.gen.generate_import_files()
+
+        with open("out/import/Person.csv") as f:
+            self.assertEqual(
+                ":ID(Person),id:long,name:string,active:boolean\n", f.read()
+            )
+
+    def test_node_without_keys(self) -> None:
+        node = Node(
+            label="Thing",
+            properties=[Property(name="name", type="str", csv_mapping="name")],
+            csv_name="people.csv",
+        )
+        with self.assertRaises(ValueError):
+            self.gen.generate_node_rows(node)
+
+
+if __name__ == "__main__":
+    unittest.main()
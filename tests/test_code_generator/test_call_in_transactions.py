@@ -0,0 +1,86 @@
+import unittest
+
+from neo4j_runway.models import Node, Property, DataModel
+from neo4j_runway.code_generation import PyIngestConfigGenerator
+from neo4j_runway.code_generation.cypher import (
+    generate_call_in_transactions_clause,
+    generate_merge_node_clause_standard,
+)
+
+
+node = Node(
+    label="Person",
+    properties=[
+        Property(name="name", type="str", csv_mapping="name", is_unique=True),
+        Property(name="age", type="int", csv_mapping="age"),
+    ],
+    csv_name="people.csv",
+)
+
+data_model = DataModel(nodes=[node], relationships=[])
+
+
+class TestCallInTransactions(unittest.TestCase):
+
+    def test_clause(self) -> None:
+        self.assertEqual(
+            """WITH $dict.rows AS rows
+UNWIND rows AS row
+CALL {
+    WITH row
+    MERGE (n:Person {name: row.name})
+    SET n.age = toIntegerOrNull(row.age)
+} IN 4 CONCURRENT TRANSACTIONS OF 500 ROWS ON ERROR CONTINUE""",
+            generate_call_in_transactions_clause(
+                generate_merge_node_clause_standard(node),
+                batch_size=500,
+                concurrency=4,
+                on_error="continue",
+            ),
+        )
+
+    def test_columnar_clause_imports_columns(self) -> None:
+        self.assertEqual(
+            """WITH $dict.cols AS cols
+UNWIND range(0, $dict.size - 1) AS i
+CALL {
+    WITH cols, i
+    MERGE (n:Person {name: cols.name[i]})
+    SET n.age = toIntegerOrNull(cols.age[i])
+} IN TRANSACTIONS OF 1000 ROWS""",
+            generate_call_in_transactions_clause(
+                generate_merge_node_clause_standard(node, columnar=True)
+            ),
+        )
+
+    def test_unsupported_on_error(self) -> None:
+        with self.assertRaises(ValueError):
+            generate_call_in_transactions_clause(
+                generate_merge_node_clause_standard(node), on_error="skip"
+            )
+
+    def test_config_wraps_statements(self) -> None:
+        gen = PyIngestConfigGenerator(
+            data_model=data_model,
+            global_batch_size=10000,
+            transaction_batch_size=1000,
+            on_error="break",
+        )
+
+        self.assertIn(
+            "} IN TRANSACTIONS OF 1000 ROWS ON ERROR BREAK",
+            gen._config_files_list[0]["cql"],
+        )
+        self.assertEqual(10000, gen._config_files_list[0]["chunk_size"])
+        # the standalone cypher is unchanged
+        self.assertNotIn("CALL", gen.generate_cypher_string())
+
+    def test_initial_load_is_refused(self) -> None:
+        with self.assertRaises(ValueError):
+            PyIngestConfigGenerator(
+                data_model=data_model, transaction_batch_size=1000, initial_load=True
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from neo4j_runway.models import Node, Relationship, Property, DataModel
+from neo4j_runway.code_generation import PyIngestConfigGenerator
+
+
+nodes = [
+    Node(
+        label="Person",
+        properties=[
+            Property(name="id", type="int", csv_mapping="person_id", is_unique=True),
+            Property(name="born", type="neo4j.time.Date", csv_mapping="born"),
+            Property(name="wakes", type="neo4j.time.Time", csv_mapping="wakes"),
+            Property(name="home", type="neo4j.spatial.Point", csv_mapping="home"),
+        ],
+        csv_name="people.csv",
+    ),
+    Node(
+        label="Pet",
+        properties=[
+            Property(name="name", type="str", csv_mapping="pet_name", is_unique=True),
+        ],
+        csv_name="people.csv",
+    ),
+]
+rel = Relationship(
+    type="HAS_PET",
+    source="Person",
+    target="Pet",
+    properties=[Property(name="since", type="float", csv_mapping="since")],
+    csv_name="people.csv",
+)
+
+data_model = DataModel(nodes=nodes, relationships=[rel])
+
+
+class TestClientSideCasting(unittest.TestCase):
+
+    def test_cypher_is_cast_free(self) -> None:
+        gen = PyIngestConfigGenerator(data_model=data_model, client_side_casting=True)
+
+        self.assertEqual(
+            """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {id: row.person_id})
+SET n.born = row.born, n.wakes = time(row.wakes), n.home = point(row.home)""",
+            gen._cypher["Person"]["cypher"],
+        )
+        self.assertEqual(
+            """WITH $dict.rows AS rows
+UNWIND rows as row
+MATCH (source:Person {id: row.person_id})
+MATCH (target:Pet {name: row.pet_name})
+MERGE (source)-[n:HAS_PET]->(target)
+SET n.since = row.since""",
+            gen._cypher["HAS_PET_Person_Pet"]["cypher"],
+        )
+
+    def test_files_declare_column_types(self) -> None:
+        gen = PyIngestConfigGenerator(data_model=data_model, client_side_casting=True)
+        files = gen._config_files_list
+
+        self.assertEqual({"person_id": "int", "born": "date"}, files[0]["column_types"])
+        self.assertNotIn("column_types", files[1])
+        self.assertEqual(
+            {"since": "float", "person_id": "int"}, files[2]["column_types"]
+        )
+        self.assertIn("column_types:\n    born: date", gen.generate_config_string())
+
+    def test_server_side_casting_by_default(self) -> None:
+        gen = PyIngestConfigGenerator(data_model=data_model)
+
+        self.assertIn("toIntegerOrNull(row.person_id)", gen._cypher["Person"]["cypher"])
+        self.assertNotIn("column_types", gen._config_files_list[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
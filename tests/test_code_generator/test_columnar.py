@@ -0,0 +1,69 @@
+import unittest
+
+from neo4j_runway.models import Node, Relationship, Property, DataModel
+from neo4j_runway.code_generation import PyIngestConfigGenerator
+
+
+nodes = [
+    Node(
+        label="Person",
+        properties=[
+            Property(
+                name="name",
+                type="str",
+                csv_mapping="name",
+                csv_mapping_other="friend",
+                is_unique=True,
+            ),
+            Property(name="age", type="int", csv_mapping="age"),
+        ],
+        csv_name="people.csv",
+    ),
+]
+rel = Relationship(
+    type="KNOWS",
+    source="Person",
+    target="Person",
+    properties=[Property(name="since", type="str", csv_mapping="since")],
+    csv_name="people.csv",
+)
+
+data_model = DataModel(nodes=nodes, relationships=[rel])
+
+
+class TestColumnar(unittest.TestCase):
+
+    def test_statements_read_columns(self) -> None:
+        gen = PyIngestConfigGenerator(data_model=data_model, columnar=True)
+
+        self.assertEqual(
+            """WITH $dict.cols AS cols
+UNWIND range(0, $dict.size - 1) AS i
+MERGE (n:Person {name: cols.name[i]})
+SET n.age = toIntegerOrNull(cols.age[i])""",
+            gen._cypher["Person"]["cypher"],
+        )
+        self.assertEqual(
+            """WITH $dict.cols AS cols
+UNWIND range(0, $dict.size - 1) AS i
+MATCH (source:Person {name: cols.name[i]})
+MATCH (target:Person {name: cols.friend[i]})
+MERGE (source)-[n:KNOWS]->(target)
+SET n.since = cols.since[i]""",
+            gen._cypher["KNOWS_Person_Person"]["cypher"],
+        )
+        self.assertTrue(all([file["columnar"] for file in gen._config_files_list]))
+
+    def test_rows_by_default(self) -> None:
+        gen = PyIngestConfigGenerator(data_model=data_model)
+
+        self.assertTrue(
+            gen._cypher["Person"]["cypher"].startswith(
+                "WITH $dict.rows AS rows\nUNWIND rows AS row\n"
+            )
+        )
+        self.assertNotIn("columnar", gen._config_files_list[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+import yaml
+
+from neo4j_runway.models import Node, Relationship, Property, DataModel
+from neo4j_runway.code_generation import (
+    PyIngestConfigGenerator,
+    StandardCypherCodeGenerator,
+)
+
+
+nodes = [
+    Node(
+        label="Person",
+        properties=[
+            Property(name="id", type="int", csv_mapping="person_id", is_unique=True),
+            Property(name="name", type="str", csv_mapping="name"),
+        ],
+        csv_name="people.csv",
+    ),
+    Node(
+        label="Pet",
+        properties=[
+            Property(name="name", type="str", csv_mapping="pet_name", is_unique=True),
+        ],
+        csv_name="pets.csv",
+    ),
+]
+rel = Relationship(
+    type="HAS_PET",
+    source="Person",
+    target="Pet",
+    properties=[
+        Property(name="since", type="int", csv_mapping="since"),
+        Property(name="tag", type="str", csv_mapping="tag", is_unique=True),
+    ],
+    csv_name="pets.csv",
+)
+
+data_model = DataModel(nodes=nodes, relationships=[rel])
+
+
+class TestInitialLoad(unittest.TestCase):
+
+    def test_statements_create(self) -> None:
+        gen = StandardCypherCodeGenerator(data_model=data_model, initial_load=True)
+
+        self.assertEqual(
+            """WITH $dict.rows AS rows
+UNWIND rows AS row
+CREATE (n:Person {id: toIntegerOrNull(row.person_id)})
+SET n.name = row.name""",
+            gen._cypher["Person"]["cypher"],
+        )
+        self.assertEqual(
+            """WITH $dict.rows AS rows
+UNWIND rows as row
+MATCH (source:Person {id: toIntegerOrNull(row.person_id)})
+MATCH (target:Pet {name: row.pet_name})
+CREATE (source)-[n:HAS_PET]->(target)
+SET n.since = toIntegerOrNull(row.since)""",
+            gen._cypher["HAS_PET_Person_Pet"]["cypher"],
+        )
+
+    def test_sparse_rows_do_not_coalesce_new_entities(self) -> None:
+        gen = StandardCypherCodeGenerator(
+            data_model=data_model, initial_load=True, sparse_rows=True
+        )
+
+        self.assertNotIn("coalesce", gen._cypher["Person"]["cypher"])
+
+    def test_config_defers_constraints(self) -> None:
+        gen = PyIngestConfigGenerator(
+            data_model=data_model,
+            initial_load=True,
+            post_ingest_code=["CREATE INDEX person_name FOR (n:Person) ON (n.name)"],
+        )
+        config = yaml.safe_load(gen.generate_config_string())
+
+        self.assertTrue(config["initial_load"])
+        self.assertNotIn("pre_ingest", config)
+        self.assertEqual(
+            [
+                "CREATE CONSTRAINT person_id IF NOT EXISTS FOR (n:Person) REQUIRE n.id IS UNIQUE;",
+                "CREATE CONSTRAINT pet_name IF NOT EXISTS FOR (n:Pet) REQUIRE n.name IS UNIQUE;",
+            ],
+            config["pre_relationships"],
+        )
+        self.assertEqual(
+            "CREATE CONSTRAINT has_pet_tag IF NOT EXISTS FOR (n:HAS_PET) REQUIRE n.tag IS UNIQUE;",
+            config["post_ingest"][0],
+        )
+        self.assertEqual(
+            "CREATE INDEX person_name FOR (n:Person) ON (n.name)",
+            config["post_ingest"][1],
+        )
+        self.assertIn("CREATE (n:Person", config["files"][0]["cql"])
+
+    def test_config_creates_constraints_first_by_default(self) -> None:
+        config = yaml.safe_load(
+            PyIngestConfigGenerator(data_model=data_model).generate_config_string()
+        )
+
+        self.assertNotIn("initial_load", config)
+        self.assertEqual(3, len(config["pre_ingest"]))
+        self.assertIn("MERGE (n:Person", config["files"][0]["cql"])
+
+
+if __name__ == "__main__":
+    unittest.main()
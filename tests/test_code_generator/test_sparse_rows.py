@@ -0,0 +1,61 @@
+import unittest
+
+from neo4j_runway.models import Node, Relationship, Property, DataModel
+from neo4j_runway.code_generation import PyIngestConfigGenerator
+
+
+nodes = [
+    Node(
+        label="Person",
+        properties=[
+            Property(name="name", type="str", csv_mapping="name", is_unique=True),
+            Property(name="age", type="int", csv_mapping="age"),
+        ],
+        csv_name="people.csv",
+    ),
+    Node(
+        label="City",
+        properties=[
+            Property(name="name", type="str", csv_mapping="city", is_unique=True),
+        ],
+        csv_name="people.csv",
+    ),
+]
+rel = Relationship(
+    type="LIVES_IN",
+    source="Person",
+    target="City",
+    properties=[Property(name="since", type="int", csv_mapping="since")],
+    csv_name="people.csv",
+)
+
+data_model = DataModel(nodes=nodes, relationships=[rel])
+
+
+class TestSparseRows(unittest.TestCase):
+
+    def test_set_keeps_missing_properties(self) -> None:
+        gen = PyIngestConfigGenerator(data_model=data_model, sparse_rows=True)
+
+        self.assertEqual(
+            """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = coalesce(toIntegerOrNull(row.age), n.age)""",
+            gen._cypher["Person"]["cypher"],
+        )
+        self.assertIn(
+            "SET n.since = coalesce(toIntegerOrNull(row.since), n.since)",
+            gen._cypher["LIVES_IN_Person_City"]["cypher"],
+        )
+        self.assertTrue(all([file["sparse_rows"] for file in gen._config_files_list]))
+
+    def test_dense_rows_by_default(self) -> None:
+        gen = PyIngestConfigGenerator(data_model=data_model)
+
+        self.assertNotIn("coalesce", gen._cypher["Person"]["cypher"])
+        self.assertNotIn("sparse_rows", gen._config_files_list[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+"""
+A minimal in-memory stand in for the Neo4j driver, used to test ingestion without a database.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from neo4j import Query
+
+from neo4j_runway.ingestion.report import COUNTER_NAMES
+
+
+def get_batch_rows(batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    The rows of a batch, which may be columnar.
+    """
+    if "cols" in batch:
+        return [
+            {column: values[i] for column, values in batch["cols"].items()}
+            for i in range(batch["size"])
+        ]
+    return batch["rows"]
+
+
+class FakeResult:
+    def __init__(
+        self,
+        counters: Optional[Dict[str, int]] = None,
+        record: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.counters = counters
+        self.record = record
+
+    def single(self) -> Optional[Dict[str, Any]]:
+        return self.record
+
+    def consume(self) -> Optional[SimpleNamespace]:
+        if self.counters is None:
+            return None
+        # a stand in for the ResultSummary, with every counter defaulting to 0
+        counters = dict.fromkeys(COUNTER_NAMES, 0)
+        counters.update(self.counters)
+        return SimpleNamespace(counters=SimpleNamespace(**counters))
+
+
+class FakeTransaction:
+    def __init__(self, session: "FakeSession", metadata: Dict[str, Any]) -> None:
+        self.session = session
+        self.metadata = metadata
+
+    def run(self, query: str, **kwargs: Any) -> FakeResult:
+        return self.session._record(query, kwargs, self.metadata)
+
+
+class FakeSession:
+    def __init__(self, driver: "FakeDriver", config: Dict[str, Any]) -> None:
+        self.driver = driver
+        self.config = config
+
+    def __enter__(self) -> "FakeSession":
+        return self
+
+    def __exit__(self, *args) -> None:
+        return None
+
+    def _record(
+        self,
+        query: str,
+        params: Dict[str, Any],
+        metadata: Dict[str, Any],
+        auto_commit: bool = False,
+    ) -> FakeResult:
+        with self.driver.lock:
+            if self.driver.errors:
+                raise self.driver.errors.pop(0)
+            if len(self.driver.runs) in self.driver.errors_at:
+                raise self.driver.errors_at.pop(len(self.driver.runs))
+            if self.driver.on_run is not None:
+                self.driver.on_run(len(self.driver.runs))
+            self.driver.runs.append(
+                {
+                    "query": query,
+                    "params": params,
+                    "metadata": metadata,
+                    "thread": threading.get_ident(),
+                    "database": self.config.get("database"),
+                    "auto_commit": auto_commit,
+                }
+            )
+        return FakeResult(self.driver.counters, self.driver.records.get(query))
+
+    def run(self, query: Union[str, Query], **kwargs: Any) -> FakeResult:
+        if isinstance(query, Query):
+            return self._record(
+                query.text, kwargs, query.metadata or dict(), auto_commit=True
+            )
+        return self._record(query, kwargs, dict(), auto_commit=True)
+
+    def execute_write(self, transaction_function: Callable, *args: Any) -> Any:
+        metadata = getattr(transaction_function, "metadata", None) or dict()
+        return transaction_function(FakeTransaction(self, metadata), *args)
+
+    def close(self) -> None:
+        return None
+
+
+class FakeDriver:
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.runs: List[Dict[str, Any]] = list()
+        # errors to raise, in order, from the next runs
+        self.errors: List[Exception] = list()
+        # errors to raise once the given number of runs have succeeded
+        self.errors_at: Dict[int, Exception] = dict()
+        # called with the number of previous runs before each run
+        self.on_run: Optional[Callable[[int], None]] = None
+        # the update counters returned by the summary of each run
+        self.counters: Optional[Dict[str, int]] = None
+        # the record returned by `single`, by query
+        self.records: Dict[str, Dict[str, Any]] = dict()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def session(self, **kwargs: Any) -> FakeSession:
+        return FakeSession(self, kwargs)
+
+    def close(self) -> None:
+        self.closed = True
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        return [
+            row
+            for run in self.runs
+            if "dict" in run["params"]
+            for row in get_batch_rows(run["params"]["dict"])
+        ]
+
+
+class FakeAsyncResult:
+    def __init__(self, record: Optional[Dict[str, Any]] = None) -> None:
+        self.record = record
+
+    async def consume(self) -> None:
+        return None
+
+    async def single(self) -> Optional[Dict[str, Any]]:
+        return self.record
+
+
+class FakeAsyncTransaction:
+    def __init__(self, session: "FakeAsyncSession", metadata: Dict[str, Any]) -> None:
+        self.session = session
+        self.metadata = metadata
+
+    async def run(self, query: str, **kwargs: Any) -> FakeAsyncResult:
+        return await self.session._record(query, kwargs, self.metadata)
+
+
+class FakeAsyncSession:
+    def __init__(self, driver: "FakeAsyncDriver") -> None:
+        self.driver = driver
+
+    async def __aenter__(self) -> "FakeAsyncSession":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        return None
+
+    async def _record(
+        self,
+        query: str,
+        params: Dict[str, Any],
+        metadata: Dict[str, Any],
+        auto_commit: bool = False,
+    ) -> FakeAsyncResult:
+        self.driver.in_flight += 1
+        self.driver.max_in_flight = max(
+            self.driver.max_in_flight, self.driver.in_flight
+        )
+        # a commit takes longer than reading the next chunk, so other batches run concurrently
+        await asyncio.sleep(0.01)
+        self.driver.in_flight -= 1
+        if len(self.driver.runs) in self.driver.errors_at:
+            raise self.driver.errors_at.pop(len(self.driver.runs))
+        self.driver.runs.append(
+            {
+                "query": query,
+                "params": params,
+                "metadata": metadata,
+                "auto_commit": auto_commit,
+            }
+        )
+        return FakeAsyncResult(self.driver.records.get(query))
+
+    async def run(self, query: Union[str, Query], **kwargs: Any) -> FakeAsyncResult:
+        if isinstance(query, Query):
+            return await self._record(
+                query.text, kwargs, query.metadata or dict(), auto_commit=True
+            )
+        return await self._record(query, kwargs, dict(), auto_commit=True)
+
+    async def execute_write(self, transaction_function: Callable, *args: Any) -> Any:
+        metadata = getattr(transaction_function, "metadata", None) or dict()
+        return await transaction_function(FakeAsyncTransaction(self, metadata), *args)
+
+
+class FakeAsyncDriver:
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.runs: List[Dict[str, Any]] = list()
+        # errors to raise once the given number of runs have succeeded
+        self.errors_at: Dict[int, Exception] = dict()
+        # the record returned by `single`, by query
+        self.records: Dict[str, Dict[str, Any]] = dict()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    def session(self, **kwargs: Any) -> FakeAsyncSession:
+        return FakeAsyncSession(self)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        return [
+            row
+            for run in self.runs
+            if "dict" in run["params"]
+            for row in get_batch_rows(run["params"]["dict"])
+        ]
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from neo4j.exceptions import TransientError
+import pandas as pd
+
+from neo4j_runway.ingestion import AsyncPyIngest
+from .fake_driver import FakeAsyncDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+
+pre_ingest:
+  - CREATE CONSTRAINT person_name IF NOT EXISTS FOR (n:Person) REQUIRE n.name IS UNIQUE;
+files:
+- chunk_size: 5
+  retry_delay: 0
+  cql: |
+    WITH $dict.rows AS rows
+    UNWIND rows AS row
+    MERGE (n:Person {name: row.name})
+  url: $BASE/people.csv
+"""
+
+data = pd.DataFrame({"name": [f"person_{i}" for i in range(50)]})
+
+knows_config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+
+files:
+- chunk_size: 5
+  cql: |
+    WITH $dict.rows AS rows
+    UNWIND rows as row
+    MATCH (source:Person {name: row.name})
+    MATCH (target:Person {name: row.name})
+    MERGE (source)-[n:KNOWS]->(target)
+  url: $BASE/people.csv
+"""
+
+
+class TestAsyncPyIngest(unittest.TestCase):
+
+    def run_ingest(self, driver: FakeAsyncDriver, **kwargs) -> None:
+        with patch(
+            "neo4j_runway.ingestion.async_pyingest.AsyncGraphDatabase.driver",
+            new=lambda *args, **driver_kwargs: driver,
+        ):
+            asyncio.run(AsyncPyIngest(config=config, dataframe=data, **kwargs))
+
+    def test_all_rows_loaded(self) -> None:
+        driver = FakeAsyncDriver()
+        self.run_ingest(driver, max_in_flight=3)
+
+        self.assertIn("CREATE CONSTRAINT", driver.runs[0]["query"])
+        self.assertEqual(set(data["name"]), {row["name"] for row in driver.rows})
+        self.assertEqual(len(data), len(driver.rows))
+        self.assertTrue(driver.closed)
+
+    def test_in_flight_batches_are_bounded(self) -> None:
+        driver = FakeAsyncDriver()
+        self.run_ingest(driver, max_in_flight=3)
+
+        self.assertEqual(3, driver.max_in_flight)
+
+    def test_transient_errors_are_retried(self) -> None:
+        driver = FakeAsyncDriver()
+        # the constraint statement runs first, then the first batch fails once
+        driver.errors_at[1] = TransientError("deadlock")
+        with self.assertWarns(UserWarning):
+            self.run_ingest(driver, max_in_flight=1)
+
+        self.assertEqual(list(data["name"]), [row["name"] for row in driver.rows])
+
+    def test_transaction_metadata(self) -> None:
+        driver = FakeAsyncDriver()
+        self.run_ingest(driver, max_in_flight=1)
+
+        self.assertEqual(
+            {"app": "neo4j-runway", "file": "$BASE/people.csv", "chunk": 0},
+            driver.runs[1]["metadata"],
+        )
+
+    def test_relationship_batches_are_written_one_at_a_time(self) -> None:
+        driver = FakeAsyncDriver()
+        asyncio.run(
+            AsyncPyIngest(
+                config=knows_config, dataframe=data, driver=driver, max_in_flight=3
+            )
+        )
+
+        self.assertEqual(1, driver.max_in_flight)
+        self.assertEqual(len(data), len(driver.rows))
+
+    def test_chunks_are_read_off_the_event_loop(self) -> None:
+        read_threads = set()
+
+        def chunks():
+            for start in range(0, len(data), 10):
+                read_threads.add(threading.get_ident())
+                yield data.iloc[start : start + 10]
+
+        driver = FakeAsyncDriver()
+        asyncio.run(
+            AsyncPyIngest(
+                config=config, dataframe=chunks(), driver=driver, read_in_thread=True
+            )
+        )
+
+        self.assertNotIn(threading.get_ident(), read_threads)
+        self.assertEqual(len(data), len(driver.rows))
+
+    def test_chunks_are_read_on_the_event_loop_by_default(self) -> None:
+        read_threads = set()
+
+        def chunks():
+            for start in range(0, len(data), 10):
+                read_threads.add(threading.get_ident())
+                yield data.iloc[start : start + 10]
+
+        driver = FakeAsyncDriver()
+        asyncio.run(AsyncPyIngest(config=config, dataframe=chunks(), driver=driver))
+
+        self.assertEqual({threading.get_ident()}, read_threads)
+        self.assertEqual(len(data), len(driver.rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import patch
+import warnings
+
+from neo4j.exceptions import Neo4jError
+import pandas as pd
+
+from neo4j_runway.ingestion.batching import BatchSizeController, is_memory_error
+from neo4j_runway.ingestion.pyingest import LocalServer, load_config
+from .fake_driver import FakeDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+"""
+
+cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})"""
+
+data = pd.DataFrame({"name": [str(i) for i in range(30)]})
+
+
+def get_error(code: str) -> Neo4jError:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return Neo4jError.hydrate(code=code, message="failed")
+
+
+memory_error = get_error("Neo.TransientError.General.MemoryPoolOutOfMemoryError")
+
+
+class TestBatchSizeController(unittest.TestCase):
+
+    def test_grows_when_fast(self) -> None:
+        controller = BatchSizeController(initial_size=100, target_latency=1.0)
+        controller.record_success(rows=100, seconds=0.1)
+        # grows by at most a factor of 2
+        self.assertEqual(200, controller.size)
+
+    def test_shrinks_when_slow(self) -> None:
+        controller = BatchSizeController(initial_size=100, target_latency=1.0)
+        controller.record_success(rows=100, seconds=1.6)
+        self.assertEqual(62, controller.size)
+
+    def test_settles_near_target(self) -> None:
+        controller = BatchSizeController(initial_size=100, target_latency=1.0)
+        controller.record_success(rows=100, seconds=1.1)
+        self.assertEqual(100, controller.size)
+
+    def test_ignores_partial_batches(self) -> None:
+        controller = BatchSizeController(initial_size=100, target_latency=1.0)
+        controller.record_success(rows=10, seconds=0.01)
+        self.assertEqual(100, controller.size)
+        self.assertEqual([0.01], controller.latencies)
+
+    def test_memory_error_halves_size(self) -> None:
+        controller = BatchSizeController(initial_size=3, target_latency=1.0)
+        self.assertTrue(controller.record_memory_error())
+        self.assertEqual(1, controller.size)
+        self.assertFalse(controller.record_memory_error())
+
+    def test_is_memory_error(self) -> None:
+        self.assertTrue(is_memory_error(memory_error))
+        self.assertFalse(
+            is_memory_error(
+                get_error("Neo.TransientError.Transaction.DeadlockDetected")
+            )
+        )
+
+
+class TestAdaptiveBatching(unittest.TestCase):
+
+    def setUp(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            self.server = LocalServer()
+        self.driver = self.server._driver
+
+    def test_small_chunks_are_grouped(self) -> None:
+        self.server.load_dataframe(
+            {
+                "url": "people.csv",
+                "cql": cql,
+                "chunk_size": 2,
+                "target_batch_latency": 60,
+            },
+            dataframe=data,
+        )
+
+        self.assertEqual(
+            [2, 4, 8, 16],
+            [len(run["params"]["dict"]["rows"]) for run in self.driver.runs],
+        )
+        self.assertEqual(
+            data["name"].tolist(), [row["name"] for row in self.driver.rows]
+        )
+        self.assertEqual(32, self.server.batch_sizes[0]["batch_size"])
+
+    def test_memory_error_splits_batch(self) -> None:
+        self.driver.errors = [memory_error]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.server.load_dataframe(
+                {
+                    "url": "people.csv",
+                    "cql": cql,
+                    "chunk_size": 10,
+                    "target_batch_latency": 60,
+                },
+                dataframe=data,
+            )
+
+        self.assertEqual(
+            [5, 10, 15],
+            [len(run["params"]["dict"]["rows"]) for run in self.driver.runs],
+        )
+        self.assertEqual(
+            data["name"].tolist(), [row["name"] for row in self.driver.rows]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
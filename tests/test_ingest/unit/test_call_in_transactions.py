@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+import warnings
+
+from neo4j.exceptions import TransientError
+import pandas as pd
+
+from neo4j_runway.ingestion import AsyncPyIngest
+from neo4j_runway.ingestion.pyingest import PyIngest
+from neo4j_runway.ingestion.statements import (
+    get_statement_info,
+    is_call_in_transactions,
+)
+from .fake_driver import FakeAsyncDriver, FakeDriver
+
+person_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+CALL {
+    WITH row
+    MERGE (n:Person {name: row.name})
+    SET n.age = toIntegerOrNull(row.age)
+} IN 2 CONCURRENT TRANSACTIONS OF 2 ROWS ON ERROR CONTINUE"""
+
+config = f"""
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+files:
+  - url: people.csv
+    chunk_size: 4
+    retry_delay: 0
+    cql: |
+      {person_cql.replace(chr(10), chr(10) + "      ")}
+"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Carol", "Dan", "Eve"],
+        "age": ["30", "40", "50", "60", "70"],
+        "city": ["Paris", "Rome", "Oslo", "Lima", "Pune"],
+    }
+)
+
+
+class TestCallInTransactions(unittest.TestCase):
+
+    def test_statement_detection(self) -> None:
+        self.assertTrue(is_call_in_transactions(person_cql))
+        self.assertTrue(
+            is_call_in_transactions("CALL { WITH row CREATE (n) } IN TRANSACTIONS")
+        )
+        self.assertFalse(
+            is_call_in_transactions(
+                "WITH $dict.rows AS rows\nUNWIND rows AS row\nMERGE (n:Person {name: row.name})"
+            )
+        )
+        # importing the row into the subquery does not hide the columns it uses
+        self.assertEqual(["name", "age"], get_statement_info(person_cql).columns)
+
+    def test_batches_run_in_auto_commit_transactions(self) -> None:
+        driver = FakeDriver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            report = PyIngest(config=config, dataframe=data, driver=driver)
+
+        self.assertEqual(
+            [4, 1], [len(run["params"]["dict"]["rows"]) for run in driver.runs]
+        )
+        self.assertTrue(all([run["auto_commit"] for run in driver.runs]))
+        self.assertEqual(0, driver.runs[0]["metadata"]["chunk"])
+        self.assertEqual({"name", "age"}, set(driver.rows[0]))
+        self.assertEqual(5, report.rows)
+
+    def test_auto_commit_batches_are_retried(self) -> None:
+        driver = FakeDriver()
+        driver.errors = [TransientError("leader switch")]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            report = PyIngest(config=config, dataframe=data, driver=driver)
+
+        self.assertEqual(1, report.retries)
+        self.assertEqual(5, len(driver.rows))
+
+    def test_initial_load_is_refused(self) -> None:
+        driver = FakeDriver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            with self.assertRaises(ValueError):
+                PyIngest(
+                    config=config.replace("files:", "initial_load: true\nfiles:"),
+                    dataframe=data,
+                    driver=driver,
+                )
+
+        # nothing is checked or written
+        self.assertEqual([], driver.runs)
+
+    def test_async_batches_run_in_auto_commit_transactions(self) -> None:
+        driver = FakeAsyncDriver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            asyncio.run(AsyncPyIngest(config=config, dataframe=data, driver=driver))
+
+        self.assertEqual(2, len(driver.runs))
+        self.assertTrue(all([run["auto_commit"] for run in driver.runs]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+import datetime
+import os
+import tempfile
+import unittest
+import warnings
+
+import pandas as pd
+
+from neo4j_runway.ingestion.casting import (
+    cast_boolean,
+    cast_columns,
+    cast_date,
+    cast_datetime,
+    cast_float,
+    cast_integer,
+    get_column_types,
+    to_records,
+)
+from neo4j_runway.ingestion.pyingest import PyIngest
+from .fake_driver import FakeDriver
+
+person_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {id: row.id})
+SET n.name = row.name, n.score = row.score, n.active = row.active, n.born = row.born"""
+
+config = f"""
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+files:
+  - url: people.csv
+    chunk_size: 10
+    column_types:
+      id: int
+      score: float
+      active: bool
+      born: date
+    cql: |
+      {person_cql.replace(chr(10), chr(10) + "      ")}
+"""
+
+data = pd.DataFrame(
+    {
+        "id": ["1", "2", "3"],
+        "name": ["Alice", None, "Carol"],
+        "score": ["1.5", "", "x"],
+        "active": ["true", "FALSE", "yes"],
+        "born": ["1990-01-31", "not a date", None],
+    }
+)
+
+
+class TestCasting(unittest.TestCase):
+
+    def test_cast_integer(self) -> None:
+        result = cast_integer(
+            pd.Series(["9007199254740993", " -4 ", "2.9", "abc", None, "inf"])
+        )
+
+        self.assertEqual("Int64", str(result.dtype))
+        self.assertEqual(
+            [9007199254740993, -4, 2, None, None, None],
+            [None if pd.isna(value) else value for value in result],
+        )
+
+    def test_cast_integer_out_of_range(self) -> None:
+        result = cast_integer(
+            pd.Series(
+                [
+                    "99999999999999999999",
+                    "1e30",
+                    "-1e30",
+                    "9223372036854775807",
+                    "-9223372036854775808",
+                    "9223372036854775808",
+                    "-9223372036854775809",
+                    "-1e18",
+                ]
+            )
+        )
+
+        self.assertEqual(
+            [
+                None,
+                None,
+                None,
+                9223372036854775807,
+                -9223372036854775808,
+                None,
+                None,
+                -(10**18),
+            ],
+            [None if pd.isna(value) else value for value in result],
+        )
+
+    def test_cast_integer_repeated_index(self) -> None:
+        column = pd.Series(["1", "2.5", "x", "3"], index=[0, 1, 0, 1])
+        result = cast_integer(column)
+
+        self.assertEqual([0, 1, 0, 1], result.index.tolist())
+        self.assertEqual(
+            [1, 2, None, 3], [None if pd.isna(value) else value for value in result]
+        )
+
+    def test_cast_float(self) -> None:
+        result = cast_float(pd.Series(["1.5", "-2", "x", None]))
+
+        self.assertEqual([1.5, -2.0], result.iloc[:2].tolist())
+        self.assertTrue(result.iloc[2:].isna().all())
+
+    def test_cast_boolean(self) -> None:
+        result = cast_boolean(pd.Series(["true", " False ", "1", None]))
+
+        self.assertEqual(
+            [True, False, None, None],
+            [None if pd.isna(value) else value for value in result],
+        )
+
+    def test_cast_temporal(self) -> None:
+        dates = cast_date(pd.Series(["2024-02-29", "2024-02-30", None]))
+        datetimes = cast_datetime(
+            pd.Series(["2024-01-01T12:00:00", "2024-01-01T12:00:00+02:00", "x"])
+        )
+
+        self.assertEqual(datetime.date(2024, 2, 29), dates.iloc[0])
+        self.assertTrue(dates.iloc[1:].isna().all())
+        self.assertEqual(
+            pd.Timestamp("2024-01-01T12:00:00", tz="UTC"), datetimes.iloc[0]
+        )
+        self.assertEqual(
+            pd.Timestamp("2024-01-01T10:00:00", tz="UTC"), datetimes.iloc[1]
+        )
+        self.assertTrue(pd.isna(datetimes.iloc[2]))
+
+    def test_unknown_type_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            get_column_types({"id": "integer"})
+
+    def test_to_records_sends_null_for_cast_columns(self) -> None:
+        rows = cast_columns(data, get_column_types({"id": "int", "score": "float"}))
+        records = to_records(rows, {"id": "int", "score": "float"})
+
+        self.assertEqual(
+            {
+                "id": 2,
+                "name": "",
+                "score": None,
+                "active": "FALSE",
+                "born": "not a date",
+            },
+            records[1],
+        )
+        self.assertIsInstance(records[0]["id"], int)
+        self.assertEqual(to_records(data), data.fillna(value="").to_dict("records"))
+
+    def test_ingest_sends_native_values(self) -> None:
+        driver = FakeDriver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            PyIngest(config=config, dataframe=data, driver=driver)
+
+        self.assertEqual(
+            [
+                {
+                    "id": 1,
+                    "name": "Alice",
+                    "score": 1.5,
+                    "active": True,
+                    "born": datetime.date(1990, 1, 31),
+                },
+                {
+                    "id": 2,
+                    "name": "",
+                    "score": None,
+                    "active": False,
+                    "born": None,
+                },
+                {"id": 3, "name": "Carol", "score": None, "active": None, "born": None},
+            ],
+            driver.rows,
+        )
+
+    def test_ingest_repeated_index(self) -> None:
+        driver = FakeDriver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            PyIngest(config=config, dataframe=pd.concat([data, data]), driver=driver)
+
+        self.assertEqual([1, 2, 3, 1, 2, 3], [row["id"] for row in driver.rows])
+        self.assertEqual(
+            [True, False, None, True, False, None],
+            [row["active"] for row in driver.rows],
+        )
+
+    def test_parallel_csv_casts_in_workers(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "people.csv")
+            data.to_csv(path, index=False)
+            driver = FakeDriver()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                PyIngest(
+                    config=config.replace("url: people.csv", f"url: {path}"),
+                    driver=driver,
+                    parse_processes=2,
+                )
+
+        self.assertEqual([1, 2, 3], [row["id"] for row in driver.rows])
+        self.assertEqual([True, False, None], [row["active"] for row in driver.rows])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import signal
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from neo4j.exceptions import ClientError
+
+from neo4j_runway.ingestion.checkpoint import CheckpointStore
+from neo4j_runway.ingestion.pyingest import PyIngest
+from .fake_driver import FakeDriver
+
+
+def get_config(directory: str) -> str:
+    return f"""
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+basepath: {directory}
+
+files:
+- chunk_size: 2
+  cql: |
+    WITH $dict.rows AS rows
+    UNWIND rows AS row
+    MERGE (n:Person {{name: row.name}})
+  url: $BASE/people.csv
+- chunk_size: 2
+  cql: |
+    WITH $dict.rows AS rows
+    UNWIND rows AS row
+    MERGE (n:Pet {{name: row.pet_name}})
+  url: $BASE/people.csv
+"""
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, "people.csv")
+        with open(self.csv_path, "w") as f:
+            f.write("name,pet_name\n")
+            for i in range(10):
+                f.write(f"person_{i},pet_{i}\n")
+        self.checkpoint_path = os.path.join(self.directory.name, "checkpoint.json")
+        self.drivers = list()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def run_ingest(self, driver: FakeDriver, **kwargs) -> None:
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver",
+            new=lambda *args, **driver_kwargs: driver,
+        ):
+            PyIngest(
+                config=get_config(self.directory.name),
+                checkpoint_path=self.checkpoint_path,
+                **kwargs,
+            )
+
+    def test_contiguous_chunks(self) -> None:
+        store = CheckpointStore(self.checkpoint_path)
+        store.record_chunk("a", "fp", 0)
+        store.record_chunk("a", "fp", 2)
+        self.assertEqual(1, store.get_committed_chunks("a", "fp"))
+        store.record_chunk("a", "fp", 1)
+        self.assertEqual(3, store.get_committed_chunks("a", "fp"))
+
+    def test_store_is_persisted(self) -> None:
+        store = CheckpointStore(self.checkpoint_path)
+        store.record_chunk("a", "fp", 0)
+        store.record_completed("b", "fp")
+
+        reloaded = CheckpointStore(self.checkpoint_path)
+        self.assertEqual(1, reloaded.get_committed_chunks("a", "fp"))
+        self.assertTrue(reloaded.is_completed("b", "fp"))
+
+    def test_changed_fingerprint_restarts_entry(self) -> None:
+        store = CheckpointStore(self.checkpoint_path)
+        store.record_chunk("a", "fp", 0)
+        store.record_completed("a", "fp")
+
+        self.assertEqual(0, store.get_committed_chunks("a", "other"))
+        self.assertFalse(store.is_completed("a", "other"))
+
+    def test_resume(self) -> None:
+        # fail on the 3rd chunk of the Pet entry
+        driver = FakeDriver()
+        driver.errors_at[7] = ClientError("failed")
+        with self.assertRaises(ClientError):
+            self.run_ingest(driver)
+        self.assertEqual(7, len(driver.runs))
+
+        resumed = FakeDriver()
+        self.run_ingest(resumed, resume=True)
+
+        # the Person entry is skipped and the Pet entry resumes at chunk 2
+        self.assertEqual(
+            [f"pet_{i}" for i in range(4, 10)],
+            [row["pet_name"] for row in resumed.rows],
+        )
+
+    def test_without_resume_everything_is_loaded(self) -> None:
+        self.run_ingest(FakeDriver())
+
+        driver = FakeDriver()
+        self.run_ingest(driver)
+        self.assertEqual(20, len(driver.rows))
+
+    def test_completed_run_is_skipped_on_resume(self) -> None:
+        self.run_ingest(FakeDriver())
+
+        driver = FakeDriver()
+        self.run_ingest(driver, resume=True)
+        self.assertEqual(0, len(driver.runs))
+
+    def test_interrupt_saves_checkpoint(self) -> None:
+        driver = FakeDriver()
+        driver.on_run = lambda runs: (
+            signal.raise_signal(signal.SIGINT) if runs == 3 else None
+        )
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_ingest(driver)
+        # the in-flight batch commits before stopping
+        self.assertEqual(4, len(driver.runs))
+
+        resumed = FakeDriver()
+        self.run_ingest(resumed, resume=True)
+        self.assertEqual(
+            [f"person_{i}" for i in range(8, 10)] + [f"pet_{i}" for i in range(10)],
+            [
+                row["pet_name"] if "Pet" in run["query"] else row["name"]
+                for run in resumed.runs
+                for row in run["params"]["dict"]["rows"]
+            ],
+        )
+
+    def test_resume_requires_checkpoint_path(self) -> None:
+        with self.assertRaises(ValueError):
+            PyIngest(config=get_config(self.directory.name), resume=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
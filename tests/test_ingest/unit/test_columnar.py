@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+import warnings
+
+import pandas as pd
+
+from neo4j_runway.ingestion.casting import get_batch_size, to_batch, to_columns
+from neo4j_runway.ingestion.pyingest import PyIngest, get_file_params
+from neo4j_runway.ingestion.statements import get_statement_info
+from .fake_driver import FakeDriver
+
+person_cql = """WITH $dict.cols AS cols
+UNWIND range(0, $dict.size - 1) AS i
+MERGE (n:Person {name: cols.name[i]})
+SET n.age = toIntegerOrNull(cols.age[i])"""
+
+config = f"""
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+files:
+  - url: people.csv
+    chunk_size: 2
+    columnar: true
+    cql: |
+      {person_cql.replace(chr(10), chr(10) + "      ")}
+"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Carol"],
+        "age": ["30", None, "50"],
+        "city": ["Paris", "Rome", None],
+    }
+)
+
+
+class TestColumnar(unittest.TestCase):
+
+    def test_to_columns(self) -> None:
+        self.assertEqual(
+            {"name": ["Alice", "Bob"], "age": ["30", ""]},
+            to_columns(data.iloc[:2][["name", "age"]]),
+        )
+        self.assertEqual(
+            {"name": ["Alice", "Bob"], "age": ["30", None]},
+            to_columns(data.iloc[:2][["name", "age"]], sparse=True),
+        )
+
+    def test_to_batch(self) -> None:
+        params = get_file_params({"url": "people.csv", "cql": person_cql})
+        self.assertEqual({"rows"}, set(to_batch(data, params)))
+        self.assertEqual(3, get_batch_size(to_batch(data, params)))
+
+        params = get_file_params(
+            {"url": "people.csv", "cql": person_cql, "columnar": True}
+        )
+        batch = to_batch(data, params)
+        self.assertEqual({"cols", "size"}, set(batch))
+        self.assertEqual(3, get_batch_size(batch))
+
+    def test_statement_columns(self) -> None:
+        info = get_statement_info(person_cql)
+
+        self.assertEqual("node", info.kind)
+        self.assertEqual(["name"], info.key_columns)
+        self.assertEqual(["name", "age"], info.columns)
+        self.assertIsNone(get_statement_info(person_cql + "\nSET n += cols").columns)
+
+    def test_ingest_sends_columns(self) -> None:
+        driver = FakeDriver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            report = PyIngest(config=config, dataframe=data, driver=driver)
+
+        # only the columns used by the statement are sent
+        self.assertEqual(
+            [
+                {"cols": {"name": ["Alice", "Bob"], "age": ["30", ""]}, "size": 2},
+                {"cols": {"name": ["Carol"], "age": ["50"]}, "size": 1},
+            ],
+            [run["params"]["dict"] for run in driver.runs],
+        )
+        self.assertEqual(3, report.rows)
+
+    def test_parallel_csv_sends_columns(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "people.csv")
+            data.to_csv(path, index=False)
+            driver = FakeDriver()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                PyIngest(
+                    config=config.replace("url: people.csv", f"url: {path}"),
+                    driver=driver,
+                    parse_processes=2,
+                )
+
+        self.assertEqual(
+            [{"name": "Alice", "age": "30"}, {"name": "Bob", "age": ""}],
+            driver.rows[:2],
+        )
+        self.assertTrue(all(["cols" in run["params"]["dict"] for run in driver.runs]))
+
+
+if __name__ == "__main__":
+    unittest.main()
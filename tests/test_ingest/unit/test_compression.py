@@ -0,0 +1,148 @@
+import bz2
+import gzip
+import importlib.util
+import io
+import lzma
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+import pandas as pd
+
+from neo4j_runway.ingestion.compression import get_compression
+from neo4j_runway.ingestion.pyingest import get_file_params
+from neo4j_runway.ingestion.sources import get_source_format, iter_source_chunks
+
+has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+has_zstandard = importlib.util.find_spec("zstandard") is not None
+
+cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = toIntegerOrNull(row.age)"""
+
+first_shard = "name,age,city\nAlice,30,Chicago\nBob,40,Milwaukee\nCarol,50,Naperville\n"
+second_shard = "name,age,city\nDan,60,Evanston\nEve,70,Aurora\n"
+names = ["Alice", "Bob", "Carol", "Dan", "Eve"]
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_params(self, name: str, **kwargs) -> dict:
+        return get_file_params(
+            {
+                "url": os.path.join(self.directory.name, name),
+                "cql": cql,
+                "chunk_size": 2,
+                **kwargs,
+            }
+        )
+
+    def read_names(self, params: dict) -> list:
+        chunks = list(iter_source_chunks(params))
+        return pd.concat(chunks)["name"].tolist()
+
+    def test_get_compression(self) -> None:
+        self.assertEqual("gzip", get_compression(self.get_params("people.csv.gz")))
+        self.assertEqual("tar", get_compression(self.get_params("people.tar.gz")))
+        self.assertEqual("zip", get_compression(self.get_params("people.ZIP")))
+        self.assertIsNone(get_compression(self.get_params("people.csv")))
+        self.assertIsNone(
+            get_compression(self.get_params("people.csv.gz", compression="none"))
+        )
+        self.assertEqual(
+            "bz2", get_compression(self.get_params("people", compression="bz2"))
+        )
+        with self.assertRaises(ValueError):
+            get_compression(self.get_params("people", compression="rar"))
+
+    def test_get_source_format_ignores_compression(self) -> None:
+        self.assertEqual("csv", get_source_format(self.get_params("people.csv.gz")))
+        self.assertEqual(
+            "jsonl", get_source_format(self.get_params("people.jsonl.zst"))
+        )
+
+    def test_multi_member_gzip(self) -> None:
+        params = self.get_params("people.csv.gz")
+        with open(params["url"], "wb") as f:
+            f.write(gzip.compress(first_shard.encode()))
+            f.write(gzip.compress(second_shard.split("\n", 1)[1].encode()))
+
+        self.assertEqual(names, self.read_names(params))
+
+    def test_bz2_and_xz(self) -> None:
+        for name, compress in [
+            ("people.csv.bz2", bz2.compress),
+            ("people.csv.xz", lzma.compress),
+        ]:
+            params = self.get_params(name, skip_records=1)
+            with open(params["url"], "wb") as f:
+                f.write(compress(first_shard.encode()))
+
+            self.assertEqual(names[1:3], self.read_names(params))
+
+    @unittest.skipUnless(has_zstandard, "zstandard is not installed")
+    def test_zstd(self) -> None:
+        import zstandard
+
+        params = self.get_params("people.csv.zst")
+        with open(params["url"], "wb") as f:
+            f.write(zstandard.ZstdCompressor().compress(first_shard.encode()))
+
+        self.assertEqual(names[:3], self.read_names(params))
+
+    def test_zip_of_shards(self) -> None:
+        params = self.get_params("people.zip", skip_records=1)
+        with zipfile.ZipFile(params["url"], "w") as archive:
+            archive.writestr("shards/part-1.csv", second_shard)
+            archive.writestr("shards/part-0.csv", first_shard)
+            archive.writestr("shards/.DS_Store", "ignored")
+            archive.writestr("__MACOSX/shards/._part-0.csv", "ignored")
+
+        # members are read in name order, skip_records only applies to the first
+        self.assertEqual(names[1:], self.read_names(params))
+
+    def test_tar_of_shards(self) -> None:
+        params = self.get_params("people.tar.gz")
+        with tarfile.open(params["url"], "w:gz") as archive:
+            for name, shard in [
+                ("part-0.csv", first_shard),
+                ("part-1.csv", second_shard),
+            ]:
+                info = tarfile.TarInfo(name)
+                info.size = len(shard.encode())
+                archive.addfile(info, io.BytesIO(shard.encode()))
+
+        self.assertEqual(names, self.read_names(params))
+
+    def test_compressed_jsonl(self) -> None:
+        params = self.get_params("people.jsonl.gz")
+        with gzip.open(params["url"], "wt") as f:
+            f.write('{"name": "Alice", "age": 30}\n{"name": "Bob", "age": 40}\n')
+
+        self.assertEqual(names[:2], self.read_names(params))
+
+    @unittest.skipUnless(has_pyarrow, "pyarrow is not installed")
+    def test_pyarrow_csv_engine(self) -> None:
+        params = self.get_params("people.zip", csv_engine="pyarrow", skip_records=1)
+        with zipfile.ZipFile(params["url"], "w") as archive:
+            archive.writestr("part-0.csv", first_shard)
+            archive.writestr("part-1.csv", second_shard)
+
+        self.assertEqual(names[1:], self.read_names(params))
+
+    def test_compressed_parquet(self) -> None:
+        with self.assertRaises(ValueError):
+            list(iter_source_chunks(self.get_params("people.parquet.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
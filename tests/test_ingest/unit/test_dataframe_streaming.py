@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from neo4j_runway.ingestion.pyingest import PyIngest, iter_dataframe_chunks
+from .fake_driver import FakeDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+files:
+- url: people.csv
+  chunk_size: 2
+  cql: |
+    WITH $dict.rows AS rows
+    UNWIND rows AS row
+    MERGE (n:Person {name: row.name})
+- url: people.csv
+  chunk_size: 2
+  cql: |
+    WITH $dict.rows AS rows
+    UNWIND rows AS row
+    MERGE (n:Pet {pet_name: row.pet_name})
+- url: people.csv
+  chunk_size: 2
+  cql: |
+    WITH $dict.rows AS rows
+    UNWIND rows as row
+    MATCH (source:Person {name: row.name})
+    MATCH (target:Pet {pet_name: row.pet_name})
+    MERGE (source)-[n:HAS_PET]->(target)
+"""
+
+knows_entry = """- url: people.csv
+  cql: |
+    WITH $dict.rows AS rows
+    UNWIND rows as row
+    MATCH (source:Person {name: row.name})
+    MATCH (target:Person {name: row.knows})
+    MERGE (source)-[n:KNOWS]->(target)
+"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Carol"],
+        "pet_name": ["Rex", "Tom", "Kit"],
+        "knows": ["Bob", "Carol", "Alice"],
+    }
+)
+
+
+def stream_frames():
+    yield data.iloc[:2]
+    yield data.iloc[2:]
+
+
+class TestDataFrameStreaming(unittest.TestCase):
+
+    def test_chunks_are_views(self) -> None:
+        frame = pd.DataFrame({"a": np.arange(10), "b": np.arange(10)})
+        chunks = list(iter_dataframe_chunks(frame, 4))
+
+        self.assertEqual([4, 4, 2], [len(chunk) for chunk in chunks])
+        self.assertTrue(
+            np.shares_memory(chunks[1]["a"].to_numpy(), frame["a"].to_numpy())
+        )
+
+    def test_chunks_of_stream(self) -> None:
+        chunks = list(iter_dataframe_chunks(stream_frames(), 1))
+
+        self.assertEqual(
+            ["Alice", "Bob", "Carol"], [chunk["name"].iloc[0] for chunk in chunks]
+        )
+
+    def test_stream_is_read_once(self) -> None:
+        driver = FakeDriver()
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", return_value=driver
+        ):
+            PyIngest(config=config, dataframe=stream_frames())
+
+        # each frame is written with every statement before the next is read
+        self.assertEqual(
+            [2, 2, 2, 1, 1, 1],
+            [len(run["params"]["dict"]["rows"]) for run in driver.runs],
+        )
+        self.assertEqual(
+            [
+                {"name": "Carol"},
+                {"pet_name": "Kit"},
+                {"name": "Carol", "pet_name": "Kit"},
+            ],
+            driver.rows[-3:],
+        )
+
+    def test_stream_needing_several_reads(self) -> None:
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            with self.assertRaises(ValueError):
+                PyIngest(config=config + knows_entry, dataframe=stream_frames())
+
+    def test_stream_with_checkpoint(self) -> None:
+        with self.assertRaises(ValueError):
+            PyIngest(
+                config=config,
+                dataframe=stream_frames(),
+                checkpoint_path="checkpoint.json",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from neo4j_runway.ingestion.dedup import RowDeduplicator, get_deduplicator
+from neo4j_runway.ingestion.pyingest import LocalServer, get_file_params, load_config
+from .fake_driver import FakeDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+"""
+
+person_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = toIntegerOrNull(row.age)"""
+
+has_pet_cql = """WITH $dict.rows AS rows
+UNWIND rows as row
+MATCH (source:Person {name: row.name})
+MATCH (target:Pet {pet_name: row.pet_name})
+MERGE (source)-[n:HAS_PET]->(target)"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Alice", "Bob", "Alice", "Bob", "Carol"],
+        "age": ["30", "30", "40", "31", "40", "50"],
+        "pet_name": ["Rex", "Rex", "Tom", "Kit", "Tom", "Ace"],
+    }
+)
+
+
+class TestDedup(unittest.TestCase):
+
+    def setUp(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            self.server = LocalServer()
+        self.driver = self.server._driver
+
+    def test_filter_across_chunks(self) -> None:
+        deduplicator = RowDeduplicator(key_columns=["name"])
+
+        self.assertEqual(
+            ["Alice", "Bob"], deduplicator.filter(data.iloc[:3])["name"].tolist()
+        )
+        self.assertEqual(["Carol"], deduplicator.filter(data.iloc[3:])["name"].tolist())
+
+    def test_filter_is_bounded(self) -> None:
+        deduplicator = RowDeduplicator(key_columns=["name"], max_keys=1)
+
+        self.assertEqual(
+            ["Alice", "Bob"], deduplicator.filter(data.iloc[:3])["name"].tolist()
+        )
+        # Bob was not remembered, so it is sent again
+        self.assertEqual(
+            ["Bob", "Carol"], deduplicator.filter(data.iloc[3:])["name"].tolist()
+        )
+
+    def test_exact_filter_tells_colliding_keys_apart(self) -> None:
+        deduplicator = RowDeduplicator(key_columns=["name"], exact=True)
+        # give Dan the hash of an earlier key, as a collision would
+        dan_hash = pd.util.hash_pandas_object(
+            pd.DataFrame({"name": ["Dan"]}), index=False
+        ).tolist()[0]
+        deduplicator._keys[dan_hash] = ("Zed",)
+        rows = pd.DataFrame({"name": ["Dan", "Alice", "Dan", None, None]})
+
+        self.assertEqual(
+            ["Dan", "Alice", None], deduplicator.filter(rows)["name"].tolist()
+        )
+        self.assertEqual(0, len(deduplicator.filter(rows)))
+
+    def test_exact_filter_fails_when_full(self) -> None:
+        deduplicator = RowDeduplicator(
+            key_columns=["name"], max_keys=2, exact=True, strict=True
+        )
+
+        self.assertEqual(
+            ["Alice", "Bob"], deduplicator.filter(data.iloc[:5])["name"].tolist()
+        )
+        # forgetting a key could create a duplicate, so the load stops instead
+        with self.assertRaises(ValueError):
+            deduplicator.filter(data.iloc[5:])
+
+    def test_exact_filter_forgets_when_full(self) -> None:
+        deduplicator = RowDeduplicator(key_columns=["name"], max_keys=1, exact=True)
+
+        self.assertEqual(
+            ["Alice", "Bob"], deduplicator.filter(data.iloc[:3])["name"].tolist()
+        )
+        # Bob was not remembered, so it is sent again
+        self.assertEqual(
+            ["Bob", "Carol"], deduplicator.filter(data.iloc[3:])["name"].tolist()
+        )
+
+    def test_rows_are_compared_by_value(self) -> None:
+        params = get_file_params(
+            {"url": "people.csv", "cql": person_cql, "deduplicate": "rows"}
+        )
+        deduplicator = get_deduplicator(params)
+        # give a distinct row the hash of an earlier row, as a collision would
+        rows = data.iloc[3:4]
+        deduplicator._keys[
+            pd.util.hash_pandas_object(rows, index=False).tolist()[0]
+        ] = ("Zed", "1", "Rex")
+
+        self.assertTrue(deduplicator.exact)
+        self.assertFalse(deduplicator.strict)
+        self.assertEqual(1, len(deduplicator.filter(rows)))
+        self.assertEqual(0, len(deduplicator.filter(rows)))
+
+    def test_initial_load_keeps_first_row(self) -> None:
+        params = get_file_params(
+            {"url": "people.csv", "cql": person_cql}, initial_load=True
+        )
+        deduplicator = get_deduplicator(params)
+
+        self.assertTrue(deduplicator.exact)
+        self.assertTrue(deduplicator.strict)
+        self.assertEqual(["30", "40", "50"], deduplicator.filter(data)["age"].tolist())
+
+    def test_get_deduplicator_key_columns(self) -> None:
+        def get_key_columns(cql: str, deduplicate) -> list:
+            params = get_file_params(
+                {"url": "people.csv", "cql": cql, "deduplicate": deduplicate}
+            )
+            return get_deduplicator(params).key_columns
+
+        self.assertEqual(["name"], get_key_columns(person_cql, "keys"))
+        self.assertEqual(["name"], get_key_columns(person_cql, True))
+        self.assertEqual(["name", "pet_name"], get_key_columns(has_pet_cql, "keys"))
+        self.assertIsNone(get_key_columns(person_cql, "rows"))
+        self.assertIsNone(
+            get_deduplicator(get_file_params({"url": "people.csv", "cql": person_cql}))
+        )
+
+    def test_get_deduplicator_unknown_mode(self) -> None:
+        params = get_file_params(
+            {"url": "people.csv", "cql": person_cql, "deduplicate": "nodes"}
+        )
+        with self.assertRaises(ValueError):
+            get_deduplicator(params)
+
+    def test_load_deduplicated_rows(self) -> None:
+        self.server.load_dataframe(
+            {"url": "people.csv", "cql": person_cql, "deduplicate": "rows"},
+            dataframe=data,
+        )
+
+        self.assertEqual(
+            [
+                {"name": "Alice", "age": "30"},
+                {"name": "Bob", "age": "40"},
+                {"name": "Alice", "age": "31"},
+                {"name": "Carol", "age": "50"},
+            ],
+            self.driver.rows,
+        )
+
+    def test_load_deduplicated_keys(self) -> None:
+        self.server.load_dataframe(
+            {
+                "url": "people.csv",
+                "cql": has_pet_cql,
+                "chunk_size": 2,
+                "deduplicate": "keys",
+            },
+            dataframe=data,
+        )
+
+        self.assertEqual(
+            [("Alice", "Rex"), ("Bob", "Tom"), ("Alice", "Kit"), ("Carol", "Ace")],
+            [(row["name"], row["pet_name"]) for row in self.driver.rows],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from neo4j_runway.ingestion.pyingest import PyIngest
+from .fake_driver import FakeDriver
+
+cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})"""
+
+files = f"""
+files:
+  - url: people.csv
+    chunk_size: 2
+    cql: |
+      {cql.replace(chr(10), chr(10) + "      ")}
+"""
+
+credentials = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+driver_config:
+  max_connection_pool_size: 10
+  keep_alive: true
+"""
+
+data = pd.DataFrame({"name": ["Alice", "Bob", "Carol"]})
+
+
+class TestDriver(unittest.TestCase):
+
+    def test_injected_driver_is_reused_and_left_open(self) -> None:
+        driver = FakeDriver()
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver"
+        ) as create_driver:
+            # the YAML does not need credentials
+            PyIngest(config=files, dataframe=data, driver=driver)
+            PyIngest(config=files, dataframe=data, driver=driver)
+
+        create_driver.assert_not_called()
+        self.assertFalse(driver.closed)
+        self.assertEqual(6, len(driver.rows))
+
+    def test_created_driver_uses_pool_config(self) -> None:
+        driver = FakeDriver()
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver",
+            return_value=driver,
+        ) as create_driver:
+            PyIngest(
+                config=credentials + files,
+                dataframe=data,
+                driver_config={
+                    "max_connection_pool_size": 4,
+                    "connection_acquisition_timeout": 30,
+                },
+            )
+
+        create_driver.assert_called_once_with(
+            "bolt://localhost:7687",
+            auth=("neo4j", "password"),
+            max_connection_pool_size=4,
+            keep_alive=True,
+            connection_acquisition_timeout=30,
+        )
+        self.assertTrue(driver.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+
+import pandas as pd
+
+from neo4j_runway.ingestion.fairness import FairScheduler
+from neo4j_runway.ingestion.pyingest import PyIngest
+from .fake_driver import FakeDriver
+
+
+class Ingest:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def get_config(database: str) -> str:
+    return f"""
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+database: {database}
+files:
+  - url: {database}.csv
+    chunk_size: 2
+    cql: |
+      WITH $dict.rows AS rows
+      UNWIND rows AS row
+      MERGE (n:Person {{name: row.name}})
+"""
+
+
+class TestFairness(unittest.TestCase):
+
+    def test_waiting_ingests_take_turns(self) -> None:
+        scheduler = FairScheduler(max_concurrent_batches=1)
+        busy, other = Ingest("busy"), Ingest("other")
+        order = list()
+        release = threading.Event()
+
+        def write(ingest: Ingest) -> None:
+            with scheduler.slot(ingest):
+                order.append(ingest.name)
+
+        with scheduler.slot(busy):
+            threads = [threading.Thread(target=write, args=(busy,)) for _ in range(2)]
+            threads.append(threading.Thread(target=write, args=(other,)))
+            for thread in threads:
+                thread.start()
+                # queue the batches in order
+                time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+
+        # the other ingest is served before the second queued batch of the busy ingest
+        self.assertEqual(["other", "busy", "busy"], order)
+
+    def test_concurrent_batches_are_limited(self) -> None:
+        scheduler = FairScheduler(max_concurrent_batches=2)
+        lock = threading.Lock()
+        in_flight, max_in_flight = 0, 0
+
+        def write(ingest: Ingest) -> None:
+            nonlocal in_flight, max_in_flight
+            with scheduler.slot(ingest):
+                with lock:
+                    in_flight += 1
+                    max_in_flight = max(max_in_flight, in_flight)
+                time.sleep(0.01)
+                with lock:
+                    in_flight -= 1
+
+        ingests = [Ingest(str(i)) for i in range(3)]
+        threads = [
+            threading.Thread(target=write, args=(ingests[i % 3],)) for i in range(12)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(2, max_in_flight)
+        self.assertEqual(dict(), scheduler.active)
+
+    def test_concurrent_ingests_keep_their_config(self) -> None:
+        driver = FakeDriver()
+        scheduler = FairScheduler(max_concurrent_batches=2)
+        errors = list()
+
+        def ingest(database: str) -> None:
+            data = pd.DataFrame({"name": [f"{database}_{i}" for i in range(10)]})
+            try:
+                PyIngest(
+                    config=get_config(database),
+                    dataframe=data,
+                    driver=driver,
+                    scheduler=scheduler,
+                )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=ingest, args=(database,))
+            for database in ["tenant_a", "tenant_b", "tenant_c"]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(list(), errors)
+        self.assertEqual(15, len(driver.runs))
+        for run in driver.runs:
+            for row in run["params"]["dict"]["rows"]:
+                self.assertTrue(row["name"].startswith(run["database"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
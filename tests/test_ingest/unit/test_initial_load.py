@@ -0,0 +1,142 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import warnings
+
+import pandas as pd
+
+from neo4j_runway.ingestion import AsyncPyIngest
+from neo4j_runway.ingestion.pyingest import COUNT_NODES_QUERY, PyIngest
+from neo4j_runway.ingestion.scheduler import count_leading_node_entries
+from .fake_driver import FakeAsyncDriver, FakeDriver
+
+person_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+CREATE (n:Person {name: row.name})
+SET n.age = row.age"""
+
+knows_cql = """WITH $dict.rows AS rows
+UNWIND rows as row
+MATCH (source:Person {name: row.name})
+MATCH (target:Person {name: row.friend})
+CREATE (source)-[n:KNOWS]->(target)"""
+
+constraint = "CREATE CONSTRAINT person_name IF NOT EXISTS FOR (n:Person) REQUIRE n.name IS UNIQUE"
+
+config = f"""
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+initial_load: true
+pre_relationships:
+  - {constraint}
+files:
+  - url: people.csv
+    chunk_size: 2
+    cql: |
+      {person_cql.replace(chr(10), chr(10) + "      ")}
+  - url: people.csv
+    chunk_size: 2
+    cql: |
+      {knows_cql.replace(chr(10), chr(10) + "      ")}
+"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Alice", "Carol", "Bob"],
+        "age": ["30", "40", "31", "50", "41"],
+        "friend": ["Bob", "Carol", "Bob", "Alice", "Carol"],
+    }
+)
+
+
+class TestInitialLoad(unittest.TestCase):
+
+    def ingest(self, driver: FakeDriver, **kwargs) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            PyIngest(config=config, dataframe=data, driver=driver, **kwargs)
+
+    def test_rows_are_created_once_per_key(self) -> None:
+        driver = FakeDriver()
+        driver.records[COUNT_NODES_QUERY] = {"nodes": 0}
+        self.ingest(driver)
+
+        queries = [run["query"] for run in driver.runs]
+        self.assertEqual(COUNT_NODES_QUERY, queries[0])
+        # the constraint is created between the node and relationship entries
+        self.assertEqual(
+            [person_cql, person_cql, constraint, knows_cql, knows_cql],
+            [query.strip() for query in queries[1:]],
+        )
+        self.assertEqual(
+            ["Alice", "Bob", "Carol"],
+            [row["name"] for row in driver.rows if "friend" not in row],
+        )
+        self.assertEqual(
+            [("Alice", "Bob"), ("Bob", "Carol"), ("Carol", "Alice")],
+            [(row["name"], row["friend"]) for row in driver.rows if "friend" in row],
+        )
+
+    def test_populated_database_is_refused(self) -> None:
+        driver = FakeDriver()
+        driver.records[COUNT_NODES_QUERY] = {"nodes": 12}
+
+        with self.assertRaises(ValueError):
+            self.ingest(driver)
+        self.assertEqual(1, len(driver.runs))
+
+    def test_resume_continues_into_a_partly_loaded_database(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "checkpoint.json")
+            driver = FakeDriver()
+            driver.records[COUNT_NODES_QUERY] = {"nodes": 0}
+            # fail the second batch of people
+            driver.errors_at[2] = ValueError("lost connection")
+            with self.assertRaises(ValueError):
+                self.ingest(driver, checkpoint_path=checkpoint_path)
+
+            driver = FakeDriver()
+            driver.records[COUNT_NODES_QUERY] = {"nodes": 2}
+            self.ingest(driver, checkpoint_path=checkpoint_path, resume=True)
+
+        # Alice and Bob were created before the failure, so their repeats are still dropped
+        self.assertEqual(
+            ["Carol"], [row["name"] for row in driver.rows if "friend" not in row]
+        )
+
+    def test_leading_node_entries(self) -> None:
+        files = [{"cql": person_cql}, {"cql": knows_cql}, {"cql": person_cql}]
+
+        self.assertEqual(1, count_leading_node_entries(files))
+        self.assertEqual(0, count_leading_node_entries(files[1:]))
+        self.assertEqual(1, count_leading_node_entries(files[:1]))
+
+    def test_async_populated_database_is_refused(self) -> None:
+        driver = FakeAsyncDriver()
+        driver.records[COUNT_NODES_QUERY] = {"nodes": 1}
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            with self.assertRaises(ValueError):
+                asyncio.run(AsyncPyIngest(config=config, dataframe=data, driver=driver))
+
+    def test_async_constraint_runs_before_relationships(self) -> None:
+        driver = FakeAsyncDriver()
+        driver.records[COUNT_NODES_QUERY] = {"nodes": 0}
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            asyncio.run(AsyncPyIngest(config=config, dataframe=data, driver=driver))
+
+        queries = [run["query"].strip() for run in driver.runs]
+        self.assertEqual(
+            [COUNT_NODES_QUERY, person_cql, person_cql, constraint],
+            queries[:4],
+        )
+        self.assertEqual(6, len(driver.rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from neo4j_runway.ingestion import pyingest
+from neo4j_runway.ingestion.parallel_csv import (
+    find_range_offsets,
+    iter_parallel_csv_batches,
+    parse_range,
+)
+from neo4j_runway.ingestion.pyingest import LocalServer, get_file_params, load_config
+from .fake_driver import FakeDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+"""
+
+cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.bio = row.bio"""
+
+content = (
+    "name,bio,city\n"
+    'Alice,"likes\nnewlines",Chicago\n'
+    "Bob,plain,Milwaukee\n"
+    'Carol,"quoted ""text""\nover lines",Naperville\n'
+    "Dan,,Evanston\n"
+    "Eve,last,Aurora\n"
+)
+
+
+# a program without a `__main__` guard, whose spawned workers import it again
+unguarded_script = """
+import os
+import warnings
+from unittest.mock import patch
+
+import yaml
+
+from neo4j_runway.ingestion import PyIngest
+from tests.test_ingest.unit.fake_driver import FakeDriver
+
+config = yaml.dump(
+    {{
+        "server_uri": "bolt://localhost:7687",
+        "admin_user": "neo4j",
+        "admin_pass": "password",
+        "pre_ingest": ["CREATE INDEX person_name IF NOT EXISTS FOR (n:Person) ON (n.name)"],
+        "files": [{{"url": {path!r}, "cql": {cql!r}, "chunk_size": 2}}],
+    }}
+)
+driver = FakeDriver()
+# every write is logged with the process that made it
+driver.on_run = lambda runs: open({log!r}, "a").write(f"{{os.getpid()}}\\n")
+with patch("neo4j_runway.ingestion.parallel_csv.RANGE_SIZE", 1):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        PyIngest(
+            config=config,
+            driver=driver,
+            parse_processes=3,
+            checkpoint_path={checkpoint!r},
+        )
+print(os.getpid())
+print([row["name"] for row in driver.rows])
+print(any(["single process" in str(w.message) for w in caught]))
+"""
+
+
+class TestParallelCSV(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "people.csv")
+        with open(self.path, "w", newline="") as f:
+            f.write(content)
+        self.header_end = len(content.split("\n")[0]) + 1
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_params(self, **kwargs) -> dict:
+        return get_file_params(
+            {"url": self.path, "cql": cql, "chunk_size": 2, **kwargs}
+        )
+
+    def test_range_offsets_respect_quoted_newlines(self) -> None:
+        expected = pd.read_csv(self.path, dtype=str).fillna("")
+        # tiny ranges and blocks force a split at every possible row
+        offsets = find_range_offsets(
+            self.path, start=self.header_end, range_size=1, block_size=7
+        )
+        self.assertEqual(self.header_end, offsets[0])
+        self.assertEqual(os.path.getsize(self.path), offsets[-1])
+        self.assertEqual(len(expected) + 1, len(offsets))
+
+        records = list()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            for batch in parse_range(
+                self.path,
+                ["name", "bio", "city"],
+                None,
+                ",",
+                2,
+                start,
+                end,
+                self.get_params(),
+            ):
+                records.extend(batch["rows"])
+        self.assertEqual(expected.to_dict("records"), records)
+
+    def test_single_range_for_small_file(self) -> None:
+        self.assertEqual(
+            [self.header_end, os.path.getsize(self.path)],
+            find_range_offsets(self.path, start=self.header_end),
+        )
+
+    def test_batches_are_numbered_in_file_order(self) -> None:
+        with patch("neo4j_runway.ingestion.parallel_csv.RANGE_SIZE", 1):
+            batches = list(iter_parallel_csv_batches(self.get_params(), processes=2))
+
+        self.assertEqual(list(range(len(batches))), [i for i, _ in batches])
+        records = [record for _, batch in batches for record in batch["rows"]]
+        self.assertEqual(
+            ["Alice", "Bob", "Carol", "Dan", "Eve"], [r["name"] for r in records]
+        )
+        # only the columns used by the statement are parsed
+        self.assertEqual({"name", "bio"}, set(records[0].keys()))
+        self.assertEqual("", records[3]["bio"])
+
+    def test_unguarded_program_falls_back_to_one_process(self) -> None:
+        script = os.path.join(self.directory.name, "script.py")
+        log = os.path.join(self.directory.name, "writes.log")
+        checkpoint = os.path.join(self.directory.name, "checkpoint.json")
+        with open(script, "w") as f:
+            f.write(
+                unguarded_script.format(
+                    path=self.path, cql=cql, log=log, checkpoint=checkpoint
+                )
+            )
+
+        result = subprocess.run(
+            [sys.executable, script],
+            capture_output=True,
+            text=True,
+            cwd=os.getcwd(),
+            env=dict(os.environ, PYTHONPATH=os.getcwd()),
+            timeout=120,
+        )
+
+        self.assertEqual(0, result.returncode, result.stderr)
+        pid, names, warned = result.stdout.strip().split("\n")[-3:]
+        # each row is its own range, and the batches are written in file order
+        self.assertEqual(str(["Alice", "Bob", "Carol", "Dan", "Eve"]), names)
+        self.assertEqual("True", warned)
+        # the workers stop before the pre_ingest statement, the checkpoint reset and the batches,
+        # so every write was made by the program itself
+        with open(log) as f:
+            self.assertEqual([pid] * 6, f.read().split())
+        self.assertTrue(os.path.exists(checkpoint))
+
+    def test_load_csv_parses_in_parallel(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            server = LocalServer()
+        server.parse_processes = 2
+
+        with patch.object(
+            pyingest, "iter_source_chunks", wraps=pyingest.iter_source_chunks
+        ) as read:
+            server.load_csv({"url": self.path, "cql": cql, "chunk_size": 2})
+
+        read.assert_not_called()
+        self.assertEqual(
+            ["Alice", "Bob", "Carol", "Dan", "Eve"],
+            [row["name"] for row in server._driver.rows],
+        )
+
+    def test_unsupported_entries_are_read_by_one_process(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            server = LocalServer()
+        server.parse_processes = 2
+
+        self.assertTrue(
+            server._can_parse_in_parallel(
+                server.get_params({"url": self.path, "cql": cql})
+            )
+        )
+        for kwargs in [
+            {"skip_records": 1},
+            {"deduplicate": True},
+            {"partitions": 2},
+            {"csv_engine": "pyarrow"},
+            {"compression": "gzip"},
+            {"parse_processes": 1},
+        ]:
+            params = server.get_params({"url": self.path, "cql": cql, **kwargs})
+            self.assertFalse(server._can_parse_in_parallel(params), kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
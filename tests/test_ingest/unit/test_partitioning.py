@@ -0,0 +1,147 @@
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from neo4j_runway.ingestion.partitioning import (
+    bucket_relationship_rows,
+    group_rows_by_source,
+    hash_partition_rows,
+    schedule_buckets,
+)
+from neo4j_runway.ingestion.pyingest import LocalServer, load_config
+from .fake_driver import FakeDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+"""
+
+node_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = row.age"""
+
+relationship_cql = """WITH $dict.rows AS rows
+UNWIND rows as row
+MATCH (source:Person {name: row.name})
+MATCH (target:Person {name: row.knows})
+MERGE (source)-[n:KNOWS]->(target)"""
+
+data = pd.DataFrame(
+    {
+        "name": [f"person_{i % 25}" for i in range(200)],
+        "age": [str(i) for i in range(200)],
+        "knows": [f"person_{i % 7}" for i in range(200)],
+    }
+)
+
+
+class TestPartitioning(unittest.TestCase):
+
+    def test_hash_partition_rows_keeps_keys_together(self) -> None:
+        parts = hash_partition_rows(data, ["name"], 4)
+
+        self.assertEqual(4, len(parts))
+        self.assertEqual(len(data), sum([len(part) for part in parts]))
+        seen = dict()
+        for idx, part in enumerate(parts):
+            for name in part["name"]:
+                self.assertEqual(idx, seen.setdefault(name, idx))
+
+    def test_hash_partition_rows_is_stable_across_chunks(self) -> None:
+        first = hash_partition_rows(data.iloc[:100], ["name"], 3)
+        second = hash_partition_rows(data.iloc[100:], ["name"], 3)
+        for idx in range(3):
+            self.assertEqual(set(first[idx]["name"]), set(second[idx]["name"]))
+
+    def test_partitioned_load(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            server = LocalServer()
+        server.load_dataframe(
+            {"url": "people.csv", "cql": node_cql, "chunk_size": 50, "partitions": 4},
+            dataframe=data,
+        )
+
+        driver = server._driver
+        self.assertEqual(len(data), len(driver.rows))
+        # every name is written by a single session
+        name_threads = dict()
+        for run in driver.runs:
+            for row in run["params"]["dict"]["rows"]:
+                self.assertEqual(
+                    run["thread"], name_threads.setdefault(row["name"], run["thread"])
+                )
+
+    def test_bucket_relationship_rows(self) -> None:
+        buckets = bucket_relationship_rows(data, ["name"], ["knows"], 3)
+
+        self.assertEqual(len(data), sum([len(rows) for rows in buckets.values()]))
+        node_partitions = dict()
+        for (source, target), rows in buckets.items():
+            for name in rows["name"]:
+                self.assertEqual(source, node_partitions.setdefault(name, source))
+            for name in rows["knows"]:
+                self.assertEqual(target, node_partitions.setdefault(name, target))
+
+    def test_schedule_buckets(self) -> None:
+        buckets = [(s, t) for s in range(3) for t in range(3)]
+        rounds = schedule_buckets(buckets)
+
+        self.assertEqual(3, len(rounds))
+        self.assertEqual(set(buckets), {b for r in rounds for b in r})
+        for r in rounds:
+            self.assertEqual(len(r), len({b[0] for b in r}))
+            self.assertEqual(len(r), len({b[1] for b in r}))
+
+    def test_schedule_buckets_same_label(self) -> None:
+        buckets = [(s, t) for s in range(3) for t in range(3)]
+        rounds = schedule_buckets(buckets, same_label=True)
+
+        self.assertEqual(set(buckets), {b for r in rounds for b in r})
+        for r in rounds:
+            partitions = [p for b in r for p in set(b)]
+            self.assertEqual(len(partitions), len(set(partitions)))
+
+    def test_group_rows_by_source(self) -> None:
+        groups = group_rows_by_source(data, ["name"])
+
+        self.assertEqual(25, len(groups))
+        for group in groups:
+            self.assertEqual(1, len({row["name"] for row in group["rows"]}))
+
+    def test_bucketed_relationship_load(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            server = LocalServer()
+        server.load_dataframe(
+            {
+                "url": "people.csv",
+                "cql": relationship_cql,
+                "chunk_size": 10,
+                "partitions": 3,
+            },
+            dataframe=data,
+        )
+
+        driver = server._driver
+        sent = [
+            (row["name"], row["knows"])
+            for run in driver.runs
+            for group in run["params"]["dict"]["rows"]
+            for row in group["rows"]
+        ]
+        self.assertEqual(sorted(zip(data["name"], data["knows"])), sorted(sent))
+        self.assertTrue(
+            all(["UNWIND rows AS group" in run["query"] for run in driver.runs])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+from contextlib import closing
+import threading
+import time
+import unittest
+
+from neo4j_runway.ingestion.pipeline import MemoryBudget, iter_pipelined
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_items_are_transformed_in_order(self) -> None:
+        result = list(
+            iter_pipelined(range(20), transform=lambda x: x * 2, get_size=lambda x: 1)
+        )
+        self.assertEqual([x * 2 for x in range(20)], result)
+
+    def test_read_error_is_raised(self) -> None:
+        def items():
+            yield 1
+            raise ValueError("unreadable")
+
+        with self.assertRaises(ValueError):
+            list(iter_pipelined(items(), transform=str, get_size=lambda x: 1))
+
+    def test_transform_error_is_raised(self) -> None:
+        with self.assertRaises(ZeroDivisionError):
+            list(
+                iter_pipelined([1, 0], transform=lambda x: 1 / x, get_size=lambda x: 1)
+            )
+
+    def test_memory_cap_applies_backpressure(self) -> None:
+        read = list()
+
+        def items():
+            for i in range(10):
+                read.append(i)
+                yield i
+
+        batches = iter_pipelined(
+            items(), transform=lambda x: x, get_size=lambda x: 10, max_bytes=30
+        )
+        with closing(batches):
+            self.assertEqual(0, next(batches))
+            # a slow send stage
+            time.sleep(0.3)
+            # the item being sent and two more fit in the budget, the next item waits for it
+            self.assertEqual([0, 1, 2, 3], read)
+            self.assertEqual([1, 2, 3], [next(batches) for _ in range(3)])
+
+    def test_closing_stops_the_stages(self) -> None:
+        threads = threading.active_count()
+        batches = iter_pipelined(
+            iter(range(1000)), transform=lambda x: x, get_size=lambda x: 1, depth=2
+        )
+        with closing(batches):
+            next(batches)
+        self.assertEqual(threads, threading.active_count())
+
+    def test_oversized_item_is_admitted_alone(self) -> None:
+        budget = MemoryBudget(max_bytes=10)
+        self.assertTrue(budget.acquire(100))
+        budget.release(100)
+        self.assertEqual(0, budget.used)
+        budget.cancel()
+        self.assertFalse(budget.acquire(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
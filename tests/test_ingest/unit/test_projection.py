@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from neo4j_runway.ingestion.pyingest import LocalServer, load_config
+from .fake_driver import FakeDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+"""
+
+cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = toIntegerOrNull(row.age)"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Carol"],
+        "age": ["30", "40", "50"],
+        "city": ["Chicago", "Milwaukee", "Naperville"],
+        "notes": ["a", "b", "c"],
+    }
+)
+
+
+class TestProjection(unittest.TestCase):
+
+    def setUp(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            self.server = LocalServer()
+        self.driver = self.server._driver
+
+    def test_csv_columns_are_projected(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "people.csv")
+            data.to_csv(path, index=False)
+            self.server.load_csv({"url": path, "cql": cql})
+
+        self.assertEqual(
+            [
+                {"name": "Alice", "age": "30"},
+                {"name": "Bob", "age": "40"},
+                {"name": "Carol", "age": "50"},
+            ],
+            self.driver.rows,
+        )
+
+    def test_dataframe_columns_are_projected(self) -> None:
+        self.server.load_dataframe({"url": "people.csv", "cql": cql}, dataframe=data)
+
+        self.assertEqual({"name", "age"}, set(self.driver.rows[0].keys()))
+
+    def test_columns_from_config(self) -> None:
+        self.server.load_dataframe(
+            {"url": "people.csv", "cql": cql, "columns": ["name", "age", "city"]},
+            dataframe=data,
+        )
+
+        self.assertEqual({"name", "age", "city"}, set(self.driver.rows[0].keys()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import patch
+import warnings
+
+from neo4j.exceptions import TransientError
+import pandas as pd
+
+from neo4j_runway.ingestion import IngestReport
+from neo4j_runway.ingestion.pyingest import PyIngest
+from neo4j_runway.ingestion.report import BatchReport, FileReport
+from .fake_driver import FakeDriver
+
+person_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = row.age"""
+
+pet_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Pet {name: row.pet})"""
+
+config = f"""
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+files:
+  - url: people.csv
+    chunk_size: 2
+    retry_delay: 0
+    cql: |
+      {person_cql.replace(chr(10), chr(10) + "      ")}
+  - url: people.csv
+    chunk_size: 5
+    cql: |
+      {pet_cql.replace(chr(10), chr(10) + "      ")}
+"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Carol", "Dan", "Eve"],
+        "age": ["30", "40", "50", "60", "70"],
+        "pet": ["Rex", "Tom", "Kit", "Ace", "Max"],
+    }
+)
+
+
+class TestReport(unittest.TestCase):
+
+    def run_ingest(self, driver: FakeDriver) -> IngestReport:
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver",
+            new=lambda *args, **kwargs: driver,
+        ), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return PyIngest(config=config, dataframe=data)
+
+    def test_report_counts_batches_and_rows(self) -> None:
+        report = self.run_ingest(FakeDriver())
+
+        self.assertIsInstance(report, IngestReport)
+        self.assertEqual(
+            [(3, 5), (1, 5)], [(len(file.batches), file.rows) for file in report.files]
+        )
+        self.assertEqual(
+            [{"chunk": 0}, {"chunk": 1}, {"chunk": 2}],
+            [batch.metadata for batch in report.files[0].batches],
+        )
+        self.assertTrue(all([file.completed for file in report.files]))
+        self.assertEqual(10, report.rows)
+        self.assertGreater(report.seconds, 0)
+
+    def test_report_aggregates_counters(self) -> None:
+        driver = FakeDriver()
+        driver.counters = {"nodes_created": 2, "properties_set": 4}
+        report = self.run_ingest(driver)
+
+        batch_counters = report.files[0].batches[0].counters
+        self.assertEqual(2, batch_counters["nodes_created"])
+        self.assertEqual(0, batch_counters["relationships_created"])
+        self.assertEqual(
+            {"nodes_created": 6, "properties_set": 12}, report.files[0].counters
+        )
+        self.assertEqual({"nodes_created": 8, "properties_set": 16}, report.counters)
+
+    def test_report_counts_retries(self) -> None:
+        driver = FakeDriver()
+        driver.errors = [TransientError("deadlock")]
+        report = self.run_ingest(driver)
+
+        self.assertEqual(1, report.files[0].batches[0].retries)
+        self.assertEqual(1, report.retries)
+
+    def test_rows_per_second(self) -> None:
+        file = FileReport(
+            url="people.csv",
+            cql=person_cql,
+            seconds=2.0,
+            batches=[BatchReport(metadata={}, rows=10, seconds=0.5)] * 2,
+        )
+        self.assertEqual(10.0, file.rows_per_second)
+        self.assertEqual(20.0, file.batches[0].rows_per_second)
+        self.assertIsNone(FileReport(url="people.csv", cql=person_cql).rows_per_second)
+        self.assertIn(
+            "people.csv : 20 rows in 2 batches", str(IngestReport(files=[file]))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+
+import yaml
+
+from neo4j_runway.ingestion.scheduler import (
+    build_dependency_graph,
+    plan_read_passes,
+    run_with_dependencies,
+)
+from ...resources.answers.people_pets import people_pets_yaml_string
+
+files = yaml.safe_load(people_pets_yaml_string)["files"]
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_build_dependency_graph(self) -> None:
+        graph = build_dependency_graph(files)
+        # nodes are independent
+        for idx in range(4):
+            self.assertEqual(set(), graph[idx])
+        self.assertEqual({0, 1}, graph[4])  # Person, Address
+        self.assertEqual({0, 2, 4}, graph[5])  # Person, Pet, shares Person with 4
+        self.assertEqual({2, 3, 5}, graph[6])  # Pet, Toy, shares Pet with 5
+        self.assertEqual({0, 4, 5}, graph[7])  # Person, shares Person with 4 and 5
+
+    def test_other_statement_is_a_barrier(self) -> None:
+        graph = build_dependency_graph(
+            files[:2] + [{"cql": "CALL db.awaitIndexes()"}] + files[2:4]
+        )
+        self.assertEqual({0, 1}, graph[2])
+        self.assertEqual({2}, graph[3])
+        self.assertEqual({2}, graph[4])
+
+    def test_plan_read_passes(self) -> None:
+        # KNOWS matches the target Person on `knows`, which is only merged on `name` by the first read
+        self.assertEqual([[[0, 1, 2, 3, 4, 5, 6]], [[7]]], plan_read_passes(files))
+
+    def test_plan_read_passes_separates_sources(self) -> None:
+        other_files = [dict(file, url="$BASE/data/other.csv") for file in files[2:4]]
+        self.assertEqual([[[0, 1], [2, 3]]], plan_read_passes(files[:2] + other_files))
+        # writing the same labels from different sources needs separate passes
+        self.assertEqual(
+            [[[0, 1]], [[2, 3]]],
+            plan_read_passes(
+                files[:2]
+                + [dict(file, url="$BASE/data/other.csv") for file in files[:2]]
+            ),
+        )
+
+    def test_plan_read_passes_partitioned_entries_read_alone(self) -> None:
+        partitioned = [files[0], dict(files[1], partitions=2), files[2]]
+        self.assertEqual([[[0, 2], [1]]], plan_read_passes(partitioned))
+
+    def test_run_with_dependencies(self) -> None:
+        graph = build_dependency_graph(files)
+        finished = list()
+        lock = threading.Lock()
+
+        def load_file(file) -> None:
+            idx = files.index(file)
+            with lock:
+                self.assertTrue(graph[idx] <= set(finished))
+            time.sleep(0.01)
+            with lock:
+                finished.append(idx)
+
+        run_with_dependencies(files=files, load_file=load_file, max_workers=4)
+
+        self.assertEqual(set(range(len(files))), set(finished))
+
+    def test_run_with_dependencies_raises(self) -> None:
+        def load_file(file) -> None:
+            raise ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            run_with_dependencies(files=files, load_file=load_file, max_workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from neo4j_runway.ingestion import pyingest
+from neo4j_runway.ingestion.pyingest import LocalServer, PyIngest, load_config
+from .fake_driver import FakeDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+"""
+
+person_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = toIntegerOrNull(row.age)"""
+
+pet_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Pet {pet_name: row.pet_name})"""
+
+has_pet_cql = """WITH $dict.rows AS rows
+UNWIND rows as row
+MATCH (source:Person {name: row.name})
+MATCH (target:Pet {pet_name: row.pet_name})
+MERGE (source)-[n:HAS_PET]->(target)"""
+
+knows_cql = """WITH $dict.rows AS rows
+UNWIND rows as row
+MATCH (source:Person {name: row.name})
+MATCH (target:Person {name: row.knows})
+MERGE (source)-[n:KNOWS]->(target)"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Carol", "Dan"],
+        "age": ["30", "40", "50", "60"],
+        "pet_name": ["Rex", "Tom", "Kit", "Ace"],
+        "knows": ["Dan", "Alice", "Bob", "Carol"],
+    }
+)
+
+
+class TestSharedReads(unittest.TestCase):
+
+    def setUp(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            self.server = LocalServer()
+        self.driver = self.server._driver
+
+    def test_chunk_is_written_with_every_statement(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "people.csv")
+            data.to_csv(path, index=False)
+            files = [
+                {"url": path, "cql": cql, "chunk_size": 2}
+                for cql in [person_cql, pet_cql, has_pet_cql]
+            ]
+            with patch.object(
+                pyingest, "iter_source_chunks", wraps=pyingest.iter_source_chunks
+            ) as read:
+                self.server.load_shared_read(files)
+
+        self.assertEqual(1, read.call_count)
+        self.assertEqual(
+            [person_cql, pet_cql, has_pet_cql] * 2,
+            [run["query"] for run in self.driver.runs],
+        )
+        # each statement only receives its own columns
+        self.assertEqual({"name", "age"}, set(self.driver.rows[0].keys()))
+        self.assertEqual({"pet_name"}, set(self.driver.rows[2].keys()))
+        self.assertEqual({"name", "pet_name"}, set(self.driver.rows[4].keys()))
+
+    def test_pyingest_share_reads(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "people.csv")
+            data.to_csv(path, index=False)
+            files = "".join(
+                [
+                    f"""
+- url: {path}
+  chunk_size: 2
+  cql: |
+    {cql.replace(chr(10), chr(10) + "    ")}"""
+                    for cql in [person_cql, pet_cql, has_pet_cql, knows_cql]
+                ]
+            )
+            driver = FakeDriver()
+            with patch(
+                "neo4j_runway.ingestion.pyingest.GraphDatabase.driver",
+                return_value=driver,
+            ):
+                PyIngest(config=config + "files:" + files, share_reads=True)
+
+        queries = [run["query"].strip() for run in driver.runs]
+        # KNOWS waits for every Person, so it is read again after the first read
+        self.assertEqual(
+            [person_cql, pet_cql, has_pet_cql] * 2 + [knows_cql] * 2, queries
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from neo4j_runway.ingestion.pyingest import LocalServer, get_file_params, load_config
+from neo4j_runway.ingestion.sources import get_source_format, iter_source_chunks
+from .fake_driver import FakeDriver
+
+has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+"""
+
+cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = toIntegerOrNull(row.age)"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Carol", "Dan", "Eve"],
+        "age": [30, 40, 50, 60, 70],
+        "city": ["Chicago", "Milwaukee", "Naperville", "Evanston", "Aurora"],
+    }
+)
+
+
+class TestSources(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_params(self, name: str, **kwargs) -> dict:
+        return get_file_params(
+            {"url": os.path.join(self.directory.name, name), "cql": cql, **kwargs}
+        )
+
+    def read(self, params: dict) -> pd.DataFrame:
+        chunks = list(iter_source_chunks(params))
+        self.assertTrue(all([len(chunk) <= params["chunk_size"] for chunk in chunks]))
+        return pd.concat(chunks, ignore_index=True)
+
+    def test_get_source_format(self) -> None:
+        self.assertEqual("csv", get_source_format(self.get_params("people.csv")))
+        self.assertEqual(
+            "parquet", get_source_format(self.get_params("people.PARQUET"))
+        )
+        self.assertEqual("arrow", get_source_format(self.get_params("people.feather")))
+        self.assertEqual("jsonl", get_source_format(self.get_params("people.ndjson")))
+        self.assertEqual(
+            "parquet", get_source_format(self.get_params("people", format="parquet"))
+        )
+        with self.assertRaises(ValueError):
+            get_source_format(self.get_params("people", format="xml"))
+
+    def test_jsonl(self) -> None:
+        params = self.get_params("people.jsonl", chunk_size=2, skip_records=1)
+        data.to_json(params["url"], orient="records", lines=True)
+
+        rows = self.read(params)
+
+        self.assertEqual(data["name"].tolist()[1:], rows["name"].tolist())
+
+    @unittest.skipUnless(has_pyarrow, "pyarrow is not installed")
+    def test_parquet(self) -> None:
+        params = self.get_params("people.parquet", chunk_size=2, skip_records=1)
+        data.to_parquet(params["url"], row_group_size=3)
+
+        rows = self.read(params)
+
+        # only the statement's columns are read
+        self.assertEqual(["name", "age"], rows.columns.tolist())
+        self.assertEqual(data["name"].tolist()[1:], rows["name"].tolist())
+
+    @unittest.skipUnless(has_pyarrow, "pyarrow is not installed")
+    def test_arrow(self) -> None:
+        import pyarrow as pa
+
+        params = self.get_params("people.arrow", chunk_size=2)
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        with pa.OSFile(params["url"], "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                for batch in table.to_batches(max_chunksize=3):
+                    writer.write_batch(batch)
+
+        rows = self.read(params)
+
+        self.assertEqual(["name", "age"], rows.columns.tolist())
+        self.assertEqual(data["name"].tolist(), rows["name"].tolist())
+
+    @unittest.skipUnless(has_pyarrow, "pyarrow is not installed")
+    def test_arrow_stream(self) -> None:
+        import pyarrow as pa
+
+        params = self.get_params("people.ipc", chunk_size=10)
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        with pa.OSFile(params["url"], "wb") as sink:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        self.assertEqual(data["name"].tolist(), self.read(params)["name"].tolist())
+
+    @unittest.skipUnless(has_pyarrow, "pyarrow is not installed")
+    def test_pyarrow_csv_engine(self) -> None:
+        c_params = self.get_params("people.csv", chunk_size=2, skip_records=1)
+        with open(c_params["url"], "w") as f:
+            f.write(
+                'name,age,city\nAlice,30,Chicago\n"Bob, Jr.",,Milwaukee\n'
+                "Carol,50,Naperville\nDan,60,Evanston\nEve,70,Aurora\n"
+            )
+        arrow_params = dict(c_params, csv_engine="pyarrow")
+
+        c_chunks = list(iter_source_chunks(c_params))
+        arrow_chunks = list(iter_source_chunks(arrow_params))
+
+        self.assertEqual([2, 2], [len(chunk) for chunk in arrow_chunks])
+        self.assertIsInstance(arrow_chunks[0]["name"].dtype, pd.ArrowDtype)
+        self.assertEqual(
+            [chunk.fillna(value="").to_dict("records") for chunk in c_chunks],
+            [chunk.fillna(value="").to_dict("records") for chunk in arrow_chunks],
+        )
+
+    def test_unknown_csv_engine(self) -> None:
+        with self.assertRaises(ValueError):
+            iter_source_chunks(self.get_params("people.csv", csv_engine="python"))
+
+    @unittest.skipIf(has_pyarrow, "pyarrow is installed")
+    def test_parquet_without_pyarrow(self) -> None:
+        with self.assertRaises(ImportError):
+            list(iter_source_chunks(self.get_params("people.parquet")))
+
+    @unittest.skipUnless(has_pyarrow, "pyarrow is not installed")
+    def test_load_parquet(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            server = LocalServer()
+        path = os.path.join(self.directory.name, "people.parquet")
+        data.to_parquet(path)
+
+        server.load_csv({"url": path, "cql": cql})
+
+        self.assertEqual({"name": "Alice", "age": 30}, server._driver.rows[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
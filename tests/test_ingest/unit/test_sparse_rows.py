@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+import warnings
+
+import pandas as pd
+
+from neo4j_runway.ingestion.casting import to_columns, to_records, to_sparse_records
+from neo4j_runway.ingestion.pyingest import PyIngest
+from .fake_driver import FakeDriver
+
+person_cql = """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})
+SET n.age = coalesce(toIntegerOrNull(row.age), n.age), n.city = coalesce(row.city, n.city)"""
+
+config = f"""
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+files:
+  - url: people.csv
+    chunk_size: 10
+    sparse_rows: true
+    cql: |
+      {person_cql.replace(chr(10), chr(10) + "      ")}
+"""
+
+data = pd.DataFrame(
+    {
+        "name": ["Alice", "Bob", "Carol"],
+        "age": ["30", None, None],
+        "city": [None, "Paris", None],
+    }
+)
+
+expected = [
+    {"name": "Alice", "age": "30"},
+    {"name": "Bob", "city": "Paris"},
+    {"name": "Carol"},
+]
+
+
+class TestSparseRows(unittest.TestCase):
+
+    def test_missing_values_are_left_out(self) -> None:
+        self.assertEqual(expected, to_sparse_records(data))
+        self.assertEqual(expected, to_records(data, sparse=True))
+        self.assertEqual(
+            [{"name": "Alice"}], to_sparse_records(data.iloc[:1][["name"]])
+        )
+        self.assertEqual(list(), to_sparse_records(data.iloc[:0]))
+
+    def test_cast_nulls_are_left_out(self) -> None:
+        self.assertEqual(
+            {"name": "Alice", "age": 30},
+            to_records(
+                data.assign(age=pd.array([30, None, None], dtype="Int64")),
+                {"age": "int"},
+                sparse=True,
+            )[0],
+        )
+
+    def test_key_columns_are_kept(self) -> None:
+        rows = pd.DataFrame({"name": [None, "Bob"], "age": [None, "40"]})
+
+        # a blank key still matches the node it matched without sparse rows
+        self.assertEqual(
+            [{"name": ""}, {"name": "Bob", "age": "40"}],
+            to_records(rows, sparse=True, key_columns=["name"]),
+        )
+        self.assertEqual(
+            {"name": ["", "Bob"], "age": [None, "40"]},
+            to_columns(rows, sparse=True, key_columns=["name"]),
+        )
+
+    def test_ingest_keeps_blank_keys(self) -> None:
+        driver = FakeDriver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            PyIngest(
+                config=config,
+                dataframe=pd.DataFrame({"name": [None], "age": ["5"], "city": [None]}),
+                driver=driver,
+            )
+
+        self.assertEqual([{"name": "", "age": "5"}], driver.rows)
+
+    def test_ingest_sends_sparse_rows(self) -> None:
+        driver = FakeDriver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            PyIngest(config=config, dataframe=data, driver=driver)
+
+        self.assertEqual(expected, driver.rows)
+
+    def test_parallel_csv_sends_sparse_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "people.csv")
+            data.to_csv(path, index=False)
+            driver = FakeDriver()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                PyIngest(
+                    config=config.replace("url: people.csv", f"url: {path}"),
+                    driver=driver,
+                    parse_processes=2,
+                )
+
+        self.assertEqual(expected, driver.rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
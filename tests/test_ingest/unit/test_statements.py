@@ -0,0 +1,82 @@
+import unittest
+
+import yaml
+
+from neo4j_runway.ingestion.statements import (
+    get_grouped_relationship_statement,
+    get_statement_info,
+)
+from ...resources.answers.people_pets import people_pets_yaml_string
+
+files = yaml.safe_load(people_pets_yaml_string)["files"]
+
+
+class TestStatements(unittest.TestCase):
+
+    def test_node_statement_info(self) -> None:
+        info = get_statement_info(files[1]["cql"])
+        self.assertEqual("node", info.kind)
+        self.assertEqual(["Address"], info.written_labels)
+        self.assertEqual([], info.matched_labels)
+        self.assertEqual(["city", "street"], info.key_columns)
+
+    def test_relationship_statement_info(self) -> None:
+        info = get_statement_info(files[4]["cql"])
+        self.assertEqual("relationship", info.kind)
+        self.assertEqual([], info.written_labels)
+        self.assertEqual(["Person", "Address"], info.matched_labels)
+        self.assertEqual(["name"], info.source_key_columns)
+        self.assertEqual(["city", "street"], info.target_key_columns)
+
+    def test_same_label_relationship_statement_info(self) -> None:
+        info = get_statement_info(files[7]["cql"])
+        self.assertEqual(["name"], info.source_key_columns)
+        self.assertEqual(["knows"], info.target_key_columns)
+
+    def test_escaped_columns(self) -> None:
+        info = get_statement_info(
+            "WITH $dict.rows AS rows\nUNWIND rows AS row\nMERGE (n:`My Label` {id: toIntegerOrNull(row.`my id`)})"
+        )
+        self.assertEqual(["My Label"], info.written_labels)
+        self.assertEqual(["my id"], info.key_columns)
+
+    def test_columns(self) -> None:
+        self.assertEqual(["name", "age"], get_statement_info(files[0]["cql"]).columns)
+        self.assertEqual(
+            ["name", "city", "street"], get_statement_info(files[4]["cql"]).columns
+        )
+
+    def test_columns_unknown(self) -> None:
+        info = get_statement_info(
+            "WITH $dict.rows AS rows\nUNWIND rows AS row\nMERGE (n:Person {name: row.name})\nSET n += row"
+        )
+        self.assertIsNone(info.columns)
+        info = get_statement_info(
+            "UNWIND $dict.rows AS r\nMERGE (n:Person {name: r.name})"
+        )
+        self.assertIsNone(info.columns)
+
+    def test_other_statement_info(self) -> None:
+        info = get_statement_info("CALL db.awaitIndexes()")
+        self.assertEqual("other", info.kind)
+
+    def test_grouped_relationship_statement(self) -> None:
+        grouped = get_grouped_relationship_statement(files[4]["cql"])
+        self.assertEqual(
+            """WITH $dict.rows AS rows
+UNWIND rows AS group
+WITH group, group.rows[0] AS row
+MATCH (source:Person{name: row.name})
+WITH source, group
+UNWIND group.rows AS row
+MATCH (target:Address{city: row.city, street: row.street})
+MERGE (source)-[n:HAS_ADDRESS]->(target)""",
+            grouped,
+        )
+
+    def test_grouped_relationship_statement_unknown_format(self) -> None:
+        self.assertIsNone(get_grouped_relationship_statement(files[0]["cql"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch
+
+from neo4j.exceptions import ClientError, TransientError
+import pandas as pd
+
+from neo4j_runway.ingestion.pyingest import LocalServer, load_config
+from .fake_driver import FakeDriver
+
+config = """
+server_uri: bolt://localhost:7687
+admin_user: neo4j
+admin_pass: password
+"""
+
+file = {
+    "url": "people.csv",
+    "cql": """WITH $dict.rows AS rows
+UNWIND rows AS row
+MERGE (n:Person {name: row.name})""",
+    "chunk_size": 5,
+    "retry_delay": 0,
+}
+
+data = pd.DataFrame({"name": [f"person_{i}" for i in range(10)]})
+
+
+class TestTransactions(unittest.TestCase):
+
+    def setUp(self) -> None:
+        load_config(config)
+        with patch(
+            "neo4j_runway.ingestion.pyingest.GraphDatabase.driver", new=FakeDriver
+        ):
+            self.server = LocalServer()
+        self.driver = self.server._driver
+
+    def test_transaction_metadata(self) -> None:
+        self.server.load_dataframe(file, dataframe=data)
+
+        self.assertEqual(
+            [
+                {"app": "neo4j-runway", "file": "people.csv", "chunk": 0},
+                {"app": "neo4j-runway", "file": "people.csv", "chunk": 1},
+            ],
+            [run["metadata"] for run in self.driver.runs],
+        )
+
+    def test_transient_errors_are_retried(self) -> None:
+        self.driver.errors = [TransientError("deadlock"), TransientError("deadlock")]
+        with self.assertWarns(UserWarning):
+            self.server.load_dataframe(file, dataframe=data)
+
+        self.assertEqual(len(data), len(self.driver.rows))
+
+    def test_retries_are_limited(self) -> None:
+        self.driver.errors = [TransientError("deadlock")] * 3
+        with self.assertWarns(UserWarning):
+            with self.assertRaises(TransientError):
+                self.server.load_dataframe({**file, "max_retries": 2}, dataframe=data)
+
+    def test_client_errors_are_not_retried(self) -> None:
+        self.driver.errors = [ClientError("syntax error")]
+        with self.assertRaises(ClientError):
+            self.server.load_dataframe(file, dataframe=data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,6 +21,16 @@ class TestNode(unittest.TestCase):
         self.assertEqual(node.label, "Person")
         self.assertEqual(len(node.properties), 2)
 
+    def test_validate_csv_name(self) -> None:
+
+        self.assertEqual("people.csv", Node(label="Person", csv_name="people").csv_name)
+        self.assertEqual(
+            "people.parquet", Node(label="Person", csv_name="people.parquet").csv_name
+        )
+        self.assertEqual(
+            "people.csv.gz", Node(label="Person", csv_name="people.csv.gz").csv_name
+        )
+
     def test_properties(self) -> None:
 
         node = Node(label="Person", properties=[self.person_name, self.person_age])
@@ -28,6 +28,17 @@ class TestRelationship(unittest.TestCase):
         self.assertEqual(relationship.type, "HAS_SIMILAR")
         self.assertEqual(len(relationship.properties), 2)
 
+    def test_validate_csv_name(self) -> None:
+
+        relationship = Relationship(
+            type="HAS_SIMILAR",
+            source=self.source,
+            target=self.target,
+            csv_name="similar.jsonl",
+        )
+
+        self.assertEqual("similar.jsonl", relationship.csv_name)
+
     def test_properties(self) -> None:
 
         relationship = Relationship(
@@ -0,0 +1,36 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+# imported as a module so the function is not collected as a test
+from neo4j_runway.utils import test_connection
+
+
+class TestConnection(unittest.TestCase):
+
+    def test_existing_driver_is_left_open(self) -> None:
+        driver = MagicMock()
+        result = test_connection.test_database_connection(driver=driver)
+
+        self.assertTrue(result["valid"])
+        driver.verify_connectivity.assert_called_once()
+        driver.close.assert_not_called()
+
+    def test_created_driver_is_closed(self) -> None:
+        driver = MagicMock()
+        driver.__enter__.return_value = driver
+        driver.verify_authentication.side_effect = Exception("unauthorized")
+        with patch(
+            "neo4j_runway.utils.test_connection.GraphDatabase.driver",
+            return_value=driver,
+        ):
+            result = test_connection.test_database_connection(
+                {"uri": "bolt://localhost:7687", "username": "neo4j", "password": "x"}
+            )
+
+        self.assertFalse(result["valid"])
+        self.assertIn("unauthorized", result["message"])
+        driver.__exit__.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()